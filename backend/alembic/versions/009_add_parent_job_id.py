@@ -0,0 +1,28 @@
+"""Add parent_job_id to link recap variants to the job they reuse
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("recap_jobs", sa.Column("parent_job_id", sa.String(), nullable=True))
+    op.create_foreign_key(
+        "fk_recap_jobs_parent_job_id", "recap_jobs", "recap_jobs",
+        ["parent_job_id"], ["id"], ondelete="SET NULL",
+    )
+    op.create_index("ix_recap_jobs_parent_job_id", "recap_jobs", ["parent_job_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recap_jobs_parent_job_id", table_name="recap_jobs")
+    op.drop_constraint("fk_recap_jobs_parent_job_id", "recap_jobs", type_="foreignkey")
+    op.drop_column("recap_jobs", "parent_job_id")
@@ -0,0 +1,33 @@
+"""Add stored_uploads: content-hash index and reference counts for source videos
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stored_uploads",
+        sa.Column("s3_key", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.String(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("user_id", "sha256", name="uq_stored_uploads_user_sha256"),
+    )
+    op.create_index("ix_stored_uploads_user_id", "stored_uploads", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stored_uploads_user_id", table_name="stored_uploads")
+    op.drop_table("stored_uploads")
@@ -0,0 +1,24 @@
+"""Add stored_uploads.sha256_verified: hash computed by the server, not declared by the client
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "stored_uploads",
+        sa.Column("sha256_verified", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("stored_uploads", "sha256_verified")
@@ -6,7 +6,15 @@ from pydantic import BaseModel
 
 from app.api.v1.deps import get_current_user_or_api_key, get_db
 from app.models.user import User
-from app.schemas.job import CreateJobRequest, DownloadResponse, JobListResponse, JobResponse, job_to_response
+from app.schemas.job import (
+    CreateJobRequest,
+    CreateVariantRequest,
+    DownloadResponse,
+    JobConfig,
+    JobListResponse,
+    JobResponse,
+    job_to_response,
+)
 from app.services import job_service
 from app.services.storage import storage
 
@@ -181,6 +189,58 @@ async def resume_job(
     return job_to_response(job)
 
 
+@router.post("/{job_id}/variants", response_model=JobResponse, status_code=status.HTTP_201_CREATED)
+async def create_variant(
+    job_id: str,
+    body: CreateVariantRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    """
+    Re-render a completed job with another voice, TTS model, duration or translation.
+
+    The variant is a new job that starts from the parent's transcription, recap and
+    narration where the changed config does not affect them, so e.g. a voice change
+    only reruns TTS and the final render.
+    """
+    parent = await job_service.get_job(db, job_id, current_user.id)
+    if not parent:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if parent.status != "completed":
+        raise HTTPException(status_code=400, detail="Only completed jobs can have variants")
+    if not parent.input_video_key:
+        raise HTTPException(
+            status_code=400,
+            detail="Original upload is no longer on our servers, so this job cannot be re-rendered.",
+        )
+
+    config = body.apply_to(parent.config or {})
+    if config.model_dump() == JobConfig(**(parent.config or {})).model_dump():
+        raise HTTPException(status_code=400, detail="Variant config is identical to the original job")
+
+    from app.core.permissions import check_quota
+    await check_quota(db, current_user.id, current_user.tier)
+
+    from app.services.user_service import user_requires_api_key
+    if user_requires_api_key(current_user.email) and not current_user.encrypted_openai_key:
+        raise HTTPException(
+            status_code=400,
+            detail="You must set your OpenAI API key in Settings before creating a job",
+        )
+
+    variant = await job_service.create_variant_job(db, parent, config)
+
+    from app.services.billing_service import record_usage
+    await record_usage(db, current_user.id, variant.id)
+
+    from app.workers.tasks import process_recap_job
+    # Any resume step makes the worker load the copied intermediate_keys; the
+    # pipeline then plans from them and skips the steps they cover
+    process_recap_job.delay(variant.id, resume_from_step=1 if variant.intermediate_keys else 0)
+
+    return job_to_response(variant)
+
+
 async def _download_intermediate_debug(
     job_id: str,
     intermediate_key: str,
@@ -317,7 +377,9 @@ async def confirm_original_video(
     job.keep_original_video = body.keep_original
 
     if not body.keep_original and job.input_video_key:
-        storage.delete_file(job.input_video_key)
+        from app.services import upload_service
+        if await upload_service.release(db, job.input_video_key):
+            storage.delete_file(job.input_video_key)
         job.input_video_key = None
 
     await db.commit()
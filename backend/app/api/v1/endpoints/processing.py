@@ -1,12 +1,14 @@
 """User-facing processing controls (e.g. worker-side cache invalidation)."""
 
+import json
+
 import redis
 from fastapi import APIRouter, Depends
 
 from app.api.v1.deps import get_current_user
 from app.config import settings
 from app.models.user import User
-from modules.transcription import WHISPER_CACHE_REDIS_KEY
+from modules.transcription import WHISPER_CACHE_REDIS_KEY, WHISPER_STATS_REDIS_PREFIX
 
 router = APIRouter(prefix="/processing", tags=["processing"])
 
@@ -26,3 +28,30 @@ async def clear_whisper_cache(_current_user: User = Depends(get_current_user)):
         "detail": "Whisper model cache will reload on the next transcription on each worker.",
         "generation": generation,
     }
+
+
+@router.get("/whisper-cache")
+async def whisper_cache_stats(_current_user: User = Depends(get_current_user)):
+    """
+    Whisper model registry stats published by each Celery worker process after it
+    transcribes: hits, misses, evictions, load time and resident bytes per model.
+    """
+    r = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        keys = sorted(r.scan_iter(match=f"{WHISPER_STATS_REDIS_PREFIX}*"))
+        raw_stats = r.mget(keys) if keys else []
+    finally:
+        r.close()
+
+    workers = [json.loads(raw) for raw in raw_stats if raw]
+    return {
+        "budget_mb": settings.WHISPER_MODEL_BUDGET_MB,
+        "workers": workers,
+        "totals": {
+            "hits": sum(w["hits"] for w in workers),
+            "misses": sum(w["misses"] for w in workers),
+            "evictions": sum(w["evictions"] for w in workers),
+            "load_seconds": round(sum(w["load_seconds"] for w in workers), 3),
+            "resident_bytes": sum(w["resident_bytes"] for w in workers),
+        },
+    }
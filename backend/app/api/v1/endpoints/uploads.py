@@ -1,60 +1,379 @@
+import hashlib
+import math
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
+from botocore.exceptions import ClientError
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from python_multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from app.api.v1.deps import get_current_user_or_api_key
+from app.api.v1.deps import get_current_user_or_api_key, get_db
 from app.config import settings
+from app.models.upload import StoredUpload
 from app.models.user import User
-from app.schemas.upload import UploadResponse
+from app.schemas.upload import (
+    CompleteUploadSessionRequest,
+    InitiateUploadSessionRequest,
+    PresignedPart,
+    PresignPartsRequest,
+    PresignPartsResponse,
+    UploadedPart,
+    UploadedPartsResponse,
+    UploadResponse,
+    UploadSessionRef,
+    UploadSessionResponse,
+)
+from app.services import upload_service
 from app.services.storage import storage
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
 ALLOWED_EXTENSIONS = {".mp4", ".mov", ".avi", ".mkv", ".webm"}
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+S3_MAX_PARTS = 10000
+# Allowance for multipart boundaries and part headers when checking Content-Length
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
+# The body is parsed by hand so it streams; this keeps the form field in the API docs
+_VIDEO_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
 
-@router.post("/video", response_model=UploadResponse, status_code=status.HTTP_201_CREATED)
-async def upload_video(
-    file: UploadFile,
-    current_user: User = Depends(get_current_user_or_api_key),
-):
-    if not file.filename:
+
+def _validate_filename(filename: str | None) -> None:
+    if not filename:
         raise HTTPException(status_code=400, detail="No filename provided")
 
-    ext = "." + file.filename.rsplit(".", 1)[-1].lower() if "." in file.filename else ""
+    ext = "." + filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid format. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    # Read file to check size
-    content = await file.read()
-    size = len(content)
-    if size > settings.MAX_UPLOAD_SIZE_BYTES:
+
+@router.post(
+    "/video",
+    response_model=UploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=_VIDEO_FORM_SCHEMA,
+)
+async def upload_video(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and \
+            int(content_length) > settings.MAX_UPLOAD_SIZE_BYTES + MULTIPART_OVERHEAD_BYTES:
         raise HTTPException(status_code=413, detail="File too large. Max 2GB.")
 
     upload_id = str(uuid.uuid4())
-    s3_key = f"uploads/{current_user.id}/{upload_id}/{file.filename}"
+    filename, s3_key, size, sha256 = await _stream_to_storage(
+        request, f"uploads/{current_user.id}/{upload_id}"
+    )
 
-    import io
-    storage.upload_file(s3_key, io.BytesIO(content))
+    existing = await upload_service.find_by_hash(db, current_user.id, sha256)
+    if existing:
+        await run_in_threadpool(storage.delete_file, s3_key)
+        return _deduplicated_response(existing)
+    await upload_service.register(db, current_user.id, s3_key, sha256, size, verified=True)
 
     return UploadResponse(
         upload_id=upload_id,
         s3_key=s3_key,
-        filename=file.filename,
+        filename=filename,
         size=size,
+        sha256=sha256,
     )
 
 
+def _deduplicated_response(existing: StoredUpload) -> UploadResponse:
+    upload_id, filename = existing.s3_key.split("/", 3)[2:]
+    return UploadResponse(
+        upload_id=upload_id,
+        s3_key=existing.s3_key,
+        filename=filename,
+        size=existing.size_bytes,
+        sha256=existing.sha256,
+        deduplicated=True,
+    )
+
+
+@router.get("/by-hash/{sha256}", response_model=UploadResponse)
+async def find_upload_by_hash(
+    sha256: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    """Look up an earlier upload of the same content before sending the bytes again."""
+    existing = await upload_service.find_by_hash(db, current_user.id, sha256)
+    if not existing:
+        raise HTTPException(status_code=404, detail="No upload with this content")
+    return _deduplicated_response(existing)
+
+
+async def _file_field_events(request: Request):
+    """Parse a multipart/form-data body as it is received.
+
+    Yields ("filename", name) when the "file" field starts, then ("data", bytes)
+    for its content as it arrives. Other fields, and any later file field, are
+    skipped without being buffered.
+    """
+    _, params = parse_options_header(request.headers.get("content-type"))
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data body")
+
+    events = []
+    headers = {}
+    header = [bytearray(), bytearray()]
+    state = {"in_file": False, "seen_file": False}
+
+    def on_header_field(data, start, end):
+        header[0] += data[start:end]
+
+    def on_header_value(data, start, end):
+        header[1] += data[start:end]
+
+    def on_header_end():
+        headers[bytes(header[0]).lower()] = bytes(header[1])
+        header[0].clear()
+        header[1].clear()
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(headers.get(b"content-disposition"))
+        headers.clear()
+        if disposition.get(b"name") == b"file" and not state["seen_file"]:
+            state["in_file"] = state["seen_file"] = True
+            events.append(("filename", disposition.get(b"filename", b"").decode("utf-8", "replace")))
+
+    def on_part_data(data, start, end):
+        if state["in_file"]:
+            events.append(("data", bytes(data[start:end])))
+
+    def on_part_end():
+        state["in_file"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+    async for chunk in request.stream():
+        parser.write(chunk)
+        for event in events:
+            yield event
+        events.clear()
+    parser.finalize()
+    if not state["seen_file"]:
+        raise HTTPException(status_code=400, detail="No file provided")
+
+
+async def _stream_to_storage(request: Request, key_prefix: str) -> tuple[str, str, int, str]:
+    """Copy the uploaded file into an S3 multipart upload as the request body arrives.
+
+    Nothing is spooled to disk and only about one part is held in memory. The
+    size limit is enforced on the bytes received so far, and the SHA-256 of the
+    content is computed on the way through.
+
+    Returns:
+        (filename, s3 key, size in bytes, hex SHA-256)
+    """
+    part_size = max(settings.UPLOAD_PART_SIZE_BYTES, S3_MIN_PART_SIZE)
+    digest = hashlib.sha256()
+    size = 0
+    parts = []
+    buffer = bytearray()
+    filename = s3_key = multipart_id = None
+
+    async def send_part(data: bytes) -> None:
+        part_number = len(parts) + 1
+        etag = await run_in_threadpool(storage.upload_part, s3_key, multipart_id, part_number, data)
+        parts.append({"PartNumber": part_number, "ETag": etag})
+
+    try:
+        async for kind, value in _file_field_events(request):
+            if kind == "filename":
+                _validate_filename(value)
+                filename, s3_key = value, f"{key_prefix}/{value}"
+                multipart_id = await run_in_threadpool(storage.create_multipart_upload, s3_key)
+                continue
+            size += len(value)
+            if size > settings.MAX_UPLOAD_SIZE_BYTES:
+                raise HTTPException(status_code=413, detail="File too large. Max 2GB.")
+            digest.update(value)
+            buffer += value
+            while len(buffer) >= part_size:
+                await send_part(bytes(buffer[:part_size]))
+                del buffer[:part_size]
+        if buffer or not parts:
+            await send_part(bytes(buffer))
+        await run_in_threadpool(storage.complete_multipart_upload, s3_key, multipart_id, parts)
+    except BaseException:
+        if multipart_id:
+            await run_in_threadpool(storage.abort_multipart_upload, s3_key, multipart_id)
+        raise
+
+    return filename, s3_key, size, digest.hexdigest()
+
+
+# Upload sessions: the client PUTs parts straight to S3/MinIO through presigned URLs,
+# in parallel and resumably; the API only signs URLs and completes the upload. The
+# completed object lives at s3_key, which is passed to POST /jobs like any upload.
+# Browser clients need a bucket CORS rule allowing PUT and exposing the ETag header.
+
+
+def _check_session_owner(s3_key: str, user: User) -> None:
+    if not s3_key.startswith(f"uploads/{user.id}/"):
+        raise HTTPException(status_code=403, detail="Not your upload")
+
+
+@router.post("/sessions", response_model=UploadSessionResponse, status_code=status.HTTP_201_CREATED)
+async def initiate_upload_session(
+    body: InitiateUploadSessionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    _validate_filename(body.filename)
+    if body.size > settings.MAX_UPLOAD_SIZE_BYTES:
+        raise HTTPException(status_code=413, detail="File too large. Max 2GB.")
+
+    if body.sha256:
+        existing = await upload_service.find_by_hash(db, current_user.id, body.sha256)
+        if existing and existing.size_bytes == body.size:
+            upload_id = existing.s3_key.split("/", 3)[2]
+            return UploadSessionResponse(
+                upload_id=upload_id, s3_key=existing.s3_key, part_size=0, part_count=0, deduplicated=True,
+            )
+
+    part_size = max(settings.UPLOAD_PART_SIZE_BYTES, S3_MIN_PART_SIZE, math.ceil(body.size / S3_MAX_PARTS))
+    upload_id = str(uuid.uuid4())
+    s3_key = f"uploads/{current_user.id}/{upload_id}/{body.filename}"
+    multipart_id = await run_in_threadpool(storage.create_multipart_upload, s3_key)
+
+    return UploadSessionResponse(
+        upload_id=upload_id,
+        s3_key=s3_key,
+        multipart_upload_id=multipart_id,
+        part_size=part_size,
+        part_count=math.ceil(body.size / part_size),
+    )
+
+
+@router.post("/sessions/parts", response_model=PresignPartsResponse)
+async def presign_upload_parts(
+    body: PresignPartsRequest,
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    _check_session_owner(body.s3_key, current_user)
+    if any(n < 1 or n > S3_MAX_PARTS for n in body.part_numbers):
+        raise HTTPException(status_code=400, detail=f"Part numbers must be between 1 and {S3_MAX_PARTS}")
+
+    expires_in = settings.UPLOAD_PART_URL_EXPIRY_SECONDS
+    parts = [
+        PresignedPart(
+            part_number=n,
+            url=storage.generate_presigned_part_url(body.s3_key, body.multipart_upload_id, n, expires_in),
+        )
+        for n in body.part_numbers
+    ]
+    return PresignPartsResponse(parts=parts, expires_in=expires_in)
+
+
+async def _uploaded_parts(s3_key: str, multipart_id: str) -> list[dict]:
+    try:
+        return await run_in_threadpool(storage.list_parts, s3_key, multipart_id)
+    except ClientError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+
+
+@router.get("/sessions/parts", response_model=UploadedPartsResponse)
+async def list_uploaded_parts(
+    s3_key: str,
+    multipart_upload_id: str,
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    """Parts already stored, so an interrupted client uploads only the rest."""
+    _check_session_owner(s3_key, current_user)
+    parts = await _uploaded_parts(s3_key, multipart_upload_id)
+    return UploadedPartsResponse(
+        parts=[UploadedPart(part_number=p["PartNumber"], etag=p["ETag"], size=p["Size"]) for p in parts]
+    )
+
+
+@router.post("/sessions/complete", response_model=UploadResponse)
+async def complete_upload_session(
+    body: CompleteUploadSessionRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    _check_session_owner(body.s3_key, current_user)
+    parts = await _uploaded_parts(body.s3_key, body.multipart_upload_id)
+    if not parts:
+        raise HTTPException(status_code=400, detail="No parts uploaded")
+
+    # Part URLs cannot cap the bytes a client sends, so the limit is enforced here
+    size = sum(p["Size"] for p in parts)
+    if size > settings.MAX_UPLOAD_SIZE_BYTES:
+        await run_in_threadpool(storage.abort_multipart_upload, body.s3_key, body.multipart_upload_id)
+        raise HTTPException(status_code=413, detail="File too large. Max 2GB.")
+
+    await run_in_threadpool(
+        storage.complete_multipart_upload,
+        body.s3_key,
+        body.multipart_upload_id,
+        [{"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in parts],
+    )
+
+    # The hash is client-declared here (the bytes never pass through the API); it is
+    # only matched against this user's own uploads
+    if body.sha256:
+        existing = await upload_service.find_by_hash(db, current_user.id, body.sha256)
+        if existing and existing.s3_key != body.s3_key:
+            await run_in_threadpool(storage.delete_file, body.s3_key)
+            return _deduplicated_response(existing)
+    await upload_service.register(db, current_user.id, body.s3_key, body.sha256, size)
+
+    upload_id, filename = body.s3_key.split("/", 3)[2:]
+    return UploadResponse(upload_id=upload_id, s3_key=body.s3_key, filename=filename, size=size, sha256=body.sha256)
+
+
+@router.post("/sessions/abort", status_code=status.HTTP_204_NO_CONTENT)
+async def abort_upload_session(
+    body: UploadSessionRef,
+    current_user: User = Depends(get_current_user_or_api_key),
+):
+    _check_session_owner(body.s3_key, current_user)
+    await run_in_threadpool(storage.abort_multipart_upload, body.s3_key, body.multipart_upload_id)
+
+
 @router.delete("/{s3_key:path}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_upload(
     s3_key: str,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_or_api_key),
 ):
     if not s3_key.startswith(f"uploads/{current_user.id}/"):
         raise HTTPException(status_code=403, detail="Not your upload")
     if not storage.file_exists(s3_key):
         raise HTTPException(status_code=404, detail="File not found")
+    if await upload_service.is_retained(db, s3_key):
+        raise HTTPException(status_code=409, detail="Upload is used by a job")
+    await upload_service.forget(db, s3_key)
     storage.delete_file(s3_key)
@@ -22,6 +22,12 @@ class Settings(BaseSettings):
     S3_BUCKET: str = "video-recaps"
     S3_REGION: str = "us-east-1"
     S3_PUBLIC_ENDPOINT: str = ""
+    # Transfer engine: multipart part size and parallel parts per transfer, and how many
+    # objects a batch (step outputs, memo files) moves at once. The connection pool is
+    # sized for S3_TRANSFER_CONCURRENCY * S3_BATCH_WORKERS requests in flight.
+    S3_TRANSFER_PART_SIZE_MB: int = 16
+    S3_TRANSFER_CONCURRENCY: int = 10
+    S3_BATCH_WORKERS: int = 4
 
     # JWT
     JWT_SECRET: str = "change-me-in-production"
@@ -40,7 +46,46 @@ class Settings(BaseSettings):
 
     # OpenAI
     OPENAI_API_KEY: str = ""
+    # Tokens the recap transcript may take in one prompt (read by modules.prompt_encoding);
+    # 0 = half the model's context window
+    LLM_TRANSCRIPT_TOKEN_BUDGET: int = 0
+    # Transcripts longer than two windows are planned map-reduce: one clip-candidate call
+    # per window (this many in flight at once), then a reduce call; 0 = always one call
+    LLM_RECAP_WINDOW_SECONDS: int = 900
+    LLM_RECAP_PARALLEL_CALLS: int = 4
+    # Local pre-ranking keeps this many transcript seconds per recap second for
+    # clip selection (best windows by novelty, density, emotion, speaker changes); 0 = off
+    LLM_PRERANK_COVERAGE: float = 8.0
+    # Persistent cache of OpenAI responses (chat + TTS) keyed by a hash of the request, so
+    # resumed and re-run jobs do not pay again: "redis" (shared by all workers), "sqlite"
+    # (per host, LLM_CACHE_PATH) or "off". Least recently used entries go past LLM_CACHE_MAX_MB.
+    LLM_CACHE_BACKEND: str = "redis"
+    LLM_CACHE_PATH: str = ""
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+    LLM_CACHE_MAX_MB: int = 512
+    # Empty = REDIS_URL
+    LLM_CACHE_REDIS_URL: str = ""
     WHISPER_MODEL_SIZE: str = "small"
+    # Inference engine: "openai" (reference PyTorch, fp32) or "ctranslate2" (faster-whisper, int8 CPU)
+    WHISPER_BACKEND: str = "openai"
+    # Memory budget for Whisper models resident in one worker process; idle models are
+    # evicted least-recently-used first when a load would exceed it. 0 = unbounded.
+    WHISPER_MODEL_BUDGET_MB: int = 0
+    # Comma-separated Whisper sizes loaded (and warmed up) in the Celery parent before the
+    # prefork pool starts; children share the weights copy-on-write. Empty = load on first job.
+    WHISPER_PRELOAD_MODELS: str = ""
+    # torch intra-op threads per worker process (0 = CPU cores // worker concurrency)
+    TORCH_THREADS_PER_PROCESS: int = 0
+    # Audio longer than 2x WHISPER_CHUNK_SECONDS is split at silences and the chunks are
+    # transcribed on a local pool (one model per worker). 0 disables chunking.
+    WHISPER_CHUNK_SECONDS: int = 300
+    WHISPER_CHUNK_WORKERS: int = 0  # 0 = one worker per two CPU cores
+    # Audio longer than this is split into WHISPER_CHUNK_SECONDS chunks that are transcribed
+    # by a Celery chord across all processing workers. 0 disables the fan-out.
+    WHISPER_DISTRIBUTED_MIN_SECONDS: int = 0
+    # Transcribe only speech regions found by an energy/zero-crossing VAD pre-pass
+    # (skips music and ambience; not applied to distributed fan-out)
+    WHISPER_VAD: bool = False
 
     # AssemblyAI (for speaker diarization)
     ASSEMBLYAI_API_KEY: str = ""
@@ -66,14 +111,42 @@ class Settings(BaseSettings):
 
     # File limits
     MAX_UPLOAD_SIZE_BYTES: int = 2 * 1024 * 1024 * 1024  # 2GB
+    # Uploads are streamed to S3 in parts of this size (S3 minimum is 5MB); memory per upload ~ one part
+    UPLOAD_PART_SIZE_BYTES: int = 8 * 1024 * 1024
+    # Lifetime of presigned part URLs handed out by upload sessions (direct-to-S3 uploads)
+    UPLOAD_PART_URL_EXPIRY_SECONDS: int = 3600
 
     # Storage: remove uploaded original from object storage after pipeline succeeds (output retained)
     DELETE_INPUT_VIDEO_ON_COMPLETE: bool = True
+    # Opt-in: keep the original until the job expires so it can be re-rendered as variants
+    # (POST /jobs/{id}/variants); cleanup_expired_files releases it. Overrides the setting above.
+    KEEP_INPUT_VIDEO_FOR_VARIANTS: bool = False
 
     # When True (or unset with DEBUG=true), Celery recap jobs keep tempfile workspace on disk for inspection.
     # When unset, defaults to preserving only when DEBUG is true (typical localhost).
     KEEP_PIPELINE_WORKING_DIR: Optional[bool] = None
 
+    # Rendering: cut clips, drop original audio and mux narration in one ffmpeg run
+    # instead of three moviepy encodes. Falls back to moviepy if ffmpeg fails.
+    ENABLE_SINGLE_PASS_RENDER: bool = True
+    # Clip extraction when not single-pass: "smart" stream-copies whole GOPs and
+    # re-encodes only the frames up to the nearest keyframe (falls back to "parallel");
+    # "parallel" encodes each clip in its own process; "reencode" uses moviepy.
+    CLIP_CUT_MODE: str = "smart"
+    CLIP_ENCODE_WORKERS: int = 0  # 0 = one worker per CPU core
+
+    # Pipeline: independent steps of one job (emotion analysis beside Whisper,
+    # TTS beside clip extraction) run concurrently, up to this many at a time.
+    PIPELINE_MAX_PARALLEL_STEPS: int = 2
+    # Step outputs upload on this many background threads per job while later steps run
+    # (0 = upload inline before the next step)
+    ARTIFACT_UPLOAD_WORKERS: int = 2
+    # Reuse transcription / translation / recap / TTS outputs across jobs whose inputs
+    # (content SHA-256 + the config fields each step depends on) are identical
+    STEP_MEMO_ENABLED: bool = True
+    # Memo entries older than this are deleted by the periodic cleanup task (0 = keep forever)
+    STEP_MEMO_TTL_DAYS: int = 30
+
     # Celery
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://redis:6379/1"
@@ -0,0 +1,66 @@
+"""
+Background upload queue for one pipeline job.
+
+Steps hand their artifact uploads to the queue and move on, so the next step
+runs while the previous step's outputs upload. Each upload's on_durable
+callback runs only after the upload has succeeded; the pipeline records keys
+there, so intermediate_keys never names an object that is not in storage.
+The pipeline waits for the queue before completing the job or recording a
+resume checkpoint.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactUploader:
+    """Thread pool running one job's uploads (max_workers=0 uploads inline)."""
+
+    def __init__(self, max_workers: int):
+        self._pool = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="artifact-upload")
+            if max_workers > 0 else None
+        )
+        self._pending: list[Future] = []
+        self._lock = threading.Lock()
+
+    def submit(self, upload, on_durable=None) -> None:
+        """Queue upload(); on_durable(result) runs once it has succeeded."""
+        def task():
+            result = upload()
+            if on_durable:
+                on_durable(result)
+            return result
+
+        if self._pool is None:
+            task()
+            return
+        future = self._pool.submit(task)
+        with self._lock:
+            self._pending.append(future)
+
+    def wait(self, raise_errors: bool = True) -> list[BaseException]:
+        """Block until every queued upload has finished.
+
+        Returns:
+            Upload errors (the first one is raised instead when raise_errors)
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        errors = []
+        for future in pending:
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Artifact upload failed: {error}", exc_info=error)
+                errors.append(error)
+        if errors and raise_errors:
+            raise errors[0]
+        return errors
+
+    def shutdown(self) -> None:
+        self.wait(raise_errors=False)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
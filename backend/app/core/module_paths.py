@@ -0,0 +1,42 @@
+"""
+Point a pipeline module's output paths at a job's working directory.
+
+The modules/ scripts write under SCRIPT_DIR via get_output_path. The services
+patch both for the duration of a call. Steps of one job run concurrently and
+share the patch; a call for another working directory waits until they are
+done, so no step ever writes through another job's paths and the originals
+are restored only by the last user.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+
+_changed = threading.Condition()
+# module name -> [working_dir, active users, (original SCRIPT_DIR, original get_output_path)]
+_active: dict[str, list] = {}
+
+
+@contextmanager
+def patched_module_paths(mod, working_dir: str):
+    """Temporarily patch SCRIPT_DIR and get_output_path in mod."""
+    name = mod.__name__
+    with _changed:
+        while name in _active and _active[name][0] != working_dir:
+            _changed.wait()
+        if name in _active:
+            _active[name][1] += 1
+        else:
+            _active[name] = [working_dir, 1, (mod.SCRIPT_DIR, mod.get_output_path)]
+            mod.SCRIPT_DIR = working_dir
+            mod.get_output_path = lambda rel: os.path.join(working_dir, rel)
+    try:
+        yield
+    finally:
+        with _changed:
+            entry = _active[name]
+            entry[1] -= 1
+            if entry[1] == 0:
+                mod.SCRIPT_DIR, mod.get_output_path = entry[2]
+                del _active[name]
+                _changed.notify_all()
@@ -0,0 +1,130 @@
+"""
+Content-addressed memoization of pipeline step outputs across jobs.
+
+A step's fingerprint is the SHA-256 of its input content hashes plus the job
+config fields it depends on. Outputs are stored once under
+memo/{step}/{fingerprint}/ in object storage, so a re-submitted video (another
+user, a retry with a different target_duration) reuses the paid transcription,
+translation, recap and TTS results that do not depend on what changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every memoized output (e.g. after a result schema change);
+# a prompt change only needs a new version in that step's fingerprint fields
+MEMO_VERSION = 1
+
+_HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StepMemo:
+    """Stores and restores step results keyed by input fingerprint.
+
+    A result is the dict a processing service returns. String values that are
+    files inside the working directory are uploaded and restored to the same
+    relative path; everything else must be JSON-serialisable. The manifest is
+    written last, so a partially saved entry is never read.
+    """
+
+    PREFIX = "memo"
+
+    def __init__(self, storage_service, working_dir: str):
+        self.storage = storage_service
+        self.working_dir = working_dir
+
+    @staticmethod
+    def fingerprint(step_name: str, fields: dict) -> str:
+        payload = json.dumps(
+            {"step": step_name, "memo_version": MEMO_VERSION, **fields},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _prefix(self, step_name: str, fingerprint: str) -> str:
+        return f"{self.PREFIX}/{step_name}/{fingerprint}"
+
+    def _relative(self, value) -> str | None:
+        if not isinstance(value, str) or not os.path.isfile(value):
+            return None
+        rel = os.path.relpath(os.path.abspath(value), self.working_dir)
+        return None if rel.startswith("..") else rel
+
+    def load(self, step_name: str, fingerprint: str) -> dict | None:
+        """Restore a memoized result into the working directory, or None on a miss."""
+        prefix = self._prefix(step_name, fingerprint)
+        manifest_key = f"{prefix}/manifest.json"
+        try:
+            if not self.storage.file_exists(manifest_key):
+                return None
+            with tempfile.TemporaryDirectory() as tmpdir:
+                manifest_path = os.path.join(tmpdir, "manifest.json")
+                self.storage.download_file(manifest_key, manifest_path)
+                with open(manifest_path) as f:
+                    manifest = json.load(f)
+
+            downloads = {}
+            for rel in manifest["files"]:
+                local_path = os.path.join(self.working_dir, rel)
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                downloads[f"{prefix}/{rel}"] = local_path
+            self.storage.download_files(downloads)
+        except Exception as e:
+            logger.warning(f"Memo lookup for {step_name} failed, running the step: {e}")
+            return None
+
+        result = dict(manifest["values"])
+        for name, rel in manifest["file_values"].items():
+            result[name] = os.path.join(self.working_dir, rel)
+        return result
+
+    @classmethod
+    def delete_expired(cls, storage_service, cutoff) -> int:
+        """Delete memo entries stored before cutoff (a datetime); returns how many.
+
+        Manifests go first, so an entry stops being found before its files are
+        removed. Files of saves that never wrote a manifest age out the same way.
+        """
+        stale = [key for key, modified in storage_service.list_objects(f"{cls.PREFIX}/") if modified < cutoff]
+        manifests = [key for key in stale if key.endswith("/manifest.json")]
+        storage_service.delete_files(manifests)
+        storage_service.delete_files([key for key in stale if not key.endswith("/manifest.json")])
+        return len(manifests)
+
+    def save(self, step_name: str, fingerprint: str, result: dict, extra_files: tuple[str, ...] = ()) -> None:
+        """Store a step result; failures are logged and never fail the job."""
+        prefix = self._prefix(step_name, fingerprint)
+        values, file_values = {}, {}
+        for name, value in result.items():
+            rel = self._relative(value)
+            if rel:
+                file_values[name] = rel
+            else:
+                values[name] = value
+        files = sorted(set(file_values.values()) | {rel for rel in map(self._relative, extra_files) if rel})
+
+        try:
+            self.storage.upload_files({f"{prefix}/{rel}": os.path.join(self.working_dir, rel) for rel in files})
+            manifest = {"values": values, "file_values": file_values, "files": files}
+            self.storage.upload_bytes(
+                f"{prefix}/manifest.json",
+                json.dumps(manifest, default=str).encode(),
+                "application/json",
+            )
+        except Exception as e:
+            logger.warning(f"Could not memoize {step_name} outputs: {e}")
@@ -3,11 +3,16 @@ Step-by-step storage manager for MinIO.
 
 Organizes pipeline outputs into step-specific directories with metadata and logs.
 Enables debugging, quality control, and selective reprocessing of pipeline steps.
+
+This is the job's only artifact store: each file is uploaded once, and every
+name it is known by (step key such as "step_01.transcript", logical name such as
+"transcription" used by resume and the debug endpoints) points at that one object.
 """
 
 import json
 import logging
 import os
+import threading
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -36,12 +41,33 @@ class StepStorage:
         """
         self.job_id = job_id
         self.storage = storage_service
+        # Cross-job memo lookups (see app.core.step_memo), recorded in step metadata
+        self._memo_lock = threading.Lock()
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.memo_steps: dict[str, dict] = {}
+
+    def record_memo(self, step_name: str, hit: bool, fingerprint: str) -> None:
+        """Record a memo lookup for a step."""
+        with self._memo_lock:
+            if hit:
+                self.memo_hits += 1
+            else:
+                self.memo_misses += 1
+            self.memo_steps[step_name] = {"hit": hit, "fingerprint": fingerprint}
+
+    def memo_summary(self) -> dict:
+        with self._memo_lock:
+            return {"hits": self.memo_hits, "misses": self.memo_misses, "steps": dict(self.memo_steps)}
 
     def upload_step_output(
         self,
         step_num: int,
         files_dict: dict[str, str],
         metadata: dict = None,
+        memo_step: str | None = None,
+        aliases: dict[str, str] | None = None,
+        stored_files: dict[str, str] | None = None,
     ) -> dict:
         """
         Upload all outputs for a step.
@@ -50,15 +76,21 @@ class StepStorage:
             step_num: Step number (1-7)
             files_dict: {"file_type": "local_path", ...}
             metadata: Optional metadata dict (will be JSON-encoded)
+            memo_step: Step whose memo lookup (hit/miss, fingerprint) is added to metadata
+            aliases: {"file_type": "logical_name", ...} extra names pointing at the same object
+            stored_files: {"file_type": "s3_key", ...} outputs already in storage (recorded, not uploaded)
 
         Returns:
-            {"step_XX.file_type": "s3_key", ...} for storage in intermediate_keys
+            {"step_XX.file_type": "s3_key", "logical_name": "s3_key", ...} for intermediate_keys
         """
         step_name = self.STEPS.get(step_num, f"step_{step_num}")
         s3_keys = {}
+        if memo_step and memo_step in self.memo_steps:
+            metadata = {**(metadata or {}), "memo": self.memo_steps[memo_step]}
         step_prefix = f"jobs/{self.job_id}/step_{step_num:02d}_{step_name}"
 
-        # Upload each file
+        # Upload the files concurrently
+        uploads = {}
         for file_type, local_path in files_dict.items():
             if not os.path.exists(local_path):
                 logger.warning(f"Step {step_num}: File not found at {local_path}, skipping")
@@ -66,10 +98,16 @@ class StepStorage:
 
             basename = os.path.basename(local_path)
             s3_key = f"{step_prefix}/{basename}"
-            with open(local_path, "rb") as f:
-                self.storage.upload_file(s3_key, f)
+            uploads[s3_key] = local_path
+            s3_keys[f"step_{step_num:02d}.{file_type}"] = s3_key
+        self.storage.upload_files(uploads)
+        logger.debug(f"Step {step_num}: Uploaded {sorted(uploads)}")
+        for file_type, s3_key in (stored_files or {}).items():
             s3_keys[f"step_{step_num:02d}.{file_type}"] = s3_key
-            logger.debug(f"Step {step_num}: Uploaded {file_type} → {s3_key}")
+        for file_type, name in (aliases or {}).items():
+            step_key = f"step_{step_num:02d}.{file_type}"
+            if step_key in s3_keys:
+                s3_keys[name] = s3_keys[step_key]
 
         # Upload metadata
         if metadata:
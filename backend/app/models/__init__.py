@@ -1,7 +1,8 @@
 from app.models.api_key import APIKey
 from app.models.job import RecapJob
 from app.models.subscription import Subscription
+from app.models.upload import StoredUpload
 from app.models.usage import UsageRecord
 from app.models.user import User
 
-__all__ = ["APIKey", "RecapJob", "Subscription", "UsageRecord", "User"]
+__all__ = ["APIKey", "RecapJob", "StoredUpload", "Subscription", "UsageRecord", "User"]
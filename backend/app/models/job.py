@@ -29,6 +29,10 @@ class RecapJob(Base, TimestampMixin):
     emotion_analysis_error: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     celery_task_id: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Set on variant jobs created from a completed job's artifacts
+    parent_job_id: Mapped[str | None] = mapped_column(
+        String, ForeignKey("recap_jobs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
 
     started_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
     completed_at: Mapped[str | None] = mapped_column(DateTime(timezone=True), nullable=True)
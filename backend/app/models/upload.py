@@ -0,0 +1,20 @@
+from sqlalchemy import BigInteger, Boolean, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin
+
+
+class StoredUpload(Base, TimestampMixin):
+    """An uploaded source video, indexed by content hash and shared between jobs."""
+
+    __tablename__ = "stored_uploads"
+    __table_args__ = (UniqueConstraint("user_id", "sha256", name="uq_stored_uploads_user_sha256"),)
+
+    s3_key: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String, ForeignKey("users.id"), nullable=False, index=True)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    # True when the server hashed the bytes itself; session uploads only declare a hash
+    sha256_verified: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # Jobs whose input_video_key points at this object
+    ref_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
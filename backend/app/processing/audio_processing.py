@@ -1,23 +1,13 @@
-import os
-from contextlib import contextmanager
 from typing import Callable
 
+from app.core import module_paths
+
 
-@contextmanager
 def patched_module_paths(working_dir: str):
     """Temporarily patch SCRIPT_DIR and get_output_path in modules.audio_processing."""
     import modules.audio_processing as mod
 
-    original_script_dir = mod.SCRIPT_DIR
-    original_get_output_path = mod.get_output_path
-
-    mod.SCRIPT_DIR = working_dir
-    mod.get_output_path = lambda rel: os.path.join(working_dir, rel)
-    try:
-        yield
-    finally:
-        mod.SCRIPT_DIR = original_script_dir
-        mod.get_output_path = original_get_output_path
+    return module_paths.patched_module_paths(mod, working_dir)
 
 
 def generate_tts_service(
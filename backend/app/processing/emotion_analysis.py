@@ -67,7 +67,7 @@ class AudioEmotionAnalyzer:
         Analyze emotions from audio file.
 
         Args:
-            audio_path: Path to audio file (WAV, MP3, etc.)
+            audio_path: Path to audio file (WAV, MP3, etc., or the job's shared .f32 PCM)
             language_code: Language code (e.g., 'en-US', 'es-ES')
             speaker_count: Expected number of speakers (for diarization)
 
@@ -88,8 +88,14 @@ class AudioEmotionAnalyzer:
         sample_rate = self._get_sample_rate(audio_path)
 
         # Read audio file
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
+        if audio_path.endswith(".f32"):
+            # Shared 16 kHz mono float32 buffer: map it and send LINEAR16
+            from modules.pcm_audio import load_pcm, pcm_to_linear16
+
+            audio_data = pcm_to_linear16(load_pcm(audio_path))
+        else:
+            with open(audio_path, "rb") as f:
+                audio_data = f.read()
 
         audio = speech_v1.RecognitionAudio(content=audio_data)
 
@@ -429,7 +435,7 @@ class AudioEmotionAnalyzer:
         """Determine audio encoding from file extension."""
         ext = os.path.splitext(audio_path)[1].lower()
 
-        if ext == ".wav":
+        if ext in (".wav", ".f32"):
             return speech_v1.RecognitionConfig.AudioEncoding.LINEAR16
         elif ext == ".mp3":
             return speech_v1.RecognitionConfig.AudioEncoding.MP3
@@ -0,0 +1,17 @@
+from app.config import settings
+
+
+def sync_llm_cache():
+    """Point this process's LLM gateway at the configured cache before a job calls OpenAI.
+
+    Returns the gateway; its counters keep running across jobs in the process.
+    """
+    from modules.llm_cache import configure_llm_cache
+
+    return configure_llm_cache(
+        backend=settings.LLM_CACHE_BACKEND,
+        path=settings.LLM_CACHE_PATH or None,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        max_mb=settings.LLM_CACHE_MAX_MB,
+        redis_url=settings.LLM_CACHE_REDIS_URL or settings.REDIS_URL,
+    )
@@ -1,3 +1,4 @@
+import threading
 from typing import Callable
 
 # Step weights mapping step number to (start_pct, end_pct)
@@ -30,6 +31,9 @@ class ProgressReporter:
         on_progress: called with (step, step_name, progress_pct, message)
         """
         self.on_progress = on_progress
+        # Steps can run concurrently; overall progress never moves backwards.
+        self._high_water = 0.0
+        self._lock = threading.Lock()
 
     def report(self, step: int, message: str, sub_progress: float = 1.0):
         """Report progress for a step.
@@ -43,6 +47,10 @@ class ProgressReporter:
         overall_pct = start + (end - start) * sub_progress
         step_name = STEP_NAMES.get(step, f"Step {step}")
 
+        with self._lock:
+            overall_pct = max(overall_pct, self._high_water)
+            self._high_water = overall_pct
+
         self.on_progress(
             step=step,
             step_name=step_name,
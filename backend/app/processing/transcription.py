@@ -1,25 +1,37 @@
+import json
 import os
-from contextlib import contextmanager
 from typing import Callable
 
 from app.config import settings
+from app.core import module_paths
+
+
+class TranscriptionDeferred(Exception):
+    """Transcription was split into chunks for other Celery workers.
+
+    The caller saves its state and then calls ``dispatch()`` to start the chord;
+    the merge task rebuilds transcription.json and continues the job.
+    """
+
+    def __init__(self, chunk_count: int, dispatch: Callable[[], None]):
+        super().__init__(f"Transcription deferred to {chunk_count} distributed chunk tasks")
+        self.chunk_count = chunk_count
+        self.dispatch = dispatch
 
 
-@contextmanager
 def patched_module_paths(working_dir: str):
     """Temporarily patch SCRIPT_DIR and get_output_path in modules.transcription."""
     import modules.transcription as mod
 
-    original_script_dir = mod.SCRIPT_DIR
-    original_get_output_path = mod.get_output_path
+    return module_paths.patched_module_paths(mod, working_dir)
+
 
-    mod.SCRIPT_DIR = working_dir
-    mod.get_output_path = lambda rel: os.path.join(working_dir, rel)
-    try:
-        yield
-    finally:
-        mod.SCRIPT_DIR = original_script_dir
-        mod.get_output_path = original_get_output_path
+def sync_whisper_worker() -> None:
+    """Apply a pending cache bust and the model memory budget before this process uses Whisper."""
+    from modules.transcription import set_whisper_model_budget, sync_whisper_cache_invalidation
+
+    sync_whisper_cache_invalidation(settings.REDIS_URL)
+    set_whisper_model_budget(settings.WHISPER_MODEL_BUDGET_MB)
 
 
 def transcribe_video_service(
@@ -29,6 +41,8 @@ def transcribe_video_service(
     language: str | None = None,
     include_emotions: bool = False,
     progress_callback: Callable | None = None,
+    audio_path: str | None = None,
+    job_id: str | None = None,
 ) -> dict:
     """Wrap modules.transcription.transcribe_with_optional_emotions with path isolation.
 
@@ -40,18 +54,34 @@ def transcribe_video_service(
     Args:
         include_emotions: If True, performs emotion analysis (PREMIUM tier).
                          If False, transcription only (BASIC/FREE tier).
+        audio_path: WAV already extracted from the video (see extract_audio_service);
+                    Whisper transcribes it directly instead of re-extracting.
+        job_id: Recap job id. With WHISPER_DISTRIBUTED_MIN_SECONDS set, longer audio
+                is fanned out across Celery workers and TranscriptionDeferred is raised.
 
     Returns:
-        {"transcription_file": path, "emotions_file": path_or_none}
+        {"transcription_file": path, "emotions_file": path_or_none,
+         "vad": {"speech_ratio", "speech_seconds", "total_seconds"} or None}
     """
     from modules.transcription import (
         is_whisper_model_cached,
-        sync_whisper_cache_invalidation,
+        publish_whisper_registry_stats,
         transcribe_with_optional_emotions,
     )
 
     with patched_module_paths(working_dir):
-        sync_whisper_cache_invalidation(settings.REDIS_URL)
+        sync_whisper_worker()
+
+        diarization = settings.ENABLE_ASSEMBLYAI_DIARIZATION and settings.ASSEMBLYAI_API_KEY
+        if job_id and settings.WHISPER_DISTRIBUTED_MIN_SECONDS and not diarization:
+            from modules.pcm_audio import audio_duration
+
+            if not audio_path:
+                audio_path = extract_audio_service(video_path, working_dir)["audio_file"]
+            if audio_duration(audio_path) > settings.WHISPER_DISTRIBUTED_MIN_SECONDS:
+                if progress_callback:
+                    progress_callback(step=1, message="Splitting audio for distributed transcription…")
+                raise _prepare_transcription_fanout(job_id, audio_path, working_dir, model_size, language)
 
         # Determine which transcription method to use
         tier = ""
@@ -65,7 +95,7 @@ def transcribe_video_service(
         if progress_callback:
             if settings.ENABLE_ASSEMBLYAI_DIARIZATION and settings.ASSEMBLYAI_API_KEY:
                 progress_callback(step=1, message=f"Transcribing [{tier}] - identifying speakers…")
-            elif is_whisper_model_cached(model_size):
+            elif is_whisper_model_cached(model_size, settings.WHISPER_BACKEND):
                 progress_callback(step=1, message=f"Transcribing [{tier}] (Whisper model already loaded)…")
             else:
                 progress_callback(
@@ -82,7 +112,13 @@ def transcribe_video_service(
             enable_assemblyai_diarization=settings.ENABLE_ASSEMBLYAI_DIARIZATION,
             assemblyai_api_key=settings.ASSEMBLYAI_API_KEY,
             assemblyai_language_code=settings.ASSEMBLYAI_LANGUAGE_CODE,
+            audio_path=audio_path,
+            chunk_seconds=settings.WHISPER_CHUNK_SECONDS,
+            chunk_workers=settings.WHISPER_CHUNK_WORKERS or None,
+            vad=settings.WHISPER_VAD,
+            backend=settings.WHISPER_BACKEND,
         )
+        publish_whisper_registry_stats(settings.REDIS_URL)
 
         if progress_callback:
             if settings.ENABLE_ASSEMBLYAI_DIARIZATION and settings.ASSEMBLYAI_API_KEY:
@@ -91,12 +127,102 @@ def transcribe_video_service(
                 msg = "Transcription + emotion analysis complete" if include_emotions else "Transcription complete"
                 progress_callback(step=1, message=msg)
 
+        vad_stats = None
+        regions_file = os.path.join(os.path.dirname(transcription_file), "speech_regions.json")
+        if settings.WHISPER_VAD and os.path.exists(regions_file):
+            with open(regions_file) as f:
+                stats = json.load(f)
+            vad_stats = {key: stats[key] for key in ("speech_ratio", "speech_seconds", "total_seconds")}
+
         return {
             "transcription_file": transcription_file,
             "emotions_file": emotions_file,
+            "vad": vad_stats,
         }
 
 
+def _prepare_transcription_fanout(
+    job_id: str,
+    audio_path: str,
+    working_dir: str,
+    model_size: str,
+    language: str | None,
+) -> TranscriptionDeferred:
+    """Split audio at silences, upload the chunks once and return the deferred dispatch."""
+    from app.services.storage import storage
+    from modules.chunked_transcription import detect_language, plan_audio_chunks, write_audio_chunks
+    from modules.pcm_audio import load_audio_16k
+    from modules.transcription import whisper_model
+
+    audio = load_audio_16k(audio_path)
+    chunks = plan_audio_chunks(audio, settings.WHISPER_CHUNK_SECONDS or 300)
+    # Detect once so every worker decodes the same language
+    if not language:
+        with whisper_model(model_size, settings.WHISPER_BACKEND) as model:
+            language = detect_language(model, audio)
+    paths = write_audio_chunks(audio, chunks, os.path.join(working_dir, "output/temp/transcription_chunks"))
+
+    descriptors = []
+    for chunk, path in zip(chunks, paths):
+        s3_key = f"jobs/{job_id}/transcription_chunks/{os.path.basename(path)}"
+        with open(path, "rb") as f:
+            storage.upload_file(s3_key, f)
+        descriptors.append({
+            "index": chunk["index"],
+            "key": s3_key,
+            "offset": chunk["offset"],
+            "keep_start": chunk["keep_start"],
+            "keep_end": chunk["keep_end"],
+        })
+
+    def dispatch():
+        from app.workers.tasks import dispatch_transcription_chunks
+
+        dispatch_transcription_chunks(job_id, descriptors, model_size, language)
+
+    return TranscriptionDeferred(len(descriptors), dispatch)
+
+
+def extract_audio_service(video_path: str, working_dir: str) -> dict:
+    """Decode the source audio once (16 kHz mono float32) for transcription, emotions and features.
+
+    Returns:
+        {"audio_file": path}
+    """
+    from modules.transcription import extract_audio
+
+    audio_file = os.path.join(working_dir, "output/original/extracted_audio.f32")
+    return {"audio_file": extract_audio(video_path, audio_file)}
+
+
+def analyze_emotions_service(
+    audio_path: str,
+    working_dir: str,
+    progress_callback: Callable | None = None,
+) -> dict:
+    """Run Google Cloud Speech emotion analysis on the extracted audio.
+
+    Returns:
+        {"emotions_file": path}
+    """
+    import json
+
+    from app.processing.emotion_analysis import analyze_audio_emotions
+
+    if progress_callback:
+        progress_callback(step=1, message="Analyzing audio emotions…")
+    emotions = analyze_audio_emotions(audio_path)
+
+    emotions_file = os.path.join(working_dir, "output/transcriptions/emotions.json")
+    os.makedirs(os.path.dirname(emotions_file), exist_ok=True)
+    with open(emotions_file, "w") as f:
+        json.dump(emotions, f, indent=2)
+
+    if progress_callback:
+        progress_callback(step=1, message="Emotion analysis complete")
+    return {"emotions_file": emotions_file}
+
+
 def translate_transcription_service(
     transcription_file: str,
     working_dir: str,
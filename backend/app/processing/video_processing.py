@@ -1,23 +1,14 @@
 import os
-from contextlib import contextmanager
 from typing import Callable
 
+from app.core import module_paths
+
 
-@contextmanager
 def patched_module_paths(working_dir: str):
     """Temporarily patch SCRIPT_DIR and get_output_path in modules.video_processing."""
     import modules.video_processing as mod
 
-    original_script_dir = mod.SCRIPT_DIR
-    original_get_output_path = mod.get_output_path
-
-    mod.SCRIPT_DIR = working_dir
-    mod.get_output_path = lambda rel: os.path.join(working_dir, rel)
-    try:
-        yield
-    finally:
-        mod.SCRIPT_DIR = original_script_dir
-        mod.get_output_path = original_get_output_path
+    return module_paths.patched_module_paths(mod, working_dir)
 
 
 def generate_recap_service(
@@ -26,6 +17,9 @@ def generate_recap_service(
     target_duration: int = 30,
     narration_language: str | None = None,
     emotions_file: str | None = None,
+    window_seconds: int = 900,
+    max_parallel_calls: int = 4,
+    prerank_coverage: float = 8.0,
     progress_callback: Callable | None = None,
 ) -> dict:
     """Wrap modules.video_processing.generate_recap_suggestions.
@@ -33,6 +27,9 @@ def generate_recap_service(
     Args:
         emotions_file: Optional path to emotions.json. If provided, clip selection
                       is weighted toward emotional intensity (PREMIUM tier feature).
+        window_seconds: Window length for long-form (map-reduce) clip planning; 0 = off.
+        max_parallel_calls: Window-level LLM calls in flight at once.
+        prerank_coverage: Transcript seconds kept per target second by local pre-ranking; 0 = off.
     """
     from modules.video_processing import generate_recap_suggestions
 
@@ -46,6 +43,9 @@ def generate_recap_service(
             output_dir="output/transcriptions",
             narration_language=narration_language,
             emotions_file=emotions_file,
+            window_seconds=window_seconds,
+            max_parallel_calls=max_parallel_calls,
+            prerank_coverage=prerank_coverage,
         )
         if progress_callback:
             progress_callback(step=3, message="Recap suggestions generated")
@@ -57,9 +57,17 @@ def extract_clips_service(
     recap_data_file: str,
     working_dir: str,
     target_duration: float = 30,
+    cut_mode: str = "reencode",
+    max_workers: int | None = None,
     progress_callback: Callable | None = None,
 ) -> dict:
-    """Wrap modules.video_processing.extract_and_merge_clips."""
+    """Wrap modules.video_processing.extract_and_merge_clips.
+
+    Args:
+        cut_mode: "smart" (keyframe-aware stream copy), "parallel" (per-clip
+                  encodes on a process pool) or "reencode" (moviepy).
+        max_workers: Pool size for parallel clip encoding (None = CPU count).
+    """
     from modules.video_processing import extract_and_merge_clips
 
     with patched_module_paths(working_dir):
@@ -70,6 +78,8 @@ def extract_clips_service(
             recap_data_file,
             target_duration=target_duration,
             output_dir="output/videos",
+            cut_mode=cut_mode,
+            max_workers=max_workers,
         )
         if progress_callback:
             progress_callback(step=5, message="Clips extracted and merged")
@@ -91,3 +101,30 @@ def remove_audio_service(
         if progress_callback:
             progress_callback(step=6, message="Audio removed")
         return {"no_audio_video_file": result_path}
+
+
+def render_recap_service(
+    video_path: str,
+    recap_data_file: str,
+    audio_path: str,
+    working_dir: str,
+    target_duration: float = 30,
+    max_duration_seconds: float | None = None,
+    progress_callback: Callable | None = None,
+) -> dict:
+    """Wrap modules.ffmpeg_render.render_recap_video (steps 5-7 in one ffmpeg run)."""
+    from modules.ffmpeg_render import render_recap_video
+
+    if progress_callback:
+        progress_callback(step=5, message="Rendering recap in a single ffmpeg pass...")
+    result_path = render_recap_video(
+        video_path,
+        recap_data_file,
+        audio_path,
+        target_duration=target_duration,
+        max_duration_seconds=max_duration_seconds,
+        output_path=os.path.join(working_dir, "output/videos/recap_video_with_narration.mp4"),
+    )
+    if progress_callback:
+        progress_callback(step=7, message="Final video ready")
+    return {"final_video_file": result_path}
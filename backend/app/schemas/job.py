@@ -34,6 +34,19 @@ class CreateJobRequest(BaseModel):
     config: JobConfig = JobConfig()
 
 
+class CreateVariantRequest(BaseModel):
+    """Config changes for a variant of a completed job; unset fields keep the parent's value."""
+    target_duration: int | None = Field(default=None, ge=10, le=120)
+    tts_voice: str | None = None
+    tts_model: str | None = None
+    translate_to: str | None = None
+    pad_with_black: bool | None = None
+    include_emotions: bool | None = None
+
+    def apply_to(self, parent_config: dict) -> JobConfig:
+        return JobConfig(**{**parent_config, **self.model_dump(exclude_unset=True)})
+
+
 class JobResponse(BaseModel):
     id: str
     user_id: str
@@ -56,6 +69,7 @@ class JobResponse(BaseModel):
     output_video_key: str | None = None  # S3 key for final output (if completed)
     intermediate_keys: dict | None = None  # Raw S3 keys dict
     intermediate_keys_detailed: dict[str, IntermediateFile] | None = None  # With metadata and download URLs
+    parent_job_id: str | None = None  # Job whose artifacts this variant reuses
 
     model_config = {"from_attributes": True}
 
@@ -156,4 +170,5 @@ def job_to_response(job: RecapJob) -> JobResponse:
         output_video_key=job.output_video_key,
         intermediate_keys=job.intermediate_keys,
         intermediate_keys_detailed=intermediate_keys_detailed,
+        parent_job_id=getattr(job, 'parent_job_id', None),
     )
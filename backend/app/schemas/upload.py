@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class UploadResponse(BaseModel):
@@ -6,3 +6,59 @@ class UploadResponse(BaseModel):
     s3_key: str
     filename: str
     size: int
+    sha256: str | None = None
+    # True when an identical earlier upload was returned instead of storing a new copy
+    deduplicated: bool = False
+
+
+SHA256_PATTERN = r"^[0-9a-fA-F]{64}$"
+
+
+class InitiateUploadSessionRequest(BaseModel):
+    filename: str
+    size: int = Field(gt=0)
+    # Declared content hash; a matching earlier upload is returned without transferring bytes
+    sha256: str | None = Field(default=None, pattern=SHA256_PATTERN)
+
+
+class UploadSessionResponse(BaseModel):
+    """A resumable direct-to-storage upload: PUT each part to its presigned URL, then complete."""
+    upload_id: str
+    s3_key: str
+    multipart_upload_id: str | None = None  # None when deduplicated: nothing to upload
+    part_size: int
+    part_count: int
+    deduplicated: bool = False
+
+
+class UploadSessionRef(BaseModel):
+    s3_key: str
+    multipart_upload_id: str
+
+
+class CompleteUploadSessionRequest(UploadSessionRef):
+    sha256: str | None = Field(default=None, pattern=SHA256_PATTERN)
+
+
+class PresignPartsRequest(UploadSessionRef):
+    part_numbers: list[int] = Field(min_length=1, max_length=1000)
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class PresignPartsResponse(BaseModel):
+    parts: list[PresignedPart]
+    expires_in: int
+
+
+class UploadedPart(BaseModel):
+    part_number: int
+    etag: str
+    size: int
+
+
+class UploadedPartsResponse(BaseModel):
+    parts: list[UploadedPart]
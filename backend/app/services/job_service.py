@@ -1,6 +1,11 @@
+import os
+import uuid
+
 from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
+from app.db.base import generate_uuid
 from app.models.job import RecapJob
 from app.schemas.job import JobConfig
 
@@ -13,6 +18,9 @@ async def create_job(
     original_filename: str,
     file_size_bytes: int,
 ) -> RecapJob:
+    from app.services import upload_service
+
+    await upload_service.retain(db, s3_key)
     job = RecapJob(
         user_id=user_id,
         input_video_key=s3_key,
@@ -27,6 +35,60 @@ async def create_job(
     return job
 
 
+async def create_variant_job(db: AsyncSession, parent: RecapJob, config: JobConfig) -> RecapJob:
+    """Create a job that re-renders a completed job with a changed config.
+
+    An indexed source video is shared with the parent (reference counted); every
+    other object the variant reuses is server-side copied to keys it owns, so
+    deleting either job never removes the other's objects.
+
+    Returns:
+        The variant job; its intermediate_keys hold the reused artifacts
+    """
+    from app.services import upload_service
+    from app.services.storage import storage
+    from app.workers.pipeline import plan_variant
+
+    variant_config = config.model_dump()
+    reused = plan_variant(parent.config or {}, variant_config, parent.intermediate_keys or {})
+
+    variant_id = generate_uuid()
+    copies = {}
+    if await upload_service.retain(db, parent.input_video_key):
+        source_key = parent.input_video_key
+    else:
+        source_key = f"uploads/{parent.user_id}/{uuid.uuid4()}/{os.path.basename(parent.input_video_key)}"
+        copies[source_key] = parent.input_video_key
+    intermediate_keys = {}
+    for name in reused:
+        parent_key = parent.intermediate_keys[name]
+        key = f"jobs/{variant_id}/{name}/{os.path.basename(parent_key)}"
+        copies[key] = parent_key
+        intermediate_keys[name] = key
+
+    def copy_objects():
+        for dest_key, src_key in copies.items():
+            storage.copy_file(src_key, dest_key)
+
+    await run_in_threadpool(copy_objects)
+
+    job = RecapJob(
+        id=variant_id,
+        user_id=parent.user_id,
+        parent_job_id=parent.id,
+        input_video_key=source_key,
+        config=variant_config,
+        original_filename=parent.original_filename,
+        file_size_bytes=parent.file_size_bytes,
+        intermediate_keys=intermediate_keys or None,
+        status="pending",
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
 async def get_job(db: AsyncSession, job_id: str, user_id: str) -> RecapJob | None:
     result = await db.execute(
         select(RecapJob).where(RecapJob.id == job_id, RecapJob.user_id == user_id)
@@ -71,9 +133,11 @@ async def delete_job(db: AsyncSession, job_id: str, user_id: str) -> bool:
         celery_app.control.revoke(job.celery_task_id, terminate=True)
 
     # Delete S3 files
+    from app.services import upload_service
     from app.services.storage import storage
     keys_to_delete = []
-    if job.input_video_key:
+    # The source may be shared with other jobs of this user (content-hash dedup)
+    if job.input_video_key and await upload_service.release(db, job.input_video_key):
         keys_to_delete.append(job.input_video_key)
     if job.output_video_key:
         keys_to_delete.append(job.output_video_key)
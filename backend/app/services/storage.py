@@ -1,6 +1,14 @@
 import logging
 import mimetypes
+import os
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.config import settings
@@ -38,36 +46,167 @@ def _guess_content_type(key: str) -> str:
     return guessed or "application/octet-stream"
 
 
+# delete_objects accepts at most this many keys per request
+_DELETE_BATCH = 1000
+
+
+class _ByteCounter:
+    """Thread-safe boto3 transfer Callback (parts arrive on several threads)."""
+
+    def __init__(self):
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, n: int) -> None:
+        with self._lock:
+            self.bytes += n
+
+
+def _log_throughput(action: str, key: str, nbytes: int, started: float) -> None:
+    seconds = max(time.monotonic() - started, 1e-6)
+    mb = nbytes / (1024 * 1024)
+    logger.info(f"✅ {action} S3: {key} ({mb:.1f} MB in {seconds:.2f}s, {mb / seconds:.1f} MB/s)")
+
+
 class StorageService:
     def __init__(self):
+        concurrency = max(settings.S3_TRANSFER_CONCURRENCY, 1)
+        batch_workers = max(settings.S3_BATCH_WORKERS, 1)
+        # Enough pooled connections for every part of every transfer in a batch to run at
+        # once, plus headroom for the single requests (head/put/delete) issued meanwhile
         self.client = boto3.client(
             "s3",
             endpoint_url=settings.S3_ENDPOINT,
             aws_access_key_id=settings.S3_ACCESS_KEY,
             aws_secret_access_key=settings.S3_SECRET_KEY,
             region_name=settings.S3_REGION,
+            config=Config(
+                max_pool_connections=concurrency * batch_workers + 10,
+                retries={"max_attempts": 5, "mode": "standard"},
+            ),
         )
         self.bucket = settings.S3_BUCKET
+        part_size = max(settings.S3_TRANSFER_PART_SIZE_MB, 5) * 1024 * 1024
+        self.transfer_config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=concurrency,
+            use_threads=True,
+        )
+        self.batch_workers = batch_workers
 
     def upload_file(self, key: str, file_obj) -> None:
         try:
             content_type = _guess_content_type(key)
+            counter = _ByteCounter()
+            started = time.monotonic()
             self.client.upload_fileobj(
                 file_obj,
                 self.bucket,
                 key,
                 ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config,
+                Callback=counter,
             )
-            logger.info(f"✅ Uploaded S3: {key} ({content_type})")
+            _log_throughput(f"Uploaded ({content_type})", key, counter.bytes, started)
         except Exception as e:
             logger.error(f"❌ Failed to upload S3 {key}: {str(e)}", exc_info=True)
             raise
 
+    def upload_files(self, files: dict[str, str]) -> None:
+        """Upload {key: local_path, ...} concurrently; raises the first failure after all finish."""
+        def upload(key, path):
+            with open(path, "rb") as f:
+                self.upload_file(key, f)
+
+        self._run_batch("Uploaded", upload, files)
+
+    def download_files(self, files: dict[str, str]) -> None:
+        """Download {key: dest_path, ...} concurrently; raises the first failure after all finish."""
+        self._run_batch("Downloaded", self.download_file, files)
+
+    def _run_batch(self, action: str, transfer, files: dict[str, str]) -> None:
+        if not files:
+            return
+        if len(files) == 1:
+            transfer(*next(iter(files.items())))
+            return
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(files))) as pool:
+            futures = [pool.submit(transfer, key, path) for key, path in files.items()]
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            raise errors[0]
+        nbytes = sum(os.path.getsize(path) for path in files.values() if os.path.exists(path))
+        _log_throughput(action, f"batch of {len(files)} objects", nbytes, started)
+
     def upload_bytes(self, key: str, data: bytes, content_type: str = "application/octet-stream") -> None:
         self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
 
     def download_file(self, key: str, dest_path: str) -> None:
-        self.client.download_file(self.bucket, key, dest_path)
+        counter = _ByteCounter()
+        started = time.monotonic()
+        self.client.download_file(self.bucket, key, dest_path, Config=self.transfer_config, Callback=counter)
+        _log_throughput("Downloaded", key, counter.bytes, started)
+
+    def create_multipart_upload(self, key: str) -> str:
+        """Start a multipart upload; returns the S3 UploadId."""
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket, Key=key, ContentType=_guess_content_type(key),
+        )
+        return response["UploadId"]
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, data: bytes) -> str:
+        """Upload one part (>= 5 MB except the last); returns its ETag."""
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=data,
+        )
+        return response["ETag"]
+
+    def complete_multipart_upload(self, key: str, upload_id: str, parts: list[dict]) -> None:
+        """Assemble the object from [{"PartNumber": n, "ETag": etag}, ...]."""
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket, Key=key, UploadId=upload_id,
+            MultipartUpload={"Parts": sorted(parts, key=lambda p: p["PartNumber"])},
+        )
+        logger.info(f"✅ Uploaded S3 (multipart, {len(parts)} parts): {key}")
+
+    def generate_presigned_part_url(self, key: str, upload_id: str, part_number: int,
+                                    expires_in: int = 3600) -> str:
+        """Presigned PUT URL for one part, so clients upload straight to S3."""
+        url = self.client.generate_presigned_url(
+            "upload_part",
+            Params={"Bucket": self.bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+            ExpiresIn=expires_in,
+        )
+        if settings.S3_PUBLIC_ENDPOINT:
+            url = url.replace(settings.S3_ENDPOINT, settings.S3_PUBLIC_ENDPOINT, 1)
+        return url
+
+    def list_parts(self, key: str, upload_id: str) -> list[dict]:
+        """Parts stored so far: [{"PartNumber", "ETag", "Size"}, ...] in part order."""
+        parts = []
+        paginator = self.client.get_paginator("list_parts")
+        for page in paginator.paginate(Bucket=self.bucket, Key=key, UploadId=upload_id):
+            parts.extend(
+                {"PartNumber": p["PartNumber"], "ETag": p["ETag"], "Size": p["Size"]}
+                for p in page.get("Parts", [])
+            )
+        return parts
+
+    def object_size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        """Discard an unfinished multipart upload and its stored parts."""
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+        except Exception as e:
+            logger.warning(f"Could not abort multipart upload {upload_id} for {key}: {e}")
+
+    def copy_file(self, source_key: str, dest_key: str) -> None:
+        """Server-side copy within the bucket (multipart for large objects); no data leaves S3."""
+        self.client.copy({"Bucket": self.bucket, "Key": source_key}, self.bucket, dest_key)
 
     def generate_presigned_url(self, key: str, expires_in: int = 3600) -> str:
         url = self.client.generate_presigned_url(
@@ -83,13 +222,25 @@ class StorageService:
         self.client.delete_object(Bucket=self.bucket, Key=key)
 
     def delete_files(self, keys: list[str]) -> None:
-        if not keys:
-            return
-        objects = [{"Key": k} for k in keys]
-        self.client.delete_objects(
-            Bucket=self.bucket,
-            Delete={"Objects": objects},
-        )
+        # Aliased artifacts list the same object under several names
+        keys = list(dict.fromkeys(keys))
+        for start in range(0, len(keys), _DELETE_BATCH):
+            objects = [{"Key": k} for k in keys[start:start + _DELETE_BATCH]]
+            response = self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": objects, "Quiet": True},
+            )
+            for error in response.get("Errors", []):
+                logger.warning(f"Could not delete S3 {error.get('Key')}: {error.get('Message')}")
+
+    def list_objects(self, prefix: str) -> list[tuple[str, datetime]]:
+        """(key, last modified) of every object under prefix."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        return [
+            (obj["Key"], obj["LastModified"])
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
 
     def file_exists(self, key: str) -> bool:
         try:
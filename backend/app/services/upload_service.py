@@ -0,0 +1,119 @@
+"""Content-hash index and reference counts for uploaded source videos.
+
+Uploads with a known SHA-256 are indexed per user, so re-uploading the same video
+returns the existing s3_key instead of storing a second copy. ref_count counts the
+jobs whose input_video_key points at the object; callers delete the object only
+when release() reports the last reference is gone.
+
+Keys without a row (uploaded before the index existed) belong to a single job and
+are deleted on release, as before.
+"""
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.upload import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+async def find_by_hash(db: AsyncSession, user_id: str, sha256: str) -> StoredUpload | None:
+    """Indexed upload of this user with this content, if its object still exists."""
+    from app.services.storage import storage
+
+    result = await db.execute(
+        select(StoredUpload).where(StoredUpload.user_id == user_id, StoredUpload.sha256 == sha256.lower())
+    )
+    upload = result.scalar_one_or_none()
+    if upload and not await run_in_threadpool(storage.file_exists, upload.s3_key):
+        # Object removed outside the app (lifecycle rule, manual cleanup). Jobs still
+        # holding a reference keep the row; their release() drops it.
+        if upload.ref_count > 0:
+            logger.warning(
+                f"Indexed upload {upload.s3_key} is missing from storage but used by "
+                f"{upload.ref_count} job(s); not deduplicating against it"
+            )
+        else:
+            await db.delete(upload)
+            await db.commit()
+        return None
+    return upload
+
+
+async def register(db: AsyncSession, user_id: str, s3_key: str, sha256: str | None, size_bytes: int,
+                   verified: bool = False) -> None:
+    """Index a freshly stored upload (no jobs reference it yet).
+
+    verified: the server computed sha256 from the bytes (not client-declared).
+    """
+    db.add(StoredUpload(
+        s3_key=s3_key, user_id=user_id, sha256=sha256.lower() if sha256 else None, size_bytes=size_bytes,
+        sha256_verified=verified and bool(sha256),
+    ))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content won the hash; keep this one refcounted, unhashed
+        await db.rollback()
+        db.add(StoredUpload(s3_key=s3_key, user_id=user_id, sha256=None, size_bytes=size_bytes))
+        await db.commit()
+
+
+async def retain(db: AsyncSession, s3_key: str) -> bool:
+    """Count one more job using s3_key. Returns False if the key is not indexed."""
+    upload = await db.get(StoredUpload, s3_key, with_for_update=True)
+    if upload is None:
+        return False
+    upload.ref_count += 1
+    return True
+
+
+async def forget(db: AsyncSession, s3_key: str) -> None:
+    """Drop the index row of an upload that is being deleted."""
+    upload = await db.get(StoredUpload, s3_key)
+    if upload is not None:
+        await db.delete(upload)
+        await db.commit()
+
+
+async def is_retained(db: AsyncSession, s3_key: str) -> bool:
+    upload = await db.get(StoredUpload, s3_key)
+    return upload is not None and upload.ref_count > 0
+
+
+async def release(db: AsyncSession, s3_key: str) -> bool:
+    """Drop one job's reference. Returns True when the caller should delete the object."""
+    upload = await db.get(StoredUpload, s3_key, with_for_update=True)
+    if upload is None:
+        return True
+    upload.ref_count -= 1
+    if upload.ref_count > 0:
+        return False
+    await db.delete(upload)
+    return True
+
+
+def verified_hash_sync(session: Session, s3_key: str) -> str | None:
+    """Server-computed SHA-256 of an upload, if indexed.
+
+    Client-declared hashes are not returned: step memos are shared across
+    users, so they may only be keyed on content the server has hashed.
+    """
+    upload = session.get(StoredUpload, s3_key)
+    return upload.sha256 if upload is not None and upload.sha256_verified else None
+
+
+def release_sync(session: Session, s3_key: str) -> bool:
+    """release() for Celery workers' synchronous sessions."""
+    upload = session.get(StoredUpload, s3_key, with_for_update=True)
+    if upload is None:
+        return True
+    upload.ref_count -= 1
+    if upload.ref_count > 0:
+        return False
+    session.delete(upload)
+    return True
@@ -21,14 +21,25 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,
     task_routes={
         "app.workers.tasks.process_recap_job": {"queue": "processing"},
+        "app.workers.tasks.transcribe_audio_chunk": {"queue": "processing"},
+        "app.workers.tasks.merge_transcription_chunks": {"queue": "processing"},
+        "app.workers.tasks.transcription_fanout_failed": {"queue": "processing"},
         "app.workers.tasks.cleanup_expired_files": {"queue": "maintenance"},
+        "app.workers.tasks.cleanup_expired_memos": {"queue": "maintenance"},
     },
     beat_schedule={
         "cleanup-expired-files": {
             "task": "app.workers.tasks.cleanup_expired_files",
             "schedule": crontab(hour="*/6", minute=0),  # Every 6 hours
         },
+        "cleanup-expired-memos": {
+            "task": "app.workers.tasks.cleanup_expired_memos",
+            "schedule": crontab(hour=3, minute=30),  # Daily
+        },
     },
 )
 
 celery_app.autodiscover_tasks(["app.workers"])
+
+# Worker boot hooks (Whisper preload, torch thread sizing)
+import app.workers.warmup  # noqa: E402,F401
@@ -1,24 +1,120 @@
+import json
 import logging
 import os
 import shutil
 import tempfile
+import threading
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import select
 
+from app.core.artifact_uploader import ArtifactUploader
+from app.core.step_memo import StepMemo, file_sha256
 from app.core.step_storage import StepStorage
 from app.processing.audio_processing import generate_tts_service, merge_audio_video_service
+from app.processing.llm_cache import sync_llm_cache
 from app.processing.progress import ProgressReporter
-from app.processing.transcription import transcribe_video_service, translate_transcription_service
-from app.processing.video_processing import extract_clips_service, generate_recap_service, remove_audio_service
+from app.processing.transcription import (
+    TranscriptionDeferred,
+    analyze_emotions_service,
+    extract_audio_service,
+    transcribe_video_service,
+    translate_transcription_service,
+)
+from app.processing.video_processing import (
+    extract_clips_service,
+    generate_recap_service,
+    remove_audio_service,
+    render_recap_service,
+)
 from app.config import settings
+from app.prompts.narration_prompts import ACTIVE_PROMPT_VERSION
 from app.services.storage import storage
+from app.workers.step_graph import PipelineStep, StepGraph
 
 logger = logging.getLogger(__name__)
 
+# Part of the recap memo fingerprint. Bump when the clip-selection prompts or
+# the selection logic in modules.video_processing change what a recap contains.
+RECAP_PROMPT_VERSION = 2
+
+# Steps keyed on the source video's hash: they download it only when their memo misses
+_SOURCE_AFTER_MEMO = {"transcribe", "emotions"}
+
+# Persisted artifacts: intermediate_keys name → local path (relative to the working dir)
+# the artifact is restored to when a resumed job needs it.
+RESTORABLE_ARTIFACTS = {
+    "transcription": "output/transcriptions/transcription.json",
+    "translation": "output/transcriptions/translated.json",
+    "emotions": "output/transcriptions/emotions.json",
+    "recap_data": "output/transcriptions/recap_data.json",
+    "tts_audio": "output/audio/recap_narration.mp3",
+    "recap_video": "output/videos/recap_video.mp4",
+}
+
+# Job config fields each persisted artifact depends on, directly or through the
+# artifacts it is derived from. A variant job reuses an artifact of its parent
+# only when none of these fields changed.
+_TRANSCRIPT_FIELDS = ("whisper_model", "language")
+_RECAP_FIELDS = _TRANSCRIPT_FIELDS + ("translate_to", "include_emotions", "target_duration")
+ARTIFACT_CONFIG_FIELDS = {
+    "transcription": _TRANSCRIPT_FIELDS,
+    "emotions": ("include_emotions",),
+    "translation": _TRANSCRIPT_FIELDS + ("translate_to",),
+    "recap_data": _RECAP_FIELDS,
+    "tts_audio": _RECAP_FIELDS + ("tts_voice", "tts_model"),
+    "recap_video": _RECAP_FIELDS,
+}
+
+
+def plan_variant(parent_config: dict, variant_config: dict, parent_keys: dict) -> list[str]:
+    """Decide which of a parent job's artifacts a variant can reuse.
+
+    The variant's run plans from its intermediate_keys like any resumed job,
+    so the carried-over artifacts alone decide which steps are skipped.
+
+    Returns:
+        Sorted artifact names to carry over (empty = full run)
+    """
+    def unchanged(name: str) -> bool:
+        return all(parent_config.get(f) == variant_config.get(f) for f in ARTIFACT_CONFIG_FIELDS[name])
+
+    needed = ["transcription", "recap_data", "tts_audio", "recap_video"]
+    if variant_config.get("translate_to"):
+        needed.append("translation")
+    if variant_config.get("include_emotions"):
+        needed.append("emotions")
+
+    return sorted(name for name in needed if name in parent_keys and unchanged(name))
+
+
+def delete_input_on_complete() -> bool:
+    """Whether a completed job drops its original upload right away.
+
+    Variants re-render from the parent's source; deployments that offer them
+    turn on KEEP_INPUT_VIDEO_FOR_VARIANTS to keep it until the job expires.
+    """
+    return settings.DELETE_INPUT_VIDEO_ON_COMPLETE and not settings.KEEP_INPUT_VIDEO_FOR_VARIANTS
+
+
+# Progress message for a step whose outputs were restored instead of recomputed.
+CACHED_MESSAGES = {
+    "transcribe": "Transcription (cached)",
+    "translate": "Translation (cached)",
+    "recap": "Recap (cached)",
+    "tts": "TTS narration (cached)",
+    "clips": "Clips (cached)",
+}
+
 
 class RecapPipeline:
-    """Orchestrates the 7-step video recap pipeline with S3 integration."""
+    """Orchestrates the 7-step video recap pipeline with S3 integration.
+
+    Steps are declared as a dependency graph (see app.workers.step_graph) so that
+    independent work — emotion analysis next to Whisper, TTS next to clip
+    extraction — runs concurrently, and a resumed job only reruns the steps whose
+    outputs are missing from intermediate_keys.
+    """
 
     def __init__(self, job_id: str, job_config: dict, input_video_key: str | None,
                  update_job_fn=None, publish_progress_fn=None):
@@ -28,10 +124,27 @@ class RecapPipeline:
         self.update_job_fn = update_job_fn
         self.working_dir = None
         self.step_storage = StepStorage(job_id, storage)
+        # Step outputs upload in the background; keys are recorded once durable
+        self.uploader = ArtifactUploader(settings.ARTIFACT_UPLOAD_WORKERS)
 
         reporter_callback = publish_progress_fn or (lambda **kw: None)
         self.progress = ProgressReporter(reporter_callback)
 
+        # Shared between concurrently running steps; guarded by _lock
+        self._lock = threading.Lock()
+        # Serializes the one-time audio decode shared by transcribe and emotions
+        self._audio_lock = threading.Lock()
+        self.intermediate_keys: dict = {}
+        self.artifacts: dict[str, str] = {}
+        self.actual_audio_duration: float | None = None
+        self.render_engine = "moviepy"
+        # Cross-job step memoization (set up in run() once the working dir exists)
+        self.memo: StepMemo | None = None
+        self._content_hashes: dict[str, str] = {}
+        # Persisted artifacts the planned steps read: name → (S3 key, local path); fetched on demand
+        self._remote: dict[str, tuple[str, str]] = {}
+        self._fetching: dict[str, threading.Event] = {}
+
     def _setup_working_dir(self) -> str:
         working_dir = tempfile.mkdtemp(prefix=f"recap_{self.job_id}_")
         for subdir in [
@@ -52,14 +165,27 @@ class RecapPipeline:
         if self.update_job_fn:
             self.update_job_fn(self.job_id, **kwargs)
 
-    def _upload_intermediate(self, keys_dict: dict, name: str, local_path: str):
-        if not os.path.exists(local_path):
-            return
-        s3_key = f"jobs/{self.job_id}/{name}/{os.path.basename(local_path)}"
-        with open(local_path, "rb") as f:
-            storage.upload_file(s3_key, f)
-        keys_dict[name] = s3_key
-        self._update_job(intermediate_keys=dict(keys_dict))
+    def _release_input(self, input_key: str) -> bool:
+        """Drop this job's reference to its source; True if no other job uses it."""
+        from app.services.upload_service import release_sync
+        from app.workers.tasks import SyncSession
+        with SyncSession() as session:
+            last = release_sync(session, input_key)
+            session.commit()
+        return last
+
+    def _start_step(self, step_num: int, step_name: str, message: str):
+        self._update_job(current_step=step_num, current_step_name=step_name)
+        self.progress.report(step_num, message, 0.0)
+
+    def _upload_step_output(self, **kwargs):
+        """Queue step_storage.upload_step_output(**kwargs); its keys are added once uploaded."""
+        self.uploader.submit(lambda: self.step_storage.upload_step_output(**kwargs), on_durable=self._add_step_keys)
+
+    def _add_step_keys(self, step_keys: dict):
+        with self._lock:
+            self.intermediate_keys.update(step_keys)
+            self._update_job(intermediate_keys=dict(self.intermediate_keys))
 
     def _get_file_metrics(self, local_path: str) -> dict:
         """Extract metrics from intermediate file for logging."""
@@ -72,7 +198,6 @@ class RecapPipeline:
         # Parse JSON files for additional metrics
         if local_path.endswith(".json"):
             try:
-                import json
                 with open(local_path, "r") as f:
                     data = json.load(f)
                 if isinstance(data, list):
@@ -91,449 +216,694 @@ class RecapPipeline:
 
         return metrics
 
-    def _download_intermediate(self, keys_dict: dict, name: str, local_path: str) -> str | None:
-        """Download a previously saved intermediate artifact from S3."""
-        s3_key = keys_dict.get(name)
-        if not s3_key:
-            return None
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-        storage.download_file(s3_key, local_path)
-        logger.info(f"Restored intermediate '{name}' from S3 → {local_path}")
-        return local_path
-
-    def run(self, resume_from_step: int = 0, existing_intermediate_keys: dict | None = None):
-        working_dir = self._setup_working_dir()
-        intermediate_keys = dict(existing_intermediate_keys or {})
+    def _register_remote(self, restore: set[str]) -> None:
+        """Note where each artifact the planned steps read can be fetched from (nothing is downloaded yet)."""
+        self._remote = {}
+        for name in restore:
+            if name == "source_video":
+                if not self.input_video_key:
+                    raise ValueError(
+                        "Original upload is no longer in storage and cannot be used to continue processing."
+                    )
+                local_path = os.path.join(self.working_dir, os.path.basename(self.input_video_key))
+                self._remote[name] = (self.input_video_key, local_path)
+            elif name in RESTORABLE_ARTIFACTS and self.intermediate_keys.get(name):
+                local_path = os.path.join(self.working_dir, RESTORABLE_ARTIFACTS[name])
+                self._remote[name] = (self.intermediate_keys[name], local_path)
+
+    def _materialize(self, step: PipelineStep) -> None:
+        """Fetch the step's persisted inputs that are not local yet, in parallel.
+
+        Runs right before the step, so a resumed job only downloads what the steps
+        it actually reruns read (no multi-GB source for a late-step resume). Steps
+        in _SOURCE_AFTER_MEMO fetch the source video themselves, on a memo miss.
+        """
+        names = [n for n in (*step.inputs, *step.optional_inputs)
+                 if not (n == "source_video" and step.name in _SOURCE_AFTER_MEMO)]
+        self._fetch(names, step.step_num, step.name)
+
+    def _source_video(self, step_num: int, step_name: str) -> str:
+        """Local path of the source video, downloading it on first use."""
+        self._fetch(["source_video"], step_num, step_name)
+        return self.artifacts["source_video"]
+
+    def _fetch(self, names: list[str], step_num: int, step_name: str) -> None:
+        """Download the named remote artifacts that are not local yet.
+
+        An artifact another step is already fetching is waited for, not re-downloaded.
+        """
+        names = [n for n in names if n in self._remote]
+        with self._lock:
+            wanted = [n for n in names if n not in self.artifacts]
+            owned = [n for n in wanted if n not in self._fetching]
+            for name in owned:
+                self._fetching[name] = threading.Event()
+            waiting = [self._fetching[n] for n in wanted if n not in owned]
 
         try:
-            if not self.input_video_key:
-                raise ValueError(
-                    "Original upload is no longer in storage and cannot be used to continue processing."
-                )
-
-            # Always download input video
-            self._update_job(status="processing", current_step=0, current_step_name="Downloading video")
-            self.progress.report(0, "Downloading video from storage...", 0.0)
-            video_filename = os.path.basename(self.input_video_key)
-            local_video_path = os.path.join(working_dir, video_filename)
-            storage.download_file(self.input_video_key, local_video_path)
-
-            target_duration = self.config.get("target_duration", 30)
-            model_size = self.config.get("whisper_model", "small")
-            language = self.config.get("language")
-            translate_to = self.config.get("translate_to")
-            tts_model = self.config.get("tts_model", "tts-1")
-            tts_voice = self.config.get("tts_voice", "nova")
-            include_emotions = self.config.get("include_emotions", False)
-
-            # --- Restore intermediates needed for resumption ---
-            transcription_file = None
-            active_transcription = None
-            emotions_file = None
-            recap_data_file = None
-            recap_text_file = os.path.join(working_dir, "output/transcriptions/recap_text.txt")
-            tts_audio_file = None
-            actual_audio_duration = None
-            recap_video_file = None
-            no_audio_video = None
-
-            if resume_from_step >= 2:
-                if "translation" in intermediate_keys:
-                    active_transcription = self._download_intermediate(
-                        intermediate_keys, "translation",
-                        os.path.join(working_dir, "output/transcriptions/translated.json"))
-                if not active_transcription and "transcription" in intermediate_keys:
-                    active_transcription = self._download_intermediate(
-                        intermediate_keys, "transcription",
-                        os.path.join(working_dir, "output/transcriptions/transcription.json"))
-                transcription_file = active_transcription
-                # Also restore emotions if they were analyzed
-                if include_emotions and "emotions" in intermediate_keys:
-                    emotions_file = self._download_intermediate(
-                        intermediate_keys, "emotions",
-                        os.path.join(working_dir, "output/transcriptions/emotions.json"))
-
-            if resume_from_step >= 4 and "recap_data" in intermediate_keys:
-                recap_data_file = self._download_intermediate(
-                    intermediate_keys, "recap_data",
-                    os.path.join(working_dir, "output/transcriptions/recap_data.json"))
-                if recap_data_file:
-                    import json as _json
-                    with open(recap_data_file) as f:
-                        _recap = _json.load(f)
-                    with open(recap_text_file, "w") as f:
-                        f.write(_recap.get("recap_text", ""))
-
-            if resume_from_step >= 5 and "tts_audio" in intermediate_keys:
-                tts_audio_file = self._download_intermediate(
-                    intermediate_keys, "tts_audio",
-                    os.path.join(working_dir, "output/audio/recap_narration.mp3"))
-                if tts_audio_file:
-                    from pydub import AudioSegment
-                    audio_seg = AudioSegment.from_mp3(tts_audio_file)
-                    actual_audio_duration = len(audio_seg) / 1000.0
-                    logger.info(f"Restored TTS audio duration: {actual_audio_duration:.1f}s")
-
-            if resume_from_step >= 6 and "recap_video" in intermediate_keys:
-                recap_video_file = self._download_intermediate(
-                    intermediate_keys, "recap_video",
-                    os.path.join(working_dir, "output/videos/recap_video.mp4"))
-
-            if resume_from_step >= 7:
-                if recap_video_file:
-                    no_audio_video_path = os.path.join(working_dir, "output/videos/recap_video_no_audio.mp4")
-                    no_audio_video = no_audio_video_path
-
-            if resume_from_step > 0:
-                logger.info(f"Resuming job {self.job_id} from step {resume_from_step}")
-
-            # Step 1: Transcribe (+ emotions if PREMIUM tier)
-            emotion_analysis_status = None
-            emotion_analysis_error = None
-            if resume_from_step <= 1:
-                self._update_job(current_step=1, current_step_name="Transcribing video")
-                self.progress.report(1, "Starting transcription...", 0.0)
-                result = transcribe_video_service(
-                    local_video_path, working_dir,
-                    model_size=model_size, language=language,
-                    include_emotions=include_emotions,
-                    progress_callback=self._progress_callback,
-                )
-                transcription_file = result["transcription_file"]
-                emotions_file = result.get("emotions_file")  # None for BASIC tier, path for PREMIUM
-                active_transcription = transcription_file
-
-                # Upload step outputs
-                files_to_upload = {"transcript": transcription_file}
-                if emotions_file:
-                    files_to_upload["emotions"] = emotions_file
-                step_keys = self.step_storage.upload_step_output(
-                    step_num=1,
-                    files_dict=files_to_upload,
-                    metadata={"model": model_size, "language": language, "include_emotions": include_emotions}
-                )
-                intermediate_keys.update(step_keys)
-                self._upload_intermediate(intermediate_keys, "transcription", transcription_file)
-
-                # Track emotion analysis status
-                if include_emotions:
-                    if emotions_file:
-                        emotion_analysis_status = "completed"
-                        self._upload_intermediate(intermediate_keys, "emotions", emotions_file)
-                        logger.info(f"✅ Emotion analysis completed: {emotions_file}")
-                    else:
-                        emotion_analysis_status = "failed"
-                        emotion_analysis_error = "Google Cloud Speech API error. Check logs for details."
-                        logger.warning(f"❌ Emotion analysis failed for job {self.job_id}. Continuing with basic transcription.")
-                else:
-                    emotion_analysis_status = "skipped"
-
-                self._update_job(
-                    emotion_analysis_status=emotion_analysis_status,
-                    emotion_analysis_error=emotion_analysis_error
-                )
+            if owned:
+                if "source_video" in owned:
+                    self._update_job(current_step_name="Downloading video")
+                    self.progress.report(step_num, "Downloading video from storage...", 0.0)
+                files = {}
+                for name in owned:
+                    key, local_path = self._remote[name]
+                    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                    files[key] = local_path
+                storage.download_files(files)
+                for name in owned:
+                    self._finish_restore(name, self._remote[name][1])
+                logger.info(f"Job {self.job_id}: fetched {sorted(owned)} for step '{step_name}'")
+        finally:
+            for name in owned:
+                self._fetching[name].set()
+
+        for event in waiting:
+            event.wait()
+        missing = [n for n in wanted if n not in self.artifacts]
+        if missing:
+            raise RuntimeError(f"Could not fetch {missing} from storage for step '{step_name}'")
+
+    def _finish_restore(self, name: str, local_path: str):
+        """Register a fetched artifact and rebuild the local state derived from it."""
+        if name == "recap_data":
+            with open(local_path) as f:
+                recap = json.load(f)
+            with open(self._recap_text_file, "w") as f:
+                f.write(recap.get("recap_text", ""))
+        elif name == "tts_audio":
+            from pydub import AudioSegment
+            audio_seg = AudioSegment.from_mp3(local_path)
+            self.actual_audio_duration = len(audio_seg) / 1000.0
+            logger.info(f"Restored TTS audio duration: {self.actual_audio_duration:.1f}s")
+        with self._lock:
+            self.artifacts[name] = local_path
+
+    def _content_hash(self, path: str) -> str:
+        """SHA-256 of an input or artifact file, computed once per path."""
+        with self._lock:
+            cached = self._content_hashes.get(path)
+        if cached is None:
+            cached = file_sha256(path)
+            with self._lock:
+                self._content_hashes[path] = cached
+        return cached
+
+    def _source_hash(self, step_num: int, step_name: str) -> str:
+        """SHA-256 of the source video for memo keys.
+
+        Uses the hash the upload endpoint computed (stored_uploads) when there is
+        one, so a memo hit never downloads the source; otherwise downloads and
+        hashes it.
+        """
+        with self._lock:
+            cached = self._content_hashes.get("source_video")
+        if cached is None:
+            cached = self._indexed_source_hash()
+            if cached is None:
+                cached = self._content_hash(self._source_video(step_num, step_name))
+            with self._lock:
+                self._content_hashes["source_video"] = cached
+        return cached
+
+    def _indexed_source_hash(self) -> str | None:
+        if not self.input_video_key:
+            return None
+        from app.services.upload_service import verified_hash_sync
+        from app.workers.tasks import SyncSession
+        try:
+            with SyncSession() as session:
+                return verified_hash_sync(session, self.input_video_key)
+        except Exception:
+            logger.warning(f"Job {self.job_id}: upload hash lookup failed; hashing the source", exc_info=True)
+            return None
 
-                # Log metrics
-                metrics = self._get_file_metrics(transcription_file)
-                log_msg = f"Step 1 complete: Transcription | Size: {metrics.get('size_mb', 'N/A')}MB"
-                if "count" in metrics:
-                    log_msg += f" | Segments: {metrics['count']}"
-                log_msg += f" | S3: {intermediate_keys.get('transcription', 'N/A')}"
-                logger.info(log_msg)
-                self.progress.report(1, "Transcription complete", 1.0)
-            else:
-                self.progress.report(1, "Transcription (cached)", 1.0)
-
-            # Step 2: Translate (optional)
-            if resume_from_step <= 2:
-                if translate_to:
-                    self._update_job(current_step=2, current_step_name="Translating")
-                    self.progress.report(2, "Starting translation...", 0.0)
-                    source_lang = language or "en"
-                    result = translate_transcription_service(
-                        active_transcription, working_dir,
-                        source_lang=source_lang, target_lang=translate_to,
-                        progress_callback=self._progress_callback,
-                    )
-                    active_transcription = result["translated_file"]
+    def _memoized(self, name: str, fields: dict, compute, extra_files: tuple[str, ...] = ()) -> dict:
+        """Return compute()'s result, reusing another job's output for identical inputs.
+
+        Args:
+            name: Step name (memo namespace)
+            fields: Content hashes and config values the step's output depends on
+            compute: Runs the processing service and returns its result dict
+            extra_files: Side outputs in the working dir that later steps read
+        """
+        if self.memo is None:
+            return compute()
+        fingerprint = StepMemo.fingerprint(name, fields)
+        result = self.memo.load(name, fingerprint)
+        self.step_storage.record_memo(name, hit=result is not None, fingerprint=fingerprint)
+        if result is not None:
+            logger.info(f"Job {self.job_id}: step '{name}' reused memoized output {fingerprint[:12]}")
+            return result
+        result = compute()
+        memo = self.memo
+        self.uploader.submit(lambda: memo.save(name, fingerprint, result, extra_files))
+        return result
+
+    @property
+    def _recap_text_file(self) -> str:
+        return os.path.join(self.working_dir, "output/transcriptions/recap_text.txt")
+
+    @property
+    def _target_duration(self):
+        return self.config.get("target_duration", 30)
+
+    def _uses_whisper(self) -> bool:
+        """AssemblyAI diarization, when enabled, replaces Whisper and does its own audio handling."""
+        return not (settings.ENABLE_ASSEMBLYAI_DIARIZATION and settings.ASSEMBLYAI_API_KEY)
+
+    def _emotions_as_step(self) -> bool:
+        """Emotion analysis runs as its own step beside Whisper (diarization never produced emotions)."""
+        return bool(self.config.get("include_emotions", False) and self._uses_whisper())
+
+    def _trim_targets(self) -> tuple[float, float]:
+        """Return (user_trim_cap, clip_trim_target).
+
+        Clip/merge duration logic:
+        - Never exceed target + small overshoot (prevents runaway output)
+        - Never shrink below target_duration even if TTS came out short
+          (better to have extra silent video than to throw away the user's
+          target because the narration underproduced)
+        """
+        target_duration = self._target_duration
+        overshoot = 5
+        audio_pad = 1  # extra second so narration audio isn't clipped at the end
+        user_trim_cap = target_duration + overshoot
+        _ad = self.actual_audio_duration if self.actual_audio_duration is not None else float(target_duration)
+        clip_trim_target = max(float(target_duration), min(user_trim_cap, _ad + overshoot + audio_pad))
+        return user_trim_cap, clip_trim_target
+
+    def _probe_duration(self, path: str) -> float | None:
+        try:
+            from moviepy.editor import VideoFileClip as _VFC
+            _probe = _VFC(path)
+            duration = _probe.duration
+            _probe.close()
+            return duration
+        except Exception:
+            return None
 
-                    # Upload step outputs
-                    step_keys = self.step_storage.upload_step_output(
-                        step_num=3,
-                        files_dict={"transcript_translated": active_transcription},
-                        metadata={"source_language": source_lang, "target_language": translate_to}
-                    )
-                    intermediate_keys.update(step_keys)
-                    self._upload_intermediate(intermediate_keys, "translation", active_transcription)
-
-                    # Log metrics
-                    metrics = self._get_file_metrics(active_transcription)
-                    log_msg = f"Step 2 complete: Translation ({source_lang}→{translate_to}) | Size: {metrics.get('size_mb', 'N/A')}MB"
-                    if "count" in metrics:
-                        log_msg += f" | Segments: {metrics['count']}"
-                    log_msg += f" | S3: {intermediate_keys.get('translation', 'N/A')}"
-                    logger.info(log_msg)
-
-                    self.progress.report(2, "Translation complete", 1.0)
-                else:
-                    self.progress.report(2, "Translation skipped", 1.0)
-                    logger.info("Step 2 skipped: Translation (not requested)")
+    def _extracted_audio(self) -> str:
+        """Decode the shared 16 kHz PCM on first use, so memo hits never pay for it."""
+        with self._audio_lock:
+            if "extracted_audio" not in self.artifacts:
+                result = extract_audio_service(self._source_video(1, "extract_audio"), self.working_dir)
+                self.artifacts["extracted_audio"] = result["audio_file"]
+            return self.artifacts["extracted_audio"]
+
+    def _step_transcribe(self):
+        model_size = self.config.get("whisper_model", "small")
+        language = self.config.get("language")
+        include_emotions = self.config.get("include_emotions", False)
+        emotions_as_step = self._emotions_as_step()
+
+        self._start_step(1, "Transcribing video", "Starting transcription...")
+        memo_fields = {
+            "source": self._source_hash(1, "transcribe"),
+            "whisper_model": model_size,
+            "language": language,
+            "include_emotions": include_emotions and not emotions_as_step,
+            "backend": "assemblyai" if not self._uses_whisper() else settings.WHISPER_BACKEND,
+            "assemblyai_language": None if self._uses_whisper() else settings.ASSEMBLYAI_LANGUAGE_CODE,
+            "vad": settings.WHISPER_VAD,
+        }
+        result = self._memoized("transcribe", memo_fields, lambda: transcribe_video_service(
+            self._source_video(1, "transcribe"), self.working_dir,
+            model_size=model_size, language=language,
+            include_emotions=include_emotions and not emotions_as_step,
+            progress_callback=self._progress_callback,
+            audio_path=self._extracted_audio() if self._uses_whisper() else None,
+            job_id=self.job_id,
+        ))
+        transcription_file = result["transcription_file"]
+        self.artifacts["transcription"] = transcription_file
+
+        metadata = {"model": model_size, "language": language, "include_emotions": include_emotions}
+        if result.get("vad"):
+            metadata["vad"] = result["vad"]
+
+        # Upload step outputs
+        self._upload_step_output(
+            step_num=1,
+            files_dict={"transcript": transcription_file},
+            metadata=metadata,
+            memo_step="transcribe",
+            aliases={"transcript": "transcription"},
+        )
+
+        # Track emotion analysis status (the emotions step reports its own)
+        if not include_emotions:
+            self._update_job(emotion_analysis_status="skipped", emotion_analysis_error=None)
+        elif not emotions_as_step:
+            emotions_file = result.get("emotions_file")
+            if emotions_file:
+                self.artifacts["emotions"] = emotions_file
+                self._upload_step_output(
+                    step_num=1, files_dict={"emotions": emotions_file}, aliases={"emotions": "emotions"})
+                self._update_job(emotion_analysis_status="completed", emotion_analysis_error=None)
             else:
-                self.progress.report(2, "Translation (cached)", 1.0)
-
-            # Step 3: Generate recap (with emotion weighting if PREMIUM tier)
-            if resume_from_step <= 3:
-                self._update_job(current_step=3, current_step_name="Generating recap")
-                self.progress.report(3, "Generating recap suggestions...", 0.0)
-                narration_lang = translate_to or language or "English"
-                result = generate_recap_service(
-                    active_transcription, working_dir,
-                    target_duration=target_duration,
-                    narration_language=narration_lang,
-                    emotions_file=emotions_file,  # None for BASIC, path for PREMIUM
-                    progress_callback=self._progress_callback,
-                )
-                recap_data_file = result["recap_data_file"]
-
-                # Upload step outputs
-                step_keys = self.step_storage.upload_step_output(
-                    step_num=4,
-                    files_dict={"recap_data": recap_data_file},
-                    metadata={
-                        "target_duration": target_duration,
-                        "narration_language": narration_lang,
-                        "emotions_included": emotions_file is not None
-                    }
+                logger.warning(f"❌ Emotion analysis unavailable for job {self.job_id} (AssemblyAI diarization active).")
+                self._update_job(
+                    emotion_analysis_status="failed",
+                    emotion_analysis_error="Emotion analysis is not available while speaker diarization is enabled.",
                 )
-                intermediate_keys.update(step_keys)
-                self._upload_intermediate(intermediate_keys, "recap_data", recap_data_file)
 
-                # Log emotion analysis metrics
-                import json as _json
-                try:
-                    with open(recap_data_file) as f:
-                        recap_data = _json.load(f)
-
-                    emotions_used = recap_data.get("emotions_used", False)
-                    clip_emotions = recap_data.get("clip_emotions", [])
-
-                    if emotions_used:
-                        logger.info(f"✓ EMOTION ANALYSIS ENABLED (PREMIUM TIER)")
-                        logger.info(f"  Clips selected: {len(recap_data.get('clip_timings', []))}")
-                        logger.info(f"  Emotional moments: {len(clip_emotions)}")
-
-                        # Log emotion breakdown
-                        emotion_counts = {}
-                        for clip_emotion in clip_emotions:
-                            emotion = clip_emotion.get("dominant_emotion", "neutral")
-                            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-
-                        logger.info(f"  Emotion distribution: {emotion_counts}")
-
-                        # Log intensity stats
-                        intensities = [clip_emotion.get("intensity", 0) for clip_emotion in clip_emotions]
-                        if intensities:
-                            logger.info(f"  Intensity range: {min(intensities):.2f} - {max(intensities):.2f} (avg: {sum(intensities)/len(intensities):.2f})")
-                    else:
-                        logger.info(f"✓ BASIC TRANSCRIPTION ONLY (no emotion analysis)")
-                        logger.info(f"  Clips selected: {len(recap_data.get('clip_timings', []))}")
-                except Exception as e:
-                    logger.warning(f"Could not parse recap metrics: {e}")
-
-                # Log metrics
-                metrics = self._get_file_metrics(recap_data_file)
-                recap_text_metrics = self._get_file_metrics(recap_text_file)
-                log_msg = f"Step 3 complete: Recap Generation | Size: {metrics.get('size_mb', 'N/A')}MB"
-                if "count" in metrics:
-                    log_msg += f" | Clips: {metrics['count']}"
-                if "words" in recap_text_metrics:
-                    log_msg += f" | Narration: {recap_text_metrics['words']} words"
-                log_msg += f" | S3: {intermediate_keys.get('recap_data', 'N/A')}"
-                logger.info(log_msg)
-
-                self.progress.report(3, "Recap generated", 1.0)
-            else:
-                self.progress.report(3, "Recap (cached)", 1.0)
-
-            # Step 4: Generate TTS
-            if resume_from_step <= 4:
-                self._update_job(current_step=4, current_step_name="Generating narration")
-                self.progress.report(4, "Generating TTS narration...", 0.0)
-                result = generate_tts_service(
-                    recap_text_file, working_dir,
-                    target_duration=target_duration,
-                    tts_model=tts_model, voice=tts_voice,
+        # Log metrics
+        metrics = self._get_file_metrics(transcription_file)
+        log_msg = f"Step 1 complete: Transcription | Size: {metrics.get('size_mb', 'N/A')}MB"
+        if "count" in metrics:
+            log_msg += f" | Segments: {metrics['count']}"
+        logger.info(log_msg)
+        self.progress.report(1, "Transcription complete", 1.0)
+        self._report_translation_skipped()
+
+    def _report_translation_skipped(self):
+        if not self.config.get("translate_to"):
+            self.progress.report(2, "Translation skipped", 1.0)
+            logger.info("Step 2 skipped: Translation (not requested)")
+
+    def _step_emotions(self):
+        """PREMIUM tier: failures are recorded on the job and never fail the pipeline."""
+        try:
+            result = self._memoized(
+                "emotions",
+                {"source": self._source_hash(1, "emotions")},
+                lambda: analyze_emotions_service(
+                    self._extracted_audio(), self.working_dir,
                     progress_callback=self._progress_callback,
-                )
-                tts_audio_file = result["tts_audio_file"]
-                actual_audio_duration = result["actual_audio_duration"]
-
-                # Upload step outputs
-                step_keys = self.step_storage.upload_step_output(
-                    step_num=5,
-                    files_dict={"narration_audio": tts_audio_file},
-                    metadata={
-                        "tts_model": tts_model,
-                        "voice": tts_voice,
-                        "duration": actual_audio_duration,
-                        "target_duration": target_duration
-                    }
-                )
-                intermediate_keys.update(step_keys)
-                self._upload_intermediate(intermediate_keys, "tts_audio", tts_audio_file)
+                ),
+            )
+        except Exception as e:
+            logger.warning(
+                f"❌ Emotion analysis failed for job {self.job_id}: {e}. Continuing with basic transcription.")
+            self._update_job(
+                emotion_analysis_status="failed",
+                emotion_analysis_error=f"Google Cloud Speech API error: {e}",
+            )
+            return
 
-                # Log metrics
-                metrics = self._get_file_metrics(tts_audio_file)
-                log_msg = f"Step 4 complete: TTS Narration | Size: {metrics.get('size_mb', 'N/A')}MB | Duration: {actual_audio_duration:.1f}s | Voice: {tts_voice}"
-                log_msg += f" | S3: {intermediate_keys.get('tts_audio', 'N/A')}"
-                logger.info(log_msg)
+        emotions_file = result["emotions_file"]
+        self.artifacts["emotions"] = emotions_file
+        self._upload_step_output(
+            step_num=1, files_dict={"emotions": emotions_file}, memo_step="emotions",
+            aliases={"emotions": "emotions"})
+        self._update_job(emotion_analysis_status="completed", emotion_analysis_error=None)
+        logger.info(f"✅ Emotion analysis completed: {emotions_file}")
+
+    def _step_translate(self):
+        translate_to = self.config.get("translate_to")
+        source_lang = self.config.get("language") or "en"
+
+        self._start_step(2, "Translating", "Starting translation...")
+        memo_fields = {
+            "transcription": self._content_hash(self.artifacts["transcription"]),
+            "source_language": source_lang,
+            "target_language": translate_to,
+            "llm_model": os.getenv("OPENAI_MODEL", "gpt-4o"),
+        }
+        result = self._memoized("translate", memo_fields, lambda: translate_transcription_service(
+            self.artifacts["transcription"], self.working_dir,
+            source_lang=source_lang, target_lang=translate_to,
+            progress_callback=self._progress_callback,
+        ))
+        translated_file = result["translated_file"]
+        self.artifacts["translation"] = translated_file
+
+        # Upload step outputs
+        self._upload_step_output(
+            step_num=3,
+            files_dict={"transcript_translated": translated_file},
+            metadata={"source_language": source_lang, "target_language": translate_to},
+            memo_step="translate",
+            aliases={"transcript_translated": "translation"},
+        )
+
+        # Log metrics
+        metrics = self._get_file_metrics(translated_file)
+        log_msg = f"Step 2 complete: Translation ({source_lang}→{translate_to}) | Size: {metrics.get('size_mb', 'N/A')}MB"
+        if "count" in metrics:
+            log_msg += f" | Segments: {metrics['count']}"
+        logger.info(log_msg)
+
+        self.progress.report(2, "Translation complete", 1.0)
+
+    def _step_recap(self):
+        target_duration = self._target_duration
+        narration_lang = self.config.get("translate_to") or self.config.get("language") or "English"
+        active_transcription = self.artifacts.get("translation") or self.artifacts["transcription"]
+        emotions_file = self.artifacts.get("emotions") if self.config.get("include_emotions", False) else None
+
+        self._start_step(3, "Generating recap", "Generating recap suggestions...")
+        memo_fields = {
+            "transcription": self._content_hash(active_transcription),
+            "emotions": self._content_hash(emotions_file) if emotions_file else None,
+            "target_duration": target_duration,
+            "narration_language": narration_lang,
+            "llm_model": os.getenv("OPENAI_MODEL", "gpt-4o"),
+            "window_seconds": settings.LLM_RECAP_WINDOW_SECONDS,
+            "prerank_coverage": settings.LLM_PRERANK_COVERAGE,
+            "recap_prompt_version": RECAP_PROMPT_VERSION,
+            "narration_prompt_version": ACTIVE_PROMPT_VERSION,
+        }
+        result = self._memoized("recap", memo_fields, lambda: generate_recap_service(
+            active_transcription, self.working_dir,
+            target_duration=target_duration,
+            narration_language=narration_lang,
+            emotions_file=emotions_file,  # None for BASIC, path for PREMIUM
+            window_seconds=settings.LLM_RECAP_WINDOW_SECONDS,
+            max_parallel_calls=settings.LLM_RECAP_PARALLEL_CALLS,
+            prerank_coverage=settings.LLM_PRERANK_COVERAGE,
+            progress_callback=self._progress_callback,
+        ), extra_files=(self._recap_text_file,))
+        recap_data_file = result["recap_data_file"]
+        self.artifacts["recap_data"] = recap_data_file
+
+        # Upload step outputs
+        self._upload_step_output(
+            step_num=4,
+            files_dict={"recap_data": recap_data_file},
+            metadata={
+                "target_duration": target_duration,
+                "narration_language": narration_lang,
+                "emotions_included": emotions_file is not None
+            },
+            memo_step="recap",
+            aliases={"recap_data": "recap_data"},
+        )
+
+        # Log emotion analysis metrics
+        try:
+            with open(recap_data_file) as f:
+                recap_data = json.load(f)
 
-                if actual_audio_duration < target_duration * 0.6:
-                    logger.warning(
-                        "TTS audio (%.1fs) is much shorter than target (%ds) — "
-                        "narration may have underproduced words",
-                        actual_audio_duration, target_duration,
-                    )
-                self.progress.report(4, f"TTS narration ready ({actual_audio_duration:.1f}s)", 1.0)
-            else:
-                self.progress.report(4, "TTS narration (cached)", 1.0)
-
-            # Clip/merge duration logic:
-            # - Never exceed target + small overshoot (prevents runaway output)
-            # - Never shrink below target_duration even if TTS came out short
-            #   (better to have extra silent video than to throw away the user's
-            #   target because the narration underproduced)
-            overshoot = 5
-            audio_pad = 1  # extra second so narration audio isn't clipped at the end
-            user_trim_cap = target_duration + overshoot
-            _ad = actual_audio_duration if actual_audio_duration is not None else float(target_duration)
-            clip_trim_target = max(float(target_duration), min(user_trim_cap, _ad + overshoot + audio_pad))
-
-            if resume_from_step <= 5:
-                self._update_job(current_step=5, current_step_name="Extracting clips")
-                self.progress.report(5, "Extracting video clips...", 0.0)
-                result = extract_clips_service(
-                    local_video_path, recap_data_file, working_dir,
-                    target_duration=clip_trim_target,
-                    progress_callback=self._progress_callback,
-                )
-                recap_video_file = result["recap_video_file"]
+            emotions_used = recap_data.get("emotions_used", False)
+            clip_emotions = recap_data.get("clip_emotions", [])
 
-                # Upload step outputs
-                step_keys = self.step_storage.upload_step_output(
-                    step_num=6,
-                    files_dict={"video_with_clips": recap_video_file},
-                    metadata={"target_duration": clip_trim_target}
-                )
-                intermediate_keys.update(step_keys)
-                self._upload_intermediate(intermediate_keys, "recap_video", recap_video_file)
+            if emotions_used:
+                logger.info(f"✓ EMOTION ANALYSIS ENABLED (PREMIUM TIER)")
+                logger.info(f"  Clips selected: {len(recap_data.get('clip_timings', []))}")
+                logger.info(f"  Emotional moments: {len(clip_emotions)}")
 
-                # Log metrics
-                metrics = self._get_file_metrics(recap_video_file)
-                try:
-                    from moviepy.editor import VideoFileClip as _VFC
-                    _probe = _VFC(recap_video_file)
-                    video_duration = _probe.duration
-                    _probe.close()
-                except Exception:
-                    video_duration = None
+                # Log emotion breakdown
+                emotion_counts = {}
+                for clip_emotion in clip_emotions:
+                    emotion = clip_emotion.get("dominant_emotion", "neutral")
+                    emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
 
-                log_msg = f"Step 5 complete: Clip Extraction | Size: {metrics.get('size_mb', 'N/A')}MB"
-                if video_duration:
-                    log_msg += f" | Duration: {video_duration:.1f}s"
-                log_msg += f" | S3: {intermediate_keys.get('recap_video', 'N/A')}"
-                logger.info(log_msg)
+                logger.info(f"  Emotion distribution: {emotion_counts}")
 
-                self.progress.report(5, "Clips extracted", 1.0)
+                # Log intensity stats
+                intensities = [clip_emotion.get("intensity", 0) for clip_emotion in clip_emotions]
+                if intensities:
+                    logger.info(f"  Intensity range: {min(intensities):.2f} - {max(intensities):.2f} (avg: {sum(intensities)/len(intensities):.2f})")
             else:
-                self.progress.report(5, "Clips (cached)", 1.0)
-
-            # Step 6: Remove audio
-            if resume_from_step <= 6:
-                self._update_job(current_step=6, current_step_name="Removing audio")
-                self.progress.report(6, "Removing original audio...", 0.0)
-                result = remove_audio_service(
-                    recap_video_file, working_dir,
-                    progress_callback=self._progress_callback,
-                )
-                no_audio_video = result["no_audio_video_file"]
+                logger.info(f"✓ BASIC TRANSCRIPTION ONLY (no emotion analysis)")
+                logger.info(f"  Clips selected: {len(recap_data.get('clip_timings', []))}")
+        except Exception as e:
+            logger.warning(f"Could not parse recap metrics: {e}")
+
+        # Log metrics
+        metrics = self._get_file_metrics(recap_data_file)
+        recap_text_metrics = self._get_file_metrics(self._recap_text_file)
+        log_msg = f"Step 3 complete: Recap Generation | Size: {metrics.get('size_mb', 'N/A')}MB"
+        if "count" in metrics:
+            log_msg += f" | Clips: {metrics['count']}"
+        if "words" in recap_text_metrics:
+            log_msg += f" | Narration: {recap_text_metrics['words']} words"
+        logger.info(log_msg)
+
+        self.progress.report(3, "Recap generated", 1.0)
+
+    def _step_tts(self):
+        target_duration = self._target_duration
+        tts_model = self.config.get("tts_model", "tts-1")
+        tts_voice = self.config.get("tts_voice", "nova")
+
+        self._start_step(4, "Generating narration", "Generating TTS narration...")
+        memo_fields = {
+            "recap_text": self._content_hash(self._recap_text_file),
+            "target_duration": target_duration,
+            "tts_model": tts_model,
+            "voice": tts_voice,
+        }
+        result = self._memoized("tts", memo_fields, lambda: generate_tts_service(
+            self._recap_text_file, self.working_dir,
+            target_duration=target_duration,
+            tts_model=tts_model, voice=tts_voice,
+            progress_callback=self._progress_callback,
+        ))
+        tts_audio_file = result["tts_audio_file"]
+        actual_audio_duration = result["actual_audio_duration"]
+        self.artifacts["tts_audio"] = tts_audio_file
+        self.actual_audio_duration = actual_audio_duration
+
+        # Upload step outputs
+        self._upload_step_output(
+            step_num=5,
+            files_dict={"narration_audio": tts_audio_file},
+            metadata={
+                "tts_model": tts_model,
+                "voice": tts_voice,
+                "duration": actual_audio_duration,
+                "target_duration": target_duration
+            },
+            memo_step="tts",
+            aliases={"narration_audio": "tts_audio"},
+        )
+
+        # Log metrics
+        metrics = self._get_file_metrics(tts_audio_file)
+        log_msg = f"Step 4 complete: TTS Narration | Size: {metrics.get('size_mb', 'N/A')}MB | Duration: {actual_audio_duration:.1f}s | Voice: {tts_voice}"
+        logger.info(log_msg)
+
+        if actual_audio_duration < target_duration * 0.6:
+            logger.warning(
+                "TTS audio (%.1fs) is much shorter than target (%ds) — "
+                "narration may have underproduced words",
+                actual_audio_duration, target_duration,
+            )
+        self.progress.report(4, f"TTS narration ready ({actual_audio_duration:.1f}s)", 1.0)
 
-                # Note: This step doesn't upload as it's an intermediate transformation
-                # The final step (7) uploads the complete result
-                self.progress.report(6, "Audio removed", 1.0)
-            else:
-                self.progress.report(6, "Audio removal (cached)", 1.0)
+    def _step_render(self):
+        """Single-pass render: one ffmpeg run replaces steps 5-7; falls back to the moviepy chain."""
+        user_trim_cap, clip_trim_target = self._trim_targets()
 
-            # Pre-merge timing summary
-            try:
-                from moviepy.editor import VideoFileClip as _VFC
-                _probe = _VFC(no_audio_video)
-                merged_clip_duration = _probe.duration
-                _probe.close()
-            except Exception:
-                merged_clip_duration = None
+        self._start_step(5, "Rendering recap video", "Rendering recap video (single pass)...")
+        try:
+            result = render_recap_service(
+                self.artifacts["source_video"], self.artifacts["recap_data"],
+                self.artifacts["tts_audio"], self.working_dir,
+                target_duration=clip_trim_target,
+                max_duration_seconds=user_trim_cap,
+                progress_callback=self._progress_callback,
+            )
+        except Exception:
+            logger.warning(
+                "Single-pass render failed for job %s; falling back to per-step moviepy render",
+                self.job_id, exc_info=True,
+            )
+            self._step_clips()
+            self._step_remove_audio()
+            self._step_merge()
+            return
 
+        self.artifacts["final_video"] = result["final_video_file"]
+        self.render_engine = "ffmpeg_single_pass"
+        self.progress.report(5, "Recap video rendered", 1.0)
+        self.progress.report(6, "Audio removal (single-pass render)", 1.0)
+
+    def _step_clips(self):
+        # Clips are cut to the user cap rather than the narration-derived trim
+        # target so this step does not wait for TTS; the merge trims to
+        # min(video, audio, cap) which makes the final output identical.
+        user_trim_cap, _ = self._trim_targets()
+
+        self._start_step(5, "Extracting clips", "Extracting video clips...")
+        result = extract_clips_service(
+            self.artifacts["source_video"], self.artifacts["recap_data"], self.working_dir,
+            target_duration=user_trim_cap,
+            cut_mode=settings.CLIP_CUT_MODE,
+            max_workers=settings.CLIP_ENCODE_WORKERS or None,
+            progress_callback=self._progress_callback,
+        )
+        recap_video_file = result["recap_video_file"]
+        self.artifacts["recap_video"] = recap_video_file
+
+        # Upload step outputs
+        self._upload_step_output(
+            step_num=6,
+            files_dict={"video_with_clips": recap_video_file},
+            metadata={"target_duration": user_trim_cap, "cut_mode": settings.CLIP_CUT_MODE},
+            aliases={"video_with_clips": "recap_video"},
+        )
+
+        # Log metrics
+        metrics = self._get_file_metrics(recap_video_file)
+        video_duration = self._probe_duration(recap_video_file)
+        log_msg = f"Step 5 complete: Clip Extraction | Size: {metrics.get('size_mb', 'N/A')}MB"
+        if video_duration:
+            log_msg += f" | Duration: {video_duration:.1f}s"
+        logger.info(log_msg)
+
+        self.progress.report(5, "Clips extracted", 1.0)
+
+    def _step_remove_audio(self):
+        self._start_step(6, "Removing audio", "Removing original audio...")
+        result = remove_audio_service(
+            self.artifacts["recap_video"], self.working_dir,
+            progress_callback=self._progress_callback,
+        )
+        self.artifacts["no_audio_video"] = result["no_audio_video_file"]
+
+        # Note: This step doesn't upload as it's an intermediate transformation
+        # The final step (7) uploads the complete result
+        self.progress.report(6, "Audio removed", 1.0)
+
+    def _step_merge(self):
+        target_duration = self._target_duration
+        user_trim_cap, clip_trim_target = self._trim_targets()
+        no_audio_video = self.artifacts["no_audio_video"]
+        actual_audio_duration = self.actual_audio_duration
+
+        # Pre-merge timing summary
+        merged_clip_duration = self._probe_duration(no_audio_video)
+        logger.info(
+            "Pre-merge summary for job %s | "
+            "TTS audio: %.1fs | Merged clips: %s | "
+            "Target: %ds | Clip trim target: %.1fs | Trim cap: %.1fs",
+            self.job_id,
+            actual_audio_duration or 0,
+            f"{merged_clip_duration:.1f}s" if merged_clip_duration else "unknown",
+            target_duration,
+            clip_trim_target,
+            user_trim_cap,
+        )
+        if settings.DEBUG:
             logger.info(
-                "Pre-merge summary for job %s | "
-                "TTS audio: %.1fs | Merged clips: %s | "
-                "Target: %ds | Clip trim target: %.1fs | Trim cap: %.1fs",
+                "DEBUG timing detail for job %s | "
+                "audio_longer_than_video=%s | audio_longer_than_target=%s | "
+                "video_longer_than_target=%s",
                 self.job_id,
-                actual_audio_duration or 0,
-                f"{merged_clip_duration:.1f}s" if merged_clip_duration else "unknown",
-                target_duration,
-                clip_trim_target,
-                user_trim_cap,
+                (actual_audio_duration or 0) > (merged_clip_duration or 0),
+                (actual_audio_duration or 0) > target_duration,
+                (merged_clip_duration or 0) > target_duration,
             )
-            if settings.DEBUG:
+
+        # Step 7: Merge audio + video
+        self._start_step(7, "Merging final video", "Merging audio with video...")
+        result = merge_audio_video_service(
+            no_audio_video,
+            self.artifacts["tts_audio"],
+            self.working_dir,
+            progress_callback=self._progress_callback,
+            max_duration_seconds=user_trim_cap,
+        )
+        self.artifacts["final_video"] = result["final_video_file"]
+
+    def build_graph(self, available: set[str]) -> StepGraph:
+        """Declare the pipeline steps for this job's options.
+
+        Artifacts: source_video → transcription [+ emotions] → [translation] → recap_data
+        → tts_audio / recap_video → no_audio_video → final_video. Transcribe and emotions
+        share one decoded 16 kHz PCM file, extracted only once a memo lookup has missed.
+        """
+        include_emotions = self.config.get("include_emotions", False)
+        translate_to = self.config.get("translate_to")
+
+        steps = [PipelineStep("transcribe", 1, self._step_transcribe,
+                              inputs=("source_video",), outputs=("transcription",))]
+        if self._uses_whisper() and self._emotions_as_step():
+            steps.append(PipelineStep("emotions", 1, self._step_emotions,
+                                      inputs=("source_video",), outputs=("emotions",)))
+
+        if translate_to:
+            steps.append(PipelineStep("translate", 2, self._step_translate,
+                                      inputs=("transcription",), outputs=("translation",)))
+        steps += [
+            PipelineStep("recap", 3, self._step_recap,
+                         inputs=("translation" if translate_to else "transcription",),
+                         optional_inputs=("emotions",) if include_emotions else (),
+                         outputs=("recap_data",)),
+            PipelineStep("tts", 4, self._step_tts, inputs=("recap_data",), outputs=("tts_audio",)),
+        ]
+
+        # Single pass is only possible when not resuming from an already-extracted clip video
+        if settings.ENABLE_SINGLE_PASS_RENDER and "recap_video" not in available:
+            steps.append(PipelineStep("render", 5, self._step_render,
+                                      inputs=("source_video", "recap_data", "tts_audio"),
+                                      outputs=("final_video",)))
+        else:
+            steps += [
+                PipelineStep("clips", 5, self._step_clips,
+                             inputs=("source_video", "recap_data"), outputs=("recap_video",)),
+                PipelineStep("remove_audio", 6, self._step_remove_audio,
+                             inputs=("recap_video",), outputs=("no_audio_video",)),
+                PipelineStep("merge", 7, self._step_merge,
+                             inputs=("no_audio_video", "tts_audio"), outputs=("final_video",)),
+            ]
+        return StepGraph(steps)
+
+    def run(self, resume_from_step: int = 0, existing_intermediate_keys: dict | None = None):
+        working_dir = self._setup_working_dir()
+        self.intermediate_keys = dict(existing_intermediate_keys or {})
+        intermediate_keys = self.intermediate_keys
+        llm_before = None
+
+        try:
+            self._update_job(status="processing", current_step=0, current_step_name="Preparing")
+            if settings.STEP_MEMO_ENABLED:
+                self.memo = StepMemo(storage, working_dir)
+            llm = sync_llm_cache()
+            llm_before = llm.stats()
+
+            # --- Plan from graph state: whatever is already in intermediate_keys is reused ---
+            available = {"source_video"} | {name for name in RESTORABLE_ARTIFACTS if name in intermediate_keys}
+            graph = self.build_graph(available)
+            planned, restore = graph.plan("final_video", available)
+            # Inputs (source video included) are fetched lazily by _materialize before each step
+            self._register_remote(restore)
+
+            if resume_from_step > 0:
                 logger.info(
-                    "DEBUG timing detail for job %s | "
-                    "audio_longer_than_video=%s | audio_longer_than_target=%s | "
-                    "video_longer_than_target=%s",
-                    self.job_id,
-                    (actual_audio_duration or 0) > (merged_clip_duration or 0),
-                    (actual_audio_duration or 0) > target_duration,
-                    (merged_clip_duration or 0) > target_duration,
+                    f"Resuming job {self.job_id}: will fetch {sorted(restore)}, running {planned}"
                 )
 
-            # Step 7: Merge audio + video
-            self._update_job(current_step=7, current_step_name="Merging final video")
-            self.progress.report(7, "Merging audio with video...", 0.0)
-            result = merge_audio_video_service(
-                no_audio_video,
-                tts_audio_file,
-                working_dir,
-                progress_callback=self._progress_callback,
-                max_duration_seconds=user_trim_cap,
-            )
-            final_video = result["final_video_file"]
+            for name, message in CACHED_MESSAGES.items():
+                if name in graph.steps and name not in planned:
+                    self.progress.report(graph.steps[name].step_num, message, 1.0)
+            if "transcribe" not in planned:
+                self._report_translation_skipped()
+
+            graph.run(planned, max_workers=settings.PIPELINE_MAX_PARALLEL_STEPS, prepare=self._materialize)
 
-            # Upload step outputs
-            step_keys = self.step_storage.upload_step_output(
+            final_video = self.artifacts["final_video"]
+            user_trim_cap, _ = self._trim_targets()
+
+            # Upload final output to S3 once; step 7 records it by key
+            output_key = f"results/{self.job_id}/recap_video_with_narration.mp4"
+            with open(final_video, "rb") as f:
+                storage.upload_file(output_key, f)
+
+            self._upload_step_output(
                 step_num=7,
-                files_dict={"final_video": final_video},
+                files_dict={},
+                stored_files={"final_video": output_key},
                 metadata={
                     "max_duration": user_trim_cap,
+                    "render_engine": self.render_engine,
                     "original_audio_level": self.config.get("original_audio_level", 25),
-                    "narration_audio_level": self.config.get("narration_audio_level", 100)
+                    "narration_audio_level": self.config.get("narration_audio_level", 100),
+                    "memo": self.step_storage.memo_summary(),
                 }
             )
-            intermediate_keys.update(step_keys)
             self.progress.report(7, "Final video ready", 1.0)
 
-            # Upload final output to S3
-            output_key = f"results/{self.job_id}/recap_video_with_narration.mp4"
-            with open(final_video, "rb") as f:
-                storage.upload_file(output_key, f)
+            # Every artifact must be durable before the job is marked completed
+            self.uploader.wait()
 
             # Log final output metrics
             metrics = self._get_file_metrics(final_video)
-            try:
-                from moviepy.editor import VideoFileClip as _VFC
-                _probe = _VFC(final_video)
-                final_duration = _probe.duration
-                _probe.close()
-            except Exception:
-                final_duration = None
+            final_duration = self._probe_duration(final_video)
 
             log_msg = f"Step 7 complete: Final Merge | Size: {metrics.get('size_mb', 'N/A')}MB"
             if final_duration:
@@ -558,13 +928,14 @@ class RecapPipeline:
             # Best-effort post-completion cleanup: remove the original upload.
             # This must NEVER revert the successful completion above.
             input_removed = False
-            if settings.DELETE_INPUT_VIDEO_ON_COMPLETE and self.input_video_key:
+            if delete_input_on_complete() and self.input_video_key:
                 input_key = self.input_video_key
                 try:
                     # DB first: clear the key so no code path references a
                     # file that is about to be deleted.
                     self._update_job(input_video_key=None)
-                    storage.delete_file(input_key)
+                    if self._release_input(input_key):
+                        storage.delete_file(input_key)
                     self.input_video_key = None
                     input_removed = True
                 except Exception:
@@ -579,8 +950,24 @@ class RecapPipeline:
                 "input_removed": input_removed,
             }
 
+        except TranscriptionDeferred as deferred:
+            # Steps running beside transcription have finished and saved their
+            # outputs; the chord's merge task resumes the job from graph state.
+            self.uploader.wait()
+            self._update_job(
+                current_step=1,
+                current_step_name="Transcribing (distributed)",
+                intermediate_keys=intermediate_keys,
+            )
+            self.progress.report(1, f"Transcribing across workers ({deferred.chunk_count} chunks)...", 0.1)
+            deferred.dispatch()
+            logger.info(f"Job {self.job_id}: transcription fanned out to {deferred.chunk_count} chunk tasks")
+            return {"deferred": True, "intermediate_keys": intermediate_keys}
+
         except Exception as e:
             logger.exception(f"Pipeline failed for job {self.job_id}")
+            # Let queued uploads land so the checkpoint keeps every durable artifact
+            self.uploader.wait(raise_errors=False)
             # Don't overwrite "stopped" status — the stop endpoint already set it
             from app.workers.tasks import SyncSession
             from app.models.job import RecapJob
@@ -599,6 +986,12 @@ class RecapPipeline:
                 logger.info(f"Job {self.job_id} was stopped by user, not marking as failed")
             raise
         finally:
+            self.uploader.shutdown()
+            if llm_before is not None:
+                llm_after = llm.stats()
+                hits, misses = llm_after["hits"] - llm_before["hits"], llm_after["misses"] - llm_before["misses"]
+                if hits or misses:
+                    logger.info(f"Job {self.job_id}: LLM cache ({llm_after['backend']}) {hits} hits, {misses} misses")
             if settings.preserve_pipeline_working_dir() and self.working_dir:
                 logger.info(
                     "Preserved recap job workspace (DEBUG or KEEP_PIPELINE_WORKING_DIR): %s",
@@ -0,0 +1,162 @@
+"""
+Dependency graph and scheduler for pipeline steps.
+
+Each step declares the artifacts it consumes and produces. The graph works out
+which steps are needed to reach a goal artifact given what already exists
+(e.g. restored from S3 on resume), then runs every step whose dependencies are
+satisfied concurrently on a thread pool.
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PipelineStep:
+    """One unit of pipeline work.
+
+    Attributes:
+        name: Unique step name
+        step_num: Progress/DB step number (1-7) reported while the step runs
+        run: Zero-argument callable doing the work
+        inputs: Artifacts that must exist before the step runs
+        outputs: Artifacts the step produces
+        optional_inputs: Artifacts used when available; the step waits for their
+                         producer if one is scheduled, but runs without them otherwise
+    """
+    name: str
+    step_num: int
+    run: Callable[[], None]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    optional_inputs: tuple[str, ...] = ()
+
+
+class StepGraph:
+    """Plans and executes a DAG of PipelineSteps."""
+
+    def __init__(self, steps: list[PipelineStep]):
+        self.steps: dict[str, PipelineStep] = {}
+        self.producers: dict[str, str] = {}
+        for step in steps:
+            if step.name in self.steps:
+                raise ValueError(f"Duplicate step name '{step.name}'")
+            self.steps[step.name] = step
+            for artifact in step.outputs:
+                if artifact in self.producers:
+                    raise ValueError(
+                        f"Artifact '{artifact}' produced by both '{self.producers[artifact]}' and '{step.name}'"
+                    )
+                self.producers[artifact] = step.name
+        self._order = self._topological_order()
+
+    def dependencies(self, name: str) -> set[str]:
+        """Names of the steps producing this step's (optional) inputs."""
+        step = self.steps[name]
+        return {
+            self.producers[artifact]
+            for artifact in (*step.inputs, *step.optional_inputs)
+            if artifact in self.producers
+        }
+
+    def _topological_order(self) -> list[str]:
+        remaining = {name: self.dependencies(name) for name in self.steps}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps & remaining.keys()]
+            if not ready:
+                raise ValueError(f"Cycle between steps: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def plan(self, goal: str, available: set[str]) -> tuple[list[str], set[str]]:
+        """Work out what has to happen to produce ``goal``.
+
+        Args:
+            goal: Artifact the pipeline must end with
+            available: Artifacts that already exist (inputs, restored intermediates)
+
+        Returns:
+            (steps to run in topological order, available artifacts those steps read)
+        """
+        to_run: set[str] = set()
+        needed_available: set[str] = set()
+
+        def need(artifact: str) -> None:
+            if artifact in available:
+                needed_available.add(artifact)
+                return
+            producer = self.producers.get(artifact)
+            if producer is None:
+                raise ValueError(f"Artifact '{artifact}' is not available and no step produces it")
+            if producer in to_run:
+                return
+            to_run.add(producer)
+            step = self.steps[producer]
+            for name in step.inputs:
+                need(name)
+            for name in step.optional_inputs:
+                if name in available or name in self.producers:
+                    need(name)
+
+        need(goal)
+        return [name for name in self._order if name in to_run], needed_available
+
+    def run(self, step_names: list[str], max_workers: int = 1,
+            prepare: Callable[[PipelineStep], None] | None = None) -> None:
+        """Run the given steps, starting each one as soon as its dependencies finish.
+
+        Stops scheduling new steps after the first failure, waits for steps
+        already running, then re-raises that failure.
+
+        Args:
+            prepare: Called with each step on its worker thread right before it runs
+                     (e.g. to fetch the step's inputs); its errors fail the step
+        """
+        max_workers = max(1, max_workers)
+        selected = set(step_names)
+        deps = {name: self.dependencies(name) & selected for name in step_names}
+        pending = list(step_names)
+        done: set[str] = set()
+        running = {}
+        error: BaseException | None = None
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline-step") as pool:
+            while pending or running:
+                if error is None:
+                    for name in list(pending):
+                        if len(running) >= max_workers:
+                            break
+                        if deps[name] <= done:
+                            pending.remove(name)
+                            logger.debug("Starting pipeline step '%s'", name)
+                            running[pool.submit(self._run_step, self.steps[name], prepare)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        if error is None:
+                            error = exc
+                        logger.debug("Pipeline step '%s' failed: %s", name, exc)
+                    else:
+                        done.add(name)
+
+        if error is not None:
+            raise error
+        if pending:
+            raise RuntimeError(f"Pipeline steps could not be scheduled: {pending}")
+
+    @staticmethod
+    def _run_step(step: PipelineStep, prepare) -> None:
+        if prepare is not None:
+            prepare(step)
+        step.run()
@@ -1,6 +1,6 @@
 import logging
 import os
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import redis
 from sqlalchemy import select, create_engine
@@ -11,6 +11,7 @@ from app.core.security import decrypt_api_key
 from app.models.job import RecapJob
 from app.models.user import User
 from app.services.storage import storage
+from app.services.upload_service import release_sync
 from app.services.user_service import user_requires_api_key
 from app.workers.celery_app import celery_app
 
@@ -108,6 +109,11 @@ def _resolve_assemblyai_key(user_id: str) -> tuple[str | None, str]:
 @celery_app.task(bind=True, name="app.workers.tasks.process_recap_job")
 def process_recap_job(self, job_id: str, resume_from_step: int = 0):
     """Main task: runs the 7-step recap pipeline. Supports resumption from a given step."""
+    _run_recap_job(self, job_id, resume_from_step)
+
+
+def _run_recap_job(task, job_id: str, resume_from_step: int = 0, extra_intermediate_keys: dict | None = None):
+    """Run (or resume) the recap pipeline for a job inside the calling Celery task."""
     logger.info(f"Starting recap pipeline for job {job_id} (resume_from_step={resume_from_step})")
 
     import json
@@ -126,7 +132,7 @@ def process_recap_job(self, job_id: str, resume_from_step: int = 0):
             return
         job_config = job.config
         input_video_key = job.input_video_key
-        existing_intermediate_keys = job.intermediate_keys or {}
+        existing_intermediate_keys = {**(job.intermediate_keys or {}), **(extra_intermediate_keys or {})}
         user_openai_key = _resolve_openai_key(job.user_id)
         user_assemblyai_key, assemblyai_key_source = _resolve_assemblyai_key(job.user_id)
 
@@ -147,7 +153,7 @@ def process_recap_job(self, job_id: str, resume_from_step: int = 0):
     _update_job_sync(job_id, status="processing", started_at=datetime.now(timezone.utc))
 
     # Store celery task ID
-    _update_job_sync(job_id, celery_task_id=self.request.id)
+    _update_job_sync(job_id, celery_task_id=task.request.id)
 
     # Validate API key availability
     from app.config import settings
@@ -204,6 +210,10 @@ def process_recap_job(self, job_id: str, resume_from_step: int = 0):
             existing_intermediate_keys=existing_intermediate_keys if resume_from_step > 0 else None,
         )
 
+        if result.get("deferred"):
+            logger.info(f"Job {job_id} waiting for distributed transcription; the merge task continues it")
+            return
+
         # Explicitly ensure output_video_key is persisted
         _update_job_sync(job_id, output_video_key=result["output_key"])
 
@@ -249,6 +259,100 @@ def process_recap_job(self, job_id: str, resume_from_step: int = 0):
                 os.environ.pop("ASSEMBLYAI_API_KEY", None)
 
 
+def dispatch_transcription_chunks(job_id: str, chunks: list[dict], model_size: str, language: str | None):
+    """Fan chunk transcription out as a chord; the merge callback continues the job."""
+    from celery import chord
+
+    header = [transcribe_audio_chunk.s(job_id, chunk, model_size, language) for chunk in chunks]
+    callback = merge_transcription_chunks.s(job_id, chunks, model_size, language).on_error(
+        transcription_fanout_failed.s(job_id)
+    )
+    chord(header)(callback)
+
+
+@celery_app.task(name="app.workers.tasks.transcribe_audio_chunk")
+def transcribe_audio_chunk(job_id: str, chunk: dict, model_size: str, language: str | None):
+    """Transcribe one uploaded audio chunk with this worker's cached Whisper model."""
+    import tempfile
+
+    from app.processing.transcription import sync_whisper_worker
+    from modules.chunked_transcription import transcribe_window
+    from modules.transcription import publish_whisper_registry_stats, whisper_model
+
+    sync_whisper_worker()
+    with tempfile.TemporaryDirectory(prefix=f"chunk_{job_id}_") as tmpdir:
+        local_path = os.path.join(tmpdir, os.path.basename(chunk["key"]))
+        storage.download_file(chunk["key"], local_path)
+        with whisper_model(model_size, settings.WHISPER_BACKEND) as model:
+            segments = transcribe_window(model, local_path, language)
+    publish_whisper_registry_stats(settings.REDIS_URL)
+
+    logger.info(f"Job {job_id}: transcribed chunk {chunk['index']} ({len(segments)} segments)")
+    return {"index": chunk["index"], "segments": segments}
+
+
+@celery_app.task(bind=True, name="app.workers.tasks.merge_transcription_chunks")
+def merge_transcription_chunks(self, results: list[dict], job_id: str, chunks: list[dict],
+                               model_size: str, language: str | None):
+    """Chord callback: rebuild transcription.json and continue the job on this worker."""
+    import json
+    import tempfile
+
+    from app.core.step_storage import StepStorage
+    from modules.chunked_transcription import stitch_chunk_segments
+
+    segments_by_index = {result["index"]: result["segments"] for result in results}
+    segments = stitch_chunk_segments([
+        {**chunk, "segments": segments_by_index[chunk["index"]]} for chunk in chunks
+    ])
+
+    with tempfile.TemporaryDirectory(prefix=f"merge_{job_id}_") as tmpdir:
+        transcription_file = os.path.join(tmpdir, "transcription.json")
+        with open(transcription_file, "w") as f:
+            json.dump(segments, f, indent=2)
+
+        # Same keys RecapPipeline writes after a local transcription
+        keys = StepStorage(job_id, storage).upload_step_output(
+            step_num=1,
+            files_dict={"transcript": transcription_file},
+            metadata={"model": model_size, "language": language, "distributed_chunks": len(chunks)},
+            aliases={"transcript": "transcription"},
+        )
+
+    storage.delete_files([chunk["key"] for chunk in chunks])
+    logger.info(f"Job {job_id}: merged {len(chunks)} transcription chunks into {len(segments)} segments")
+
+    with SyncSession() as session:
+        job = session.execute(
+            select(RecapJob).where(RecapJob.id == job_id)
+        ).scalar_one_or_none()
+        if not job:
+            logger.warning(f"Job {job_id} disappeared while transcribing; dropping merged transcription")
+            return
+        if job.status == "stopped":
+            # Keep the transcription so a later resume skips it
+            job.intermediate_keys = {**(job.intermediate_keys or {}), **keys}
+            session.commit()
+            logger.info(f"Job {job_id} was stopped during distributed transcription, not continuing")
+            return
+
+    _run_recap_job(self, job_id, resume_from_step=1, extra_intermediate_keys=keys)
+
+
+@celery_app.task(name="app.workers.tasks.transcription_fanout_failed")
+def transcription_fanout_failed(request, exc, traceback, job_id: str):
+    """Chord error callback: mark the job failed (it can be resumed from the API)."""
+    import json
+
+    msg = f"Distributed transcription failed: {exc}"
+    logger.error(f"Job {job_id}: {msg}")
+    _update_job_sync(job_id, status="failed", error_message=msg)
+    _redis_client.publish(
+        f"job:{job_id}:progress",
+        json.dumps({"type": "failed", "error": msg}),
+    )
+
+
 @celery_app.task(name="app.workers.tasks.cleanup_expired_files")
 def cleanup_expired_files():
     """Periodic task: delete expired job files from S3."""
@@ -269,7 +373,7 @@ def cleanup_expired_files():
                 keys_to_delete.append(job.output_video_key)
             if job.intermediate_keys:
                 keys_to_delete.extend(job.intermediate_keys.values())
-            if job.input_video_key:
+            if job.input_video_key and release_sync(session, job.input_video_key):
                 keys_to_delete.append(job.input_video_key)
 
             if keys_to_delete:
@@ -283,3 +387,15 @@ def cleanup_expired_files():
         session.commit()
 
     logger.info(f"Cleaned up {len(expired_jobs)} expired jobs")
+
+
+@celery_app.task(name="app.workers.tasks.cleanup_expired_memos")
+def cleanup_expired_memos():
+    """Periodic task: delete step memo entries older than STEP_MEMO_TTL_DAYS."""
+    from app.core.step_memo import StepMemo
+
+    if settings.STEP_MEMO_TTL_DAYS <= 0:
+        return
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.STEP_MEMO_TTL_DAYS)
+    deleted = StepMemo.delete_expired(storage, cutoff)
+    logger.info(f"Deleted {deleted} step memo entries older than {settings.STEP_MEMO_TTL_DAYS} days")
@@ -0,0 +1,87 @@
+"""Celery worker boot hooks: Whisper preload in the parent process, torch thread sizing in children.
+
+With the prefork pool, models loaded in the parent before the pool starts are
+inherited by every child process. Tensor storage is never written during
+inference, so the weights stay shared copy-on-write instead of being loaded
+(and held) once per child, and no job pays the cold-start load.
+"""
+
+import logging
+import os
+
+from celery.signals import worker_init, worker_process_init
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pool size of this worker; set in the parent before the pool forks.
+_concurrency = 1
+
+
+def preload_model_sizes() -> list[str]:
+    """Whisper sizes listed in WHISPER_PRELOAD_MODELS."""
+    return [size.strip() for size in settings.WHISPER_PRELOAD_MODELS.split(",") if size.strip()]
+
+
+def torch_threads_per_process(concurrency: int) -> int:
+    """Intra-op threads per pool process so concurrent jobs do not oversubscribe the CPU."""
+    if settings.TORCH_THREADS_PER_PROCESS:
+        return settings.TORCH_THREADS_PER_PROCESS
+    return max(1, (os.cpu_count() or 1) // max(1, concurrency))
+
+
+def _is_prefork(worker) -> bool:
+    pool_cls = getattr(worker, "pool_cls", "prefork")
+    name = pool_cls if isinstance(pool_cls, str) else f"{pool_cls.__module__}.{pool_cls.__name__}"
+    return "prefork" in name or "processes" in name
+
+
+def _set_torch_threads(threads: int) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(threads)
+
+
+@worker_init.connect
+def preload_whisper_models(sender=None, **kwargs):
+    """Load and warm up the configured Whisper models before the pool starts."""
+    global _concurrency
+    _concurrency = getattr(sender, "concurrency", None) or 1
+    prefork = _is_prefork(sender)
+
+    sizes = preload_model_sizes()
+    if sizes and settings.WHISPER_BACKEND != "openai":
+        # CTranslate2 starts its thread pool when the model is constructed, and
+        # threads do not survive fork; children load it on their first job.
+        logger.info(f"Whisper preload skipped for the {settings.WHISPER_BACKEND} backend")
+        sizes = []
+
+    if sizes:
+        from app.processing.transcription import sync_whisper_worker
+        from modules.transcription import warm_up_whisper_model
+
+        if prefork:
+            # A single intra-op thread keeps OpenMP from starting its pool in the
+            # parent; a pool created before fork deadlocks the children.
+            _set_torch_threads(1)
+        sync_whisper_worker()
+        for size in sizes:
+            try:
+                seconds = warm_up_whisper_model(size, settings.WHISPER_BACKEND)
+                logger.info(f"Preloaded Whisper model '{size}' in {seconds:.1f}s")
+            except Exception:
+                logger.exception(f"Whisper preload of '{size}' failed; it will load on first use")
+
+    if not prefork:
+        _set_torch_threads(torch_threads_per_process(_concurrency))
+
+
+@worker_process_init.connect
+def size_torch_threads(**kwargs):
+    """Give each pool process its share of the cores."""
+    threads = torch_threads_per_process(_concurrency)
+    _set_torch_threads(threads)
+    logger.info(f"Pool process {os.getpid()}: torch intra-op threads = {threads}")
@@ -0,0 +1,143 @@
+import hashlib
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+@pytest.fixture
+def multipart_storage():
+    with patch("app.api.v1.endpoints.uploads.storage") as mock:
+        mock.create_multipart_upload = MagicMock(return_value="mp-1")
+        mock.upload_part = MagicMock(side_effect=lambda key, upload_id, n, data: f"etag-{n}")
+        mock.complete_multipart_upload = MagicMock()
+        mock.abort_multipart_upload = MagicMock()
+        yield mock
+
+
+@pytest.mark.asyncio
+async def test_upload_streams_parts_and_hashes(authenticated_client, multipart_storage):
+    content = b"x" * (5 * 1024 * 1024 + 10)
+    with patch("app.api.v1.endpoints.uploads.settings.UPLOAD_PART_SIZE_BYTES", 5 * 1024 * 1024):
+        response = await authenticated_client.post(
+            "/api/v1/uploads/video",
+            files={"file": ("clip.mp4", content, "video/mp4")},
+        )
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["size"] == len(content)
+    assert data["sha256"] == hashlib.sha256(content).hexdigest()
+    part_sizes = [len(call.args[3]) for call in multipart_storage.upload_part.call_args_list]
+    assert part_sizes == [5 * 1024 * 1024, 10]
+    multipart_storage.complete_multipart_upload.assert_called_once()
+    multipart_storage.abort_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_aborts_multipart(authenticated_client, multipart_storage):
+    with patch("app.api.v1.endpoints.uploads.settings.MAX_UPLOAD_SIZE_BYTES", 1024):
+        response = await authenticated_client.post(
+            "/api/v1/uploads/video",
+            files={"file": ("clip.mp4", b"x" * 2048, "video/mp4")},
+        )
+
+    assert response.status_code == 413
+    multipart_storage.abort_multipart_upload.assert_called_once()
+    multipart_storage.complete_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_over_limit_is_rejected_by_content_length(authenticated_client, multipart_storage):
+    with patch("app.api.v1.endpoints.uploads.settings.MAX_UPLOAD_SIZE_BYTES", 1024):
+        response = await authenticated_client.post(
+            "/api/v1/uploads/video",
+            files={"file": ("clip.mp4", b"x" * (256 * 1024), "video/mp4")},
+        )
+
+    assert response.status_code == 413
+    multipart_storage.create_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_chunked_upload_without_content_length_is_capped_while_reading(
+    authenticated_client, multipart_storage
+):
+    head = (b'--b\r\nContent-Disposition: form-data; name="file"; filename="clip.mp4"\r\n'
+            b"Content-Type: video/mp4\r\n\r\n")
+
+    async def body():
+        yield head
+        for _ in range(8):
+            yield b"x" * 1024
+
+    with patch("app.api.v1.endpoints.uploads.settings.MAX_UPLOAD_SIZE_BYTES", 4096):
+        response = await authenticated_client.post(
+            "/api/v1/uploads/video",
+            content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+
+    assert response.status_code == 413
+    multipart_storage.abort_multipart_upload.assert_called_once()
+    multipart_storage.upload_part.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_upload_session_presigns_and_completes(authenticated_client, multipart_storage):
+    multipart_storage.generate_presigned_part_url = MagicMock(
+        side_effect=lambda key, upload_id, n, expires: f"https://s3/{n}"
+    )
+    multipart_storage.list_parts = MagicMock(return_value=[
+        {"PartNumber": 1, "ETag": "e1", "Size": 8 * 1024 * 1024},
+        {"PartNumber": 2, "ETag": "e2", "Size": 100},
+    ])
+
+    response = await authenticated_client.post(
+        "/api/v1/uploads/sessions", json={"filename": "clip.mp4", "size": 8 * 1024 * 1024 + 100}
+    )
+    assert response.status_code == 201
+    session = response.json()
+    assert session["s3_key"].endswith(f"/{session['upload_id']}/clip.mp4")
+    assert session["multipart_upload_id"] == "mp-1"
+    assert session["part_count"] == 2
+
+    ref = {"s3_key": session["s3_key"], "multipart_upload_id": "mp-1"}
+    response = await authenticated_client.post("/api/v1/uploads/sessions/parts", json={**ref, "part_numbers": [1, 2]})
+    assert [p["url"] for p in response.json()["parts"]] == ["https://s3/1", "https://s3/2"]
+
+    response = await authenticated_client.post("/api/v1/uploads/sessions/complete", json=ref)
+    assert response.status_code == 200
+    assert response.json()["size"] == 8 * 1024 * 1024 + 100
+    multipart_storage.complete_multipart_upload.assert_called_once_with(
+        session["s3_key"], "mp-1", [{"PartNumber": 1, "ETag": "e1"}, {"PartNumber": 2, "ETag": "e2"}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_session_rejects_other_users_key(authenticated_client, multipart_storage):
+    response = await authenticated_client.post(
+        "/api/v1/uploads/sessions/complete",
+        json={"s3_key": "uploads/someone-else/x/clip.mp4", "multipart_upload_id": "mp-1"},
+    )
+    assert response.status_code == 403
+    multipart_storage.complete_multipart_upload.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_reupload_of_same_content_returns_existing_key(authenticated_client, multipart_storage, mock_storage):
+    content = b"same video"
+    first = await authenticated_client.post(
+        "/api/v1/uploads/video", files={"file": ("a.mp4", content, "video/mp4")}
+    )
+    second = await authenticated_client.post(
+        "/api/v1/uploads/video", files={"file": ("b.mp4", content, "video/mp4")}
+    )
+
+    assert first.json()["deduplicated"] is False
+    assert second.json()["deduplicated"] is True
+    assert second.json()["s3_key"] == first.json()["s3_key"]
+    multipart_storage.delete_file.assert_called_once()
+    assert multipart_storage.delete_file.call_args.args[0].endswith("/b.mp4")
+
+    lookup = await authenticated_client.get(f"/api/v1/uploads/by-hash/{hashlib.sha256(content).hexdigest()}")
+    assert lookup.json()["s3_key"] == first.json()["s3_key"]
@@ -0,0 +1,65 @@
+import pytest
+
+from modules.chunked_transcription import plan_chunk_boundaries, stitch_chunk_segments
+
+
+def test_plan_chunk_boundaries_covers_audio_without_gaps():
+    energies = [1.0] * 20000  # 600 s of 30 ms frames, no silence
+    windows = plan_chunk_boundaries(energies, duration=600.0, chunk_seconds=200)
+
+    assert len(windows) == 3
+    assert windows[0][0] == 0.0
+    assert windows[-1][1] == 600.0
+    for (_, end), (start, _) in zip(windows, windows[1:]):
+        assert end == start
+
+
+def test_plan_chunk_boundaries_cuts_at_nearby_silence():
+    energies = [1.0] * 20000
+    silent_frame = int(205 / 0.03)  # pause 5 s after the ideal cut at 200 s
+    energies[silent_frame] = 0.0
+    windows = plan_chunk_boundaries(energies, duration=600.0, chunk_seconds=200)
+
+    assert windows[0][1] == pytest.approx(silent_frame * 0.03)
+
+
+def test_plan_chunk_boundaries_short_audio_is_single_window():
+    windows = plan_chunk_boundaries([1.0] * 100, duration=3.0, chunk_seconds=300)
+    assert windows == [(0.0, 3.0)]
+
+
+def test_stitch_offsets_segments_and_drops_padding_duplicates():
+    chunks = [
+        {"offset": 0.0, "keep_start": 0.0, "keep_end": 100.0, "segments": [
+            {"start": 0.0, "end": 50.0, "text": "first"},
+            {"start": 95.0, "end": 99.0, "text": "boundary"},
+            {"start": 100.2, "end": 101.0, "text": "padding tail"},
+        ]},
+        {"offset": 99.0, "keep_start": 100.0, "keep_end": 200.0, "segments": [
+            {"start": 0.0, "end": 0.5, "text": "boundary"},
+            {"start": 1.2, "end": 2.0, "text": "padding tail"},
+            {"start": 10.0, "end": 20.0, "text": "second"},
+        ]},
+    ]
+    segments = stitch_chunk_segments(chunks)
+
+    assert [s["text"] for s in segments] == ["first", "boundary", "padding tail", "second"]
+    assert segments[2]["start"] == pytest.approx(100.2)
+    assert segments[3]["start"] == pytest.approx(109.0)
+    assert all(set(s) == {"start", "end", "text"} for s in segments)
+
+
+def test_stitch_drops_repeated_text_across_boundary():
+    chunks = [
+        {"offset": 0.0, "keep_start": 0.0, "keep_end": 10.0, "segments": [
+            {"start": 8.0, "end": 9.8, "text": "Hello there."},
+        ]},
+        {"offset": 9.0, "keep_start": 10.0, "keep_end": 20.0, "segments": [
+            {"start": 0.9, "end": 2.0, "text": "hello there"},
+            {"start": 2.0, "end": 4.0, "text": "General Kenobi"},
+        ]},
+    ]
+    segments = stitch_chunk_segments(chunks)
+
+    assert [s["text"] for s in segments] == ["Hello there.", "General Kenobi"]
+    assert segments[1]["start"] >= segments[0]["end"]
@@ -0,0 +1,66 @@
+import pytest
+
+from modules.clip_selection import normalize_candidates, shortlist_candidates, solve_clip_selection, split_time_windows
+
+
+def _total(clips):
+    return round(sum(c["end"] - c["start"] for c in clips), 2)
+
+
+def _assert_chronological_and_disjoint(clips):
+    for a, b in zip(clips, clips[1:]):
+        assert a["end"] <= b["start"]
+
+
+def test_picks_high_scores_and_hits_target_exactly():
+    candidates = [
+        {"start": 0, "end": 12, "score": 9},
+        {"start": 10, "end": 20, "score": 3},   # overlaps the first
+        {"start": 30, "end": 38, "score": 8},
+        {"start": 50, "end": 70, "score": 2},
+        {"start": 80, "end": 88, "score": 7},
+    ]
+    clips = solve_clip_selection(candidates, 30, media_duration=120)
+
+    assert _total(clips) == 30
+    _assert_chronological_and_disjoint(clips)
+    starts = [c["start"] for c in clips]
+    assert starts == [0, 30, 80]
+    assert not any(c["score"] == 3 for c in clips)
+
+
+def test_fills_gap_by_extending_into_free_time():
+    clips = solve_clip_selection([{"start": 10, "end": 14, "score": 9}, {"start": 40, "end": 45, "score": 5}],
+                                 20, media_duration=60)
+    assert _total(clips) == 20
+    _assert_chronological_and_disjoint(clips)
+
+
+def test_short_source_returns_what_exists():
+    clips = solve_clip_selection([{"start": 0, "end": 8, "score": 5}], 30, media_duration=10)
+    assert _total(clips) == 10
+    assert clips[0]["start"] == 0 and clips[0]["end"] == 10
+
+
+@pytest.mark.parametrize("bad", [{"start": 5}, {"start": "x", "end": 9}, {"start": 3, "end": 3.5}])
+def test_normalize_drops_unusable_candidates(bad):
+    assert normalize_candidates([bad]) == []
+
+
+def test_split_time_windows_breaks_between_segments():
+    segments = [{"start": t, "end": t + 250, "text": "x"} for t in range(0, 3000, 250)]
+    windows = split_time_windows(segments, 900)
+
+    assert [len(w) for w in windows] == [4, 4, 4]
+    assert [seg for w in windows for seg in w] == segments
+
+
+def test_shortlist_keeps_best_scores_up_to_factor_of_target():
+    candidates = [
+        {"start": i * 20, "end": i * 20 + 10, "score": i % 5} for i in range(30)
+    ]
+    shortlist = shortlist_candidates(candidates, target_duration=20, factor=2.0)
+
+    assert _total(shortlist) == 40
+    assert all(c["score"] == 4 for c in shortlist)
+    assert [c["start"] for c in shortlist] == sorted(c["start"] for c in shortlist)
@@ -0,0 +1,84 @@
+import pytest
+
+from modules.ffmpeg_render import (
+    build_render_filtergraph,
+    frame_duration,
+    is_variable_frame_rate,
+    plan_clip_windows,
+    plan_smart_cut,
+    x264_profile,
+)
+
+
+def test_plan_clip_windows_without_cap_keeps_all_clips():
+    clips = [{"start": 0, "end": 5}, {"start": 10, "end": 20}]
+    windows = plan_clip_windows(clips)
+    assert [(w["start"], w["end"]) for w in windows] == [(0.0, 5.0), (10.0, 20.0)]
+
+
+def test_plan_clip_windows_trims_last_clip_to_cap():
+    clips = [{"start": 0, "end": 5}, {"start": 10, "end": 20}, {"start": 30, "end": 40}]
+    windows = plan_clip_windows(clips, max_total=12)
+    assert [(w["start"], w["end"]) for w in windows] == [(0.0, 5.0), (10.0, 17.0)]
+    assert sum(w["end"] - w["start"] for w in windows) == pytest.approx(12)
+
+
+def test_plan_clip_windows_preserves_extra_fields():
+    windows = plan_clip_windows([{"start": 1, "end": 3, "reason": "intro"}], max_total=10)
+    assert windows[0]["reason"] == "intro"
+
+
+def test_build_render_filtergraph_concats_and_maps_narration():
+    graph = build_render_filtergraph(3, 31.5)
+    assert "[v0][v1][v2]concat=n=3:v=1:a=0[vout]" in graph
+    assert "[3:a]apad,atrim=duration=31.500" in graph
+    # Original audio from the clip inputs is never referenced
+    assert "[0:a]" not in graph
+
+
+def test_build_render_filtergraph_single_clip():
+    graph = build_render_filtergraph(1, 10)
+    assert "concat" not in graph
+    assert "[v0]null[vout]" in graph
+
+
+def test_build_render_filtergraph_requires_clips():
+    with pytest.raises(ValueError):
+        build_render_filtergraph(0, 10)
+
+
+def test_plan_smart_cut_copies_between_keyframes():
+    pieces = plan_smart_cut(10.5, 30.2, [8.0, 12.0, 20.0, 28.0, 32.0], frame_dur=0.04)
+    assert pieces == [("encode", 10.5, 12.0), ("copy", 12.0, 28.0), ("encode", 28.0, 30.2)]
+
+
+def test_plan_smart_cut_skips_head_when_start_is_keyframe():
+    pieces = plan_smart_cut(12.01, 30.0, [12.0, 20.0, 28.0], frame_dur=0.04)
+    assert pieces[0] == ("copy", 12.0, 28.0)
+    assert pieces[-1] == ("encode", 28.0, 30.0)
+
+
+def test_plan_smart_cut_reencodes_short_windows():
+    assert plan_smart_cut(10.0, 12.0, [11.0], frame_dur=0.04) == [("encode", 10.0, 12.0)]
+    assert plan_smart_cut(10.0, 12.0, [10.5, 11.0], frame_dur=0.04) == [("encode", 10.0, 12.0)]
+
+
+def test_frame_rate_helpers():
+    cfr = {"r_frame_rate": "30000/1001", "avg_frame_rate": "30000/1001"}
+    vfr = {"r_frame_rate": "60/1", "avg_frame_rate": "2997/100"}
+    assert frame_duration(cfr) == pytest.approx(1001 / 30000)
+    assert not is_variable_frame_rate(cfr)
+    assert is_variable_frame_rate(vfr)
+    assert is_variable_frame_rate({"r_frame_rate": "0/0", "avg_frame_rate": "0/0"})
+
+
+@pytest.mark.parametrize("ffprobe_name, expected", [
+    ("Constrained Baseline", "baseline"),
+    ("High", "high"),
+    ("High 4:4:4 Predictive", "high444"),
+    ("High 10", "high10"),
+    ("Extended", None),
+    (None, None),
+])
+def test_x264_profile_maps_ffprobe_names(ffprobe_name, expected):
+    assert x264_profile(ffprobe_name) == expected
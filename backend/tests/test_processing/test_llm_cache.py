@@ -0,0 +1,98 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from modules.llm_cache import LLMGateway, SQLiteCache, request_key
+
+
+def _fake_client(*contents):
+    client = MagicMock()
+    client.chat.completions.create.side_effect = [
+        SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=c), finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        )
+        for c in contents
+    ]
+    return client
+
+
+def test_request_key_ignores_parameter_order():
+    messages = [{"role": "user", "content": "hi"}]
+    assert request_key("chat", model="m", messages=messages, params={"a": 1, "b": 2}) == \
+        request_key("chat", params={"b": 2, "a": 1}, messages=messages, model="m")
+    assert request_key("chat", model="m", messages=messages, params={}) != \
+        request_key("chat", model="other", messages=messages, params={})
+
+
+def test_repeated_chat_is_served_from_cache(tmp_path):
+    client = _fake_client("first", "second")
+    gateway = LLMGateway(SQLiteCache(str(tmp_path / "cache.sqlite")), client=client)
+    messages = [{"role": "user", "content": "recap this"}]
+
+    first = gateway.chat(model="gpt-4o", messages=messages, max_tokens=100)
+    again = gateway.chat(model="gpt-4o", messages=messages, max_tokens=100)
+    fresh = gateway.chat(model="gpt-4o", messages=messages, max_tokens=100, cache=False)
+
+    assert (first.content, first.cached) == ("first", False)
+    assert (again.content, again.cached, again.usage) == ("first", True, None)
+    assert fresh.content == "second"
+    assert client.chat.completions.create.call_count == 2
+    assert gateway.stats()["hits"] == 1 and gateway.stats()["misses"] == 1
+
+
+def test_cache_survives_a_new_process_connection(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    messages = [{"role": "user", "content": "translate"}]
+    LLMGateway(SQLiteCache(path), client=_fake_client("hola")).chat(model="m", messages=messages)
+
+    client = _fake_client()
+    assert LLMGateway(SQLiteCache(path), client=client).chat(model="m", messages=messages).content == "hola"
+    client.chat.completions.create.assert_not_called()
+
+
+def test_sqlite_cache_expires_and_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl_seconds=60, max_bytes=25)
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr("modules.llm_cache.time.time", lambda: next(clock))
+
+    cache.set("a", b"x" * 10)
+    cache.set("b", b"x" * 10)
+    assert cache.get("a") == b"x" * 10  # a is now more recent than b
+    cache.set("c", b"x" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+    monkeypatch.setattr("modules.llm_cache.time.time", lambda: 5000)
+    assert cache.get("a") is None
+
+
+def test_broken_cache_falls_back_to_the_api():
+    cache = MagicMock()
+    cache.get.side_effect = OSError("disk full")
+    gateway = LLMGateway(cache, client=_fake_client("ok"))
+
+    assert gateway.chat(model="m", messages=[]).content == "ok"
+    assert gateway.stats()["errors"] == 1
+
+
+def test_client_follows_the_current_api_key(monkeypatch):
+    created = []
+
+    def fake_openai(api_key=None, max_retries=None):
+        client = _fake_client(f"answer for {api_key}")
+        created.append(api_key)
+        return client
+
+    monkeypatch.setitem(sys.modules, "openai", SimpleNamespace(OpenAI=fake_openai))
+    gateway = LLMGateway()
+
+    monkeypatch.setenv("OPENAI_API_KEY", "key-user-a")
+    first = gateway.chat(model="m", messages=[{"role": "user", "content": "hi"}])
+    monkeypatch.setenv("OPENAI_API_KEY", "key-user-b")
+    second = gateway.chat(model="m", messages=[{"role": "user", "content": "hi"}])
+
+    assert first.content == "answer for key-user-a"
+    assert second.content == "answer for key-user-b"
+    assert created == ["key-user-a", "key-user-b"]
@@ -0,0 +1,51 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("moviepy.editor")
+
+from modules.video_processing import _plan_long_form
+
+
+class _FakeLLM:
+    """Answers each window with one candidate; the window saying "garbled" gets invalid JSON."""
+
+    def __init__(self):
+        self.calls = []
+
+    def chat(self, *, model, messages, cache=True, **params):
+        prompt = messages[-1]["content"]
+        self.calls.append((prompt, cache))
+        if prompt.startswith("A long video was split into parts"):
+            return SimpleNamespace(content=json.dumps({"summary": "whole story", "scores": []}), usage=None)
+        if "garbled" in prompt:
+            return SimpleNamespace(content="Sure! Here are the clips: [", usage=None)
+        start = 0.0 if "opening" in prompt else 200.0
+        content = {"summary": "part", "candidates": [{"start": start, "end": start + 5, "score": 8}]}
+        return SimpleNamespace(content=json.dumps(content), usage=None)
+
+
+def _segments(*texts):
+    return [{"start": i * 100.0, "end": i * 100.0 + 10, "text": text} for i, text in enumerate(texts)]
+
+
+def _plan(llm, segments):
+    return _plan_long_form(llm, "gpt-4o", "system", segments, 30, "", False,
+                           window_seconds=100, max_parallel_calls=2, prerank_coverage=0)
+
+
+def test_window_with_invalid_json_is_retried_then_skipped():
+    llm = _FakeLLM()
+
+    summary, candidates = _plan(llm, _segments("the opening scene", "a garbled part", "the ending"))
+
+    assert summary == "whole story"
+    assert [c["start"] for c in candidates] == [0.0, 200.0]
+    garbled = [cache for prompt, cache in llm.calls if "garbled" in prompt]
+    assert garbled == [True, False]  # the retry bypasses the cached bad answer
+
+
+def test_planning_fails_when_every_window_fails():
+    with pytest.raises(RuntimeError, match="no candidates"):
+        _plan(_FakeLLM(), _segments("garbled one", "garbled two"))
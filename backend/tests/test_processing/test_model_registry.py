@@ -0,0 +1,72 @@
+from modules.model_registry import ModelRegistry
+
+
+class _Model:
+    def __init__(self, size):
+        self.size = size
+
+
+def _loader(loads, name, size):
+    def load():
+        loads.append(name)
+        return _Model(size)
+    return load
+
+
+def test_hit_reuses_loaded_model_and_counts_stats():
+    registry = ModelRegistry()
+    loads = []
+
+    with registry.acquire("small", _loader(loads, "small", 10), estimate_bytes=100) as first:
+        pass
+    with registry.acquire("small", _loader(loads, "small", 10), estimate_bytes=100) as second:
+        pass
+
+    assert first is second
+    assert loads == ["small"]
+    stats = registry.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["models"][0]["key"] == "small"
+    assert stats["models"][0]["refs"] == 0
+
+
+def test_least_recently_used_idle_model_is_evicted_over_budget():
+    registry = ModelRegistry(budget_bytes=250)
+    loads = []
+
+    for name in ("tiny", "base"):
+        with registry.acquire(name, _loader(loads, name, 100), estimate_bytes=100):
+            pass
+    with registry.acquire("tiny", _loader(loads, "tiny", 100), estimate_bytes=100):
+        pass  # tiny is now most recently used
+    with registry.acquire("small", _loader(loads, "small", 100), estimate_bytes=100):
+        pass
+
+    assert "base" not in registry
+    assert "tiny" in registry and "small" in registry
+    assert registry.stats()["evictions"] == 1
+
+
+def test_model_in_use_is_never_evicted():
+    registry = ModelRegistry(budget_bytes=150)
+    loads = []
+
+    with registry.acquire("medium", _loader(loads, "medium", 100), estimate_bytes=100) as medium:
+        with registry.acquire("large", _loader(loads, "large", 100), estimate_bytes=100):
+            assert "medium" in registry
+            assert registry.resident_bytes == 200  # over budget while both are pinned
+        assert medium is not None
+
+    # Released: back within budget, keeping the most recently used model
+    assert registry.resident_bytes <= 150
+    assert "medium" in registry
+
+
+def test_clear_keeps_pinned_model_accounted_until_release():
+    registry = ModelRegistry()
+
+    with registry.acquire("small", lambda: _Model(1), estimate_bytes=100):
+        registry.clear()
+        assert "small" not in registry
+        assert registry.resident_bytes == 100
+    assert registry.resident_bytes == 0
@@ -0,0 +1,39 @@
+import os
+import wave
+
+import pytest
+
+from modules.pcm_audio import SAMPLE_RATE, audio_duration, is_pcm_file
+
+
+def test_audio_duration_of_pcm_file_from_size(tmp_path):
+    path = tmp_path / "extracted_audio.f32"
+    path.write_bytes(b"\0" * (4 * SAMPLE_RATE * 3))
+    assert is_pcm_file(str(path))
+    assert audio_duration(str(path)) == pytest.approx(3.0)
+
+
+def test_audio_duration_of_wav_from_header(tmp_path):
+    path = os.path.join(tmp_path, "chunk_000.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(b"\0\0" * SAMPLE_RATE * 2)
+    assert not is_pcm_file(path)
+    assert audio_duration(path) == pytest.approx(2.0)
+
+
+def test_pcm_to_wav_writes_16_bit_mono(tmp_path):
+    np = pytest.importorskip("numpy")
+    from modules.pcm_audio import pcm_to_wav
+
+    pcm = tmp_path / "extracted_audio.f32"
+    np.full(SAMPLE_RATE * 3, 0.5, dtype="<f4").tofile(pcm)
+
+    wav_path = pcm_to_wav(str(pcm), str(tmp_path / "assemblyai_audio.wav"), block_seconds=1)
+
+    with wave.open(wav_path, "rb") as wav:
+        assert (wav.getnchannels(), wav.getsampwidth(), wav.getframerate()) == (1, 2, SAMPLE_RATE)
+        frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+    assert len(frames) == SAMPLE_RATE * 3 and frames[0] == 16383
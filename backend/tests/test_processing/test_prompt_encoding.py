@@ -0,0 +1,64 @@
+import json
+
+from modules.prompt_encoding import (
+    encode_segment,
+    encode_transcript,
+    estimate_tokens,
+    merge_short_segments,
+    segments_in_window,
+    transcript_token_budget,
+)
+
+
+def _segments(n, words=12):
+    return [
+        {"start": i * 3.0, "end": i * 3.0 + 2.5, "text": " ".join(["word"] * words), "speaker_name": f"S{i % 2}"}
+        for i in range(n)
+    ]
+
+
+def test_encode_segment_is_compact_and_keeps_emotion():
+    seg = {"start": 12.34, "end": 15.8, "text": " Hello there ", "speaker_name": "Ana",
+           "dominant_emotion": "joy", "intensity": 0.82}
+    assert encode_segment(seg) == "[12.3-15.8] Ana (joy 0.8): Hello there"
+    assert encode_segment({"start": 0, "end": 1, "text": "hi", "dominant_emotion": "neutral"}) == "[0.0-1.0] hi"
+
+
+def test_encoding_is_much_smaller_than_indented_json():
+    segments = _segments(40, words=4)
+    assert len(encode_transcript(segments)) * 2 < len(json.dumps(segments, indent=2))
+
+
+def test_merge_joins_short_same_speaker_segments():
+    segments = [
+        {"start": 0.0, "end": 0.8, "text": "Oh", "speaker_name": "Ana"},
+        {"start": 0.8, "end": 1.5, "text": "no!", "speaker_name": "Ana", "dominant_emotion": "fear", "intensity": 0.9},
+        {"start": 1.5, "end": 4.0, "text": "Run.", "speaker_name": "Ben"},
+    ]
+    merged = merge_short_segments(segments)
+    assert [m["text"] for m in merged] == ["Oh no!", "Run."]
+    assert merged[0]["end"] == 1.5 and merged[0]["dominant_emotion"] == "fear"
+    assert segments[0]["text"] == "Oh"
+
+
+def test_transcript_is_fit_to_budget_and_keeps_both_ends():
+    segments = _segments(400, words=40)
+    text = encode_transcript(segments, budget_tokens=1000, merge=False)
+    lines = text.splitlines()
+
+    assert estimate_tokens(text) <= 1000
+    assert lines[0].startswith("[0.0-2.5]")
+    assert any("omitted" in line for line in lines)
+
+
+def test_budget_from_model_and_env_override(monkeypatch):
+    monkeypatch.delenv("LLM_TRANSCRIPT_TOKEN_BUDGET", raising=False)
+    assert transcript_token_budget("gpt-4o-2024-08-06") == 64000
+    assert transcript_token_budget("some-unknown-model") == 4096
+    monkeypatch.setenv("LLM_TRANSCRIPT_TOKEN_BUDGET", "1500")
+    assert transcript_token_budget("gpt-4o") == 1500
+
+
+def test_segments_in_window_returns_overlaps():
+    segments = _segments(5)
+    assert [s["start"] for s in segments_in_window(segments, 4.0, 7.0)] == [3.0, 6.0]
@@ -0,0 +1,50 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from modules.segment_ranking import prerank_segments, score_windows
+
+
+def _seg(start, text, speaker="A", **extra):
+    return {"start": float(start), "end": float(start) + 4.0, "text": text, "speaker_name": speaker, **extra}
+
+
+def _filler(start):
+    return _seg(start, "the weather today is calm and the road is quiet")
+
+
+def test_repeated_talk_scores_below_new_emotional_exchange():
+    segments = [_filler(t) for t in range(0, 60, 5)]
+    segments += [
+        _seg(60, "Wait, who opened the vault door?", "A"),
+        _seg(65, "Marcus did, he betrayed everyone!", "B", dominant_emotion="anger", intensity=0.9),
+        _seg(70, "Then we have to run right now", "A", dominant_emotion="fear", intensity=0.8),
+    ]
+    segments += [_filler(t) for t in range(75, 120, 5)]
+
+    window_index, scores = score_windows(segments, window_seconds=15)
+
+    assert len(window_index) == len(segments)
+    assert int(np.argmax(scores)) == window_index[segments.index(segments[13])]
+    assert scores.min() >= 0 and scores.max() <= 1
+
+
+def test_prerank_keeps_top_windows_and_summarizes_gaps():
+    segments = [_filler(t) for t in range(0, 300, 5)]
+    segments[30] = _seg(150, "The bridge collapsed behind them", dominant_emotion="surprise", intensity=0.95)
+
+    ranked = prerank_segments(segments, target_duration=2, coverage=8, window_seconds=15)
+
+    kept = [s for s in ranked if not s.get("skipped")]
+    placeholders = [s for s in ranked if s.get("skipped")]
+    assert segments[30] in kept
+    assert len(kept) == 6  # two 15 s windows cover 16 s; the opening window is all novelty
+    assert placeholders and all(p["text"].startswith("(skipped; begins: the weather") for p in placeholders)
+    assert [s["start"] for s in ranked] == sorted(s["start"] for s in ranked)
+    assert ranked[-1]["skipped"] and ranked[-1]["end"] == 299.0
+
+
+def test_prerank_returns_short_transcripts_unchanged():
+    segments = [_filler(t) for t in range(0, 60, 5)]
+    assert prerank_segments(segments, target_duration=30) == segments
+    assert prerank_segments(segments, target_duration=1, coverage=0) == segments
@@ -0,0 +1,52 @@
+import pytest
+
+from modules.vad import JOIN_GAP_SECONDS, remap_segments, remap_time, speech_regions
+
+
+def test_speech_regions_pads_and_bridges_short_pauses():
+    # 1 s speech, 0.3 s pause (bridged), 1 s speech, 2 s silence, 1 s speech
+    flags = [True] * 100 + [False] * 30 + [True] * 100 + [False] * 200 + [True] * 100
+    regions = speech_regions(flags, frame_seconds=0.01, pad=0.1)
+
+    assert regions == [(0.0, 2.4), (4.2, 5.3)]
+
+
+def test_speech_regions_drops_short_bursts():
+    flags = [False] * 100 + [True] * 10 + [False] * 100
+    assert speech_regions(flags, frame_seconds=0.01) == []
+
+
+def test_speech_regions_clamped_to_duration():
+    flags = [True] * 100
+    assert speech_regions(flags, frame_seconds=0.01, pad=0.5, duration=1.0) == [(0.0, 1.0)]
+
+
+def test_remap_time_maps_concatenated_time_to_source():
+    regions = [(10.0, 12.0), (30.0, 35.0)]
+
+    assert remap_time(1.0, regions) == pytest.approx(11.0)
+    second_start = 2.0 + JOIN_GAP_SECONDS
+    assert remap_time(second_start + 1.5, regions) == pytest.approx(31.5)
+
+
+def test_remap_time_snaps_times_in_join_gap():
+    regions = [(10.0, 12.0), (30.0, 35.0)]
+    in_gap = 2.0 + JOIN_GAP_SECONDS / 2
+
+    assert remap_time(in_gap, regions) == pytest.approx(12.0)
+    assert remap_time(in_gap, regions, prefer_next=True) == pytest.approx(30.0)
+
+
+def test_remap_segments_keeps_schema_and_order():
+    regions = [(5.0, 7.0), (20.0, 22.0)]
+    segments = [
+        {"start": 0.5, "end": 1.5, "text": "hello"},
+        {"start": 2.1, "end": 3.0, "text": "again"},
+    ]
+
+    remapped = remap_segments(segments, regions)
+
+    assert remapped == [
+        {"start": 5.5, "end": 6.5, "text": "hello"},
+        {"start": 20.0, "end": 20.8, "text": "again"},
+    ]
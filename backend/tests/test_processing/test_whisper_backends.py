@@ -0,0 +1,84 @@
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("whisper")
+
+from modules import transcription  # noqa: E402
+from modules.model_registry import ModelRegistry  # noqa: E402
+
+
+class _FakeWhisperModel:
+    def __init__(self, model_size, device, compute_type, cpu_threads):
+        self.model_size = model_size
+        self.compute_type = compute_type
+
+    def transcribe(self, audio, language=None, beam_size=5):
+        segments = iter([
+            SimpleNamespace(id=0, start=0.0, end=1.5, text=" Hello there."),
+            SimpleNamespace(id=1, start=1.5, end=3.0, text=" General Kenobi."),
+        ])
+        return segments, SimpleNamespace(language=language or "en")
+
+
+@pytest.fixture
+def fake_faster_whisper(monkeypatch):
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = _FakeWhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(transcription, "_WHISPER_REGISTRY", ModelRegistry())
+
+
+def test_ctranslate2_backend_returns_openai_segment_schema(fake_faster_whisper):
+    model = transcription.load_whisper_model("small", "ctranslate2")
+
+    result = model.transcribe("audio.wav", verbose=None, language="en")
+
+    assert model._model.compute_type == "int8"
+    assert result["language"] == "en"
+    assert [(s["start"], s["end"], s["text"].strip()) for s in result["segments"]] == [
+        (0.0, 1.5, "Hello there."),
+        (1.5, 3.0, "General Kenobi."),
+    ]
+
+
+def test_backends_are_cached_separately(fake_faster_whisper):
+    with transcription.whisper_model("small", "ctranslate2") as model:
+        pass
+
+    assert transcription.is_whisper_model_cached("small", "ctranslate2")
+    assert not transcription.is_whisper_model_cached("small")
+    with transcription.whisper_model("small", "ctranslate2") as again:
+        assert again is model
+
+    transcription.clear_whisper_model_cache()
+    assert not transcription.is_whisper_model_cached("small", "ctranslate2")
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown Whisper backend"):
+        transcription.load_whisper_model("small", "tensorrt")
+
+
+def test_threaded_chunk_workers_load_replicas_through_the_registry(fake_faster_whisper, monkeypatch):
+    from modules.chunked_transcription import _transcribe_chunks_threaded
+
+    monkeypatch.setitem(sys.modules, "torch", None)  # the ctranslate2 path must not need torch
+
+    budget = 3 * transcription._estimated_model_bytes("small", "ctranslate2")
+    transcription.set_whisper_model_budget(budget // (1024 * 1024) + 1)
+    assert transcription.whisper_model_capacity("small", "ctranslate2") == 3
+
+    with transcription.whisper_model("small", "ctranslate2") as model:
+        assert transcription.whisper_model_capacity("small", "ctranslate2") == 2
+        jobs = [("a.wav", "en"), ("b.wav", "en"), ("c.wav", "en")]
+        results = _transcribe_chunks_threaded(jobs, model, "small", 3, 1, "ctranslate2")
+
+    assert len(results) == 3
+    stats = transcription.whisper_registry_stats()
+    assert sorted(m["key"] for m in stats["models"]) == [
+        "ctranslate2:small", "ctranslate2:small#1", "ctranslate2:small#2",
+    ]
+    assert stats["resident_bytes"] <= stats["budget_bytes"]
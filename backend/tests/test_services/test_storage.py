@@ -0,0 +1,45 @@
+import os
+import tempfile
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.storage import StorageService
+
+
+@pytest.fixture
+def service():
+    svc = StorageService()
+    svc.client = MagicMock()
+    svc.client.delete_objects.return_value = {}
+    return svc
+
+
+def test_delete_files_chunks_to_1000_keys(service):
+    service.delete_files([f"k{i}" for i in range(2500)])
+
+    batches = [len(call.kwargs["Delete"]["Objects"]) for call in service.client.delete_objects.call_args_list]
+    assert batches == [1000, 1000, 500]
+
+
+def test_upload_files_sends_every_file_with_transfer_config(service):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        files = {}
+        for i in range(5):
+            path = os.path.join(tmpdir, f"f{i}.json")
+            with open(path, "w") as f:
+                f.write("{}")
+            files[f"jobs/j/f{i}.json"] = path
+
+        service.upload_files(files)
+
+    uploaded = {call.args[2] for call in service.client.upload_fileobj.call_args_list}
+    assert uploaded == set(files)
+    assert all(call.kwargs["Config"] is service.transfer_config
+               for call in service.client.upload_fileobj.call_args_list)
+
+
+def test_batch_failure_is_raised(service):
+    service.client.download_file.side_effect = [None, RuntimeError("boom")]
+    with pytest.raises(RuntimeError):
+        service.download_files({"a": "/tmp/a", "b": "/tmp/b"})
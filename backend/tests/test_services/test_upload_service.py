@@ -0,0 +1,60 @@
+import pytest
+
+from app.models.user import User
+from app.services import upload_service
+
+
+@pytest.mark.asyncio
+async def test_object_released_only_by_last_job(db_session):
+    user = User(email="u@test.com", full_name="U", auth_provider="local")
+    db_session.add(user)
+    await db_session.commit()
+    await upload_service.register(db_session, user.id, "uploads/u/1/a.mp4", "ab" * 32, 100)
+
+    assert await upload_service.retain(db_session, "uploads/u/1/a.mp4")
+    assert await upload_service.retain(db_session, "uploads/u/1/a.mp4")
+    assert await upload_service.is_retained(db_session, "uploads/u/1/a.mp4")
+
+    assert await upload_service.release(db_session, "uploads/u/1/a.mp4") is False
+    assert await upload_service.release(db_session, "uploads/u/1/a.mp4") is True
+    assert not await upload_service.is_retained(db_session, "uploads/u/1/a.mp4")
+
+
+@pytest.mark.asyncio
+async def test_unindexed_key_is_owned_by_its_job(db_session):
+    assert await upload_service.retain(db_session, "uploads/u/legacy/a.mp4") is False
+    assert await upload_service.release(db_session, "uploads/u/legacy/a.mp4") is True
+
+
+@pytest.mark.asyncio
+async def test_only_server_computed_hashes_key_the_memo(db_session):
+    user = User(email="h@test.com", full_name="H", auth_provider="local")
+    db_session.add(user)
+    await db_session.commit()
+    await upload_service.register(db_session, user.id, "uploads/h/1/a.mp4", "ab" * 32, 100, verified=True)
+    await upload_service.register(db_session, user.id, "uploads/h/2/b.mp4", "cd" * 32, 100)
+
+    def hashes(session):
+        return [upload_service.verified_hash_sync(session, key)
+                for key in ("uploads/h/1/a.mp4", "uploads/h/2/b.mp4", "uploads/h/3/missing.mp4")]
+
+    assert await db_session.run_sync(hashes) == ["ab" * 32, None, None]
+
+
+@pytest.mark.asyncio
+async def test_missing_object_keeps_row_while_jobs_reference_it(db_session):
+    from unittest.mock import patch
+
+    user = User(email="m@test.com", full_name="M", auth_provider="local")
+    db_session.add(user)
+    await db_session.commit()
+    await upload_service.register(db_session, user.id, "uploads/m/1/a.mp4", "ef" * 32, 100)
+    assert await upload_service.retain(db_session, "uploads/m/1/a.mp4")
+
+    with patch("app.services.storage.storage.file_exists", return_value=False):
+        assert await upload_service.find_by_hash(db_session, user.id, "ef" * 32) is None
+        assert await upload_service.is_retained(db_session, "uploads/m/1/a.mp4")
+
+        assert await upload_service.release(db_session, "uploads/m/1/a.mp4") is True
+        await db_session.commit()
+        assert await upload_service.find_by_hash(db_session, user.id, "ef" * 32) is None
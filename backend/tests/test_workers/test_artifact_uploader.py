@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from app.core.artifact_uploader import ArtifactUploader
+
+
+def test_keys_recorded_only_after_upload_succeeds():
+    release = threading.Event()
+    recorded = []
+    uploader = ArtifactUploader(max_workers=2)
+
+    uploader.submit(lambda: release.wait(5) and {"a": "jobs/j/a"}, on_durable=recorded.append)
+    assert recorded == []  # the caller moves on while the upload is in flight
+
+    release.set()
+    uploader.wait()
+    assert recorded == [{"a": "jobs/j/a"}]
+    uploader.shutdown()
+
+
+def test_failed_upload_is_not_recorded_and_wait_raises():
+    recorded = []
+    uploader = ArtifactUploader(max_workers=2)
+
+    def fail():
+        raise OSError("connection reset")
+
+    uploader.submit(fail, on_durable=recorded.append)
+    uploader.submit(lambda: "ok", on_durable=recorded.append)
+
+    with pytest.raises(OSError):
+        uploader.wait()
+    assert recorded == ["ok"]
+    uploader.shutdown()
+
+
+def test_zero_workers_uploads_inline():
+    recorded = []
+    uploader = ArtifactUploader(max_workers=0)
+    uploader.submit(lambda: "done", on_durable=recorded.append)
+    assert recorded == ["done"]
+    assert uploader.wait() == []
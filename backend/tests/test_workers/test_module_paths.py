@@ -0,0 +1,43 @@
+import threading
+from types import SimpleNamespace
+
+from app.core.module_paths import patched_module_paths
+
+
+def _module():
+    return SimpleNamespace(__name__="fake_module", SCRIPT_DIR="/repo", get_output_path=lambda rel: f"/repo/{rel}")
+
+
+def test_overlapping_steps_of_one_job_keep_the_patch_until_both_finish():
+    mod = _module()
+    first = patched_module_paths(mod, "/work/a")
+    second = patched_module_paths(mod, "/work/a")
+
+    first.__enter__()
+    second.__enter__()
+    first.__exit__(None, None, None)
+    assert mod.get_output_path("out.json") == "/work/a/out.json"
+
+    second.__exit__(None, None, None)
+    assert mod.SCRIPT_DIR == "/repo"
+    assert mod.get_output_path("out.json") == "/repo/out.json"
+
+
+def test_another_working_dir_waits_for_the_current_patch():
+    mod = _module()
+    seen = []
+
+    def other_job():
+        with patched_module_paths(mod, "/work/b"):
+            seen.append(mod.get_output_path("out.json"))
+
+    with patched_module_paths(mod, "/work/a"):
+        thread = threading.Thread(target=other_job)
+        thread.start()
+        thread.join(timeout=0.2)
+        assert thread.is_alive() and not seen
+        assert mod.SCRIPT_DIR == "/work/a"
+
+    thread.join(timeout=5)
+    assert seen == ["/work/b/out.json"]
+    assert mod.SCRIPT_DIR == "/repo"
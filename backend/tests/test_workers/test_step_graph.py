@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from app.workers.step_graph import PipelineStep, StepGraph
+
+
+def _noop():
+    pass
+
+
+def _recap_graph(ran=None, run_fn=None):
+    """Shape of the recap pipeline: transcribe → recap → (tts, clips) → merge."""
+    def make(name):
+        def run():
+            if run_fn:
+                run_fn(name)
+            if ran is not None:
+                ran.append(name)
+        return run
+
+    return StepGraph([
+        PipelineStep("transcribe", 1, make("transcribe"), inputs=("source",), outputs=("transcription",)),
+        PipelineStep("emotions", 1, make("emotions"), inputs=("source",), outputs=("emotions",)),
+        PipelineStep("recap", 3, make("recap"), inputs=("transcription",),
+                     optional_inputs=("emotions",), outputs=("recap_data",)),
+        PipelineStep("tts", 4, make("tts"), inputs=("recap_data",), outputs=("tts_audio",)),
+        PipelineStep("clips", 5, make("clips"), inputs=("source", "recap_data"), outputs=("recap_video",)),
+        PipelineStep("merge", 7, make("merge"), inputs=("recap_video", "tts_audio"), outputs=("final",)),
+    ])
+
+
+def test_plan_fresh_run_includes_every_step_in_dependency_order():
+    graph = _recap_graph()
+    planned, restore = graph.plan("final", {"source"})
+
+    assert set(planned) == {"transcribe", "emotions", "recap", "tts", "clips", "merge"}
+    assert planned.index("recap") > planned.index("transcribe")
+    assert planned.index("recap") > planned.index("emotions")
+    assert planned.index("merge") > max(planned.index("tts"), planned.index("clips"))
+    assert restore == {"source"}
+
+
+def test_plan_resume_skips_steps_whose_outputs_exist():
+    graph = _recap_graph()
+    planned, restore = graph.plan("final", {"source", "transcription", "emotions", "recap_data"})
+
+    assert planned == ["tts", "clips", "merge"]
+    # transcription/emotions are not needed once recap_data exists
+    assert restore == {"source", "recap_data"}
+
+
+def test_plan_reruns_missing_optional_input():
+    graph = _recap_graph()
+    planned, restore = graph.plan("final", {"source", "transcription"})
+
+    assert "transcribe" not in planned
+    assert "emotions" in planned
+    assert "transcription" in restore
+
+
+def test_plan_raises_for_unproducible_artifact():
+    graph = _recap_graph()
+    with pytest.raises(ValueError, match="source"):
+        graph.plan("final", set())
+
+
+def test_duplicate_producer_rejected():
+    with pytest.raises(ValueError, match="produced by both"):
+        StepGraph([
+            PipelineStep("a", 1, _noop, outputs=("x",)),
+            PipelineStep("b", 2, _noop, outputs=("x",)),
+        ])
+
+
+def test_cycle_rejected():
+    with pytest.raises(ValueError, match="Cycle"):
+        StepGraph([
+            PipelineStep("a", 1, _noop, inputs=("y",), outputs=("x",)),
+            PipelineStep("b", 2, _noop, inputs=("x",), outputs=("y",)),
+        ])
+
+
+def test_run_respects_dependencies():
+    ran = []
+    graph = _recap_graph(ran=ran)
+    planned, _ = graph.plan("final", {"source"})
+    graph.run(planned, max_workers=4)
+
+    assert sorted(ran) == sorted(planned)
+    assert ran.index("recap") > ran.index("transcribe")
+    assert ran[-1] == "merge"
+
+
+def test_run_executes_independent_steps_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run_fn(name):
+        # tts and clips both wait for each other; only succeeds if they overlap
+        if name in ("tts", "clips"):
+            barrier.wait()
+
+    graph = _recap_graph(run_fn=run_fn)
+    planned, _ = graph.plan("final", {"source", "recap_data"})
+    graph.run(planned, max_workers=2)
+
+
+def test_run_stops_scheduling_after_failure():
+    ran = []
+
+    def run_fn(name):
+        if name == "tts":
+            raise RuntimeError("tts failed")
+        if name == "clips":
+            time.sleep(0.05)
+
+    graph = _recap_graph(ran=ran, run_fn=run_fn)
+    planned, _ = graph.plan("final", {"source", "recap_data"})
+
+    with pytest.raises(RuntimeError, match="tts failed"):
+        graph.run(planned, max_workers=2)
+    # clips was already running and is allowed to finish; merge never starts
+    assert "clips" in ran
+    assert "merge" not in ran
+
+
+def test_prepare_runs_before_each_step_and_resume_skips_source():
+    ran = []
+    prepared = []
+    graph = _recap_graph(ran=ran)
+    # Late resume: recap_video and tts_audio exist, only merge runs
+    planned, restore = graph.plan("final", {"source", "recap_video", "tts_audio"})
+
+    def prepare(step):
+        assert step.name not in ran
+        prepared.append((step.name, step.inputs))
+
+    graph.run(planned, max_workers=2, prepare=prepare)
+
+    assert prepared == [("merge", ("recap_video", "tts_audio"))]
+    assert "source" not in restore
+
+
+def test_prepare_failure_fails_the_step():
+    ran = []
+    graph = _recap_graph(ran=ran)
+    planned, _ = graph.plan("final", {"source", "recap_video", "tts_audio"})
+
+    def prepare(step):
+        raise OSError("download failed")
+
+    with pytest.raises(OSError, match="download failed"):
+        graph.run(planned, prepare=prepare)
+    assert ran == []
@@ -0,0 +1,132 @@
+import json
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from app.core.step_memo import StepMemo, file_sha256
+from app.core.step_storage import StepStorage
+
+
+class InMemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, key, file_obj):
+        self.objects[key] = file_obj.read()
+
+    def upload_files(self, files):
+        for key, path in files.items():
+            with open(path, "rb") as f:
+                self.upload_file(key, f)
+
+    def download_files(self, files):
+        for key, path in files.items():
+            self.download_file(key, path)
+
+    def upload_bytes(self, key, data, content_type="application/octet-stream"):
+        self.objects[key] = data
+
+    def download_file(self, key, dest_path):
+        with open(dest_path, "wb") as f:
+            f.write(self.objects[key])
+
+    def file_exists(self, key):
+        return key in self.objects
+
+
+@pytest.fixture
+def working_dirs():
+    dirs = [tempfile.mkdtemp(), tempfile.mkdtemp()]
+    yield dirs
+    for d in dirs:
+        shutil.rmtree(d)
+
+
+def _write(root, rel, content):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    return path
+
+
+def test_fingerprint_depends_on_fields_not_order():
+    a = StepMemo.fingerprint("recap", {"transcription": "abc", "target_duration": 30})
+    b = StepMemo.fingerprint("recap", {"target_duration": 30, "transcription": "abc"})
+    c = StepMemo.fingerprint("recap", {"transcription": "abc", "target_duration": 60})
+
+    assert a == b
+    assert a != c
+    assert a != StepMemo.fingerprint("translate", {"transcription": "abc", "target_duration": 30})
+
+
+def test_saved_result_is_restored_into_another_working_dir(working_dirs):
+    storage = InMemoryStorage()
+    first, second = working_dirs
+    recap_file = _write(first, "output/transcriptions/recap_data.json", json.dumps({"clips": [1]}))
+    text_file = _write(first, "output/transcriptions/recap_text.txt", "narration")
+    fingerprint = StepMemo.fingerprint("recap", {"transcription": "abc"})
+
+    StepMemo(storage, first).save("recap", fingerprint, {"recap_data_file": recap_file, "duration": 12.5},
+                                  extra_files=(text_file,))
+    restored = StepMemo(storage, second).load("recap", fingerprint)
+
+    assert restored == {"recap_data_file": os.path.join(second, "output/transcriptions/recap_data.json"),
+                        "duration": 12.5}
+    with open(os.path.join(second, "output/transcriptions/recap_text.txt")) as f:
+        assert f.read() == "narration"
+
+
+def test_load_misses_without_manifest(working_dirs):
+    assert StepMemo(InMemoryStorage(), working_dirs[0]).load("tts", "0" * 64) is None
+
+
+def test_file_sha256_matches_content(working_dirs):
+    path = _write(working_dirs[0], "a.txt", "hello")
+    assert file_sha256(path) == "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+
+
+def test_step_storage_records_memo_lookups_in_metadata():
+    storage = InMemoryStorage()
+    step_storage = StepStorage("job-1", storage)
+    step_storage.record_memo("transcribe", hit=True, fingerprint="f1")
+    step_storage.record_memo("recap", hit=False, fingerprint="f2")
+
+    keys = step_storage.upload_step_output(1, {}, metadata={"model": "small"}, memo_step="transcribe")
+
+    metadata = json.loads(storage.objects[keys["step_01.metadata"]])
+    assert metadata["memo"] == {"hit": True, "fingerprint": "f1"}
+    assert step_storage.memo_summary()["hits"] == 1
+    assert step_storage.memo_summary()["misses"] == 1
+
+
+def test_delete_expired_removes_old_entries_manifest_first():
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime.now(timezone.utc)
+    old, fresh = now - timedelta(days=40), now - timedelta(days=1)
+    listing = [
+        ("memo/recap/aaa/output/recap_data.json", old),
+        ("memo/recap/aaa/manifest.json", old),
+        ("memo/tts/orphan/output/audio/recap_narration.mp3", old),
+        ("memo/recap/bbb/manifest.json", fresh),
+    ]
+
+    class ListingStorage:
+        deleted = []
+
+        def list_objects(self, prefix):
+            assert prefix == "memo/"
+            return listing
+
+        def delete_files(self, keys):
+            self.deleted.append(keys)
+
+    storage = ListingStorage()
+    assert StepMemo.delete_expired(storage, now - timedelta(days=30)) == 1
+    assert storage.deleted == [
+        ["memo/recap/aaa/manifest.json"],
+        ["memo/recap/aaa/output/recap_data.json", "memo/tts/orphan/output/audio/recap_narration.mp3"],
+    ]
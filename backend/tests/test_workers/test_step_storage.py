@@ -21,6 +21,7 @@ def mock_storage():
     mock = MagicMock()
     mock.upload_file = Mock()
     mock.upload_bytes = Mock()
+    mock.upload_files = Mock(side_effect=lambda files: [mock.upload_file(k, p) for k, p in files.items()])
     return mock
 
 
@@ -157,3 +158,21 @@ def test_step_storage_key_naming_convention(step_storage, mock_storage, temp_dir
     # Verify naming convention
     assert s3_key.startswith("jobs/test-job-123/step_03_")
     assert "data.json" in s3_key
+
+
+def test_step_storage_aliases_point_at_single_upload(step_storage, mock_storage, temp_dir):
+    """Logical names and already-stored outputs are recorded without another upload."""
+    test_file = os.path.join(temp_dir, "transcription.json")
+    with open(test_file, "w") as f:
+        json.dump([], f)
+
+    result = step_storage.upload_step_output(
+        step_num=1,
+        files_dict={"transcript": test_file},
+        aliases={"transcript": "transcription"},
+        stored_files={"final_video": "results/test-job-123/out.mp4"},
+    )
+
+    mock_storage.upload_file.assert_called_once()
+    assert result["transcription"] == result["step_01.transcript"]
+    assert result["step_01.final_video"] == "results/test-job-123/out.mp4"
@@ -0,0 +1,64 @@
+from app.config import settings
+from app.workers.pipeline import delete_input_on_complete, plan_variant
+
+PARENT_CONFIG = {
+    "target_duration": 30,
+    "whisper_model": "small",
+    "tts_voice": "nova",
+    "tts_model": "tts-1",
+    "language": None,
+    "translate_to": None,
+    "pad_with_black": False,
+    "include_emotions": False,
+}
+PARENT_KEYS = {
+    "transcription": "jobs/p/transcription/transcription.json",
+    "recap_data": "jobs/p/recap_data/recap_data.json",
+    "tts_audio": "jobs/p/tts_audio/recap_narration.mp3",
+    "step_01.transcript": "jobs/p/step_01_transcription/transcription.json",
+}
+
+
+def test_voice_change_reuses_transcript_and_recap():
+    reused = plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "tts_voice": "onyx"}, PARENT_KEYS)
+
+    assert reused == ["recap_data", "transcription"]
+
+
+def test_duration_change_reruns_recap():
+    reused = plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "target_duration": 60}, PARENT_KEYS)
+
+    assert reused == ["transcription"]
+
+
+def test_clip_video_is_reused_when_recap_is():
+    keys = {**PARENT_KEYS, "recap_video": "jobs/p/recap_video/recap_video.mp4"}
+    reused = plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "tts_model": "tts-1-hd"}, keys)
+
+    assert "recap_video" in reused
+
+
+def test_new_translation_runs_from_translation_step():
+    reused = plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "translate_to": "Tamil"}, PARENT_KEYS)
+
+    assert reused == ["transcription"]
+
+
+def test_whisper_model_change_is_a_full_run():
+    assert plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "whisper_model": "medium"}, PARENT_KEYS) == []
+
+
+def test_render_only_variant():
+    reused = plan_variant(PARENT_CONFIG, {**PARENT_CONFIG, "pad_with_black": True}, PARENT_KEYS)
+
+    assert reused == ["recap_data", "transcription", "tts_audio"]
+
+
+def test_source_is_kept_for_variants_only_when_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "DELETE_INPUT_VIDEO_ON_COMPLETE", True)
+    assert type(settings).model_fields["KEEP_INPUT_VIDEO_FOR_VARIANTS"].default is False
+    monkeypatch.setattr(settings, "KEEP_INPUT_VIDEO_FOR_VARIANTS", False)
+    assert delete_input_on_complete()
+
+    monkeypatch.setattr(settings, "KEEP_INPUT_VIDEO_FOR_VARIANTS", True)
+    assert not delete_input_on_complete()
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from app.workers import warmup
+
+
+def test_preload_model_sizes_parses_comma_separated_list():
+    with patch.object(warmup.settings, "WHISPER_PRELOAD_MODELS", " small, medium ,,"):
+        assert warmup.preload_model_sizes() == ["small", "medium"]
+
+
+def test_preload_model_sizes_empty_by_default():
+    with patch.object(warmup.settings, "WHISPER_PRELOAD_MODELS", ""):
+        assert warmup.preload_model_sizes() == []
+
+
+def test_torch_threads_split_cores_across_pool():
+    with patch.object(warmup.settings, "TORCH_THREADS_PER_PROCESS", 0), \
+         patch.object(warmup.os, "cpu_count", return_value=8):
+        assert warmup.torch_threads_per_process(2) == 4
+        assert warmup.torch_threads_per_process(16) == 1
+
+
+def test_torch_threads_setting_overrides_split():
+    with patch.object(warmup.settings, "TORCH_THREADS_PER_PROCESS", 3):
+        assert warmup.torch_threads_per_process(2) == 3
@@ -7,11 +7,21 @@ Modules:
 - transcription: Video transcription and translation
 - video_processing: Recap generation, clip extraction, audio removal
 - audio_processing: TTS generation and audio-video merging
+- ffmpeg_render: Single-pass ffmpeg render of the final recap video
+- chunked_transcription: Silence-aligned chunked Whisper transcription on a local pool
+- pcm_audio: Shared 16 kHz mono float32 audio buffer for a job
+- vad: Speech-region detection so Whisper skips music and ambience
+- model_registry: Memory-budgeted, reference-counted cache of loaded models
+- clip_selection: Duration-exact clip selection from scored LLM candidates
+- prompt_encoding: Compact, token-budgeted transcript encoding for LLM prompts
+- segment_ranking: Local pre-ranking of transcript windows before clip selection
+- llm_cache: Persistent, size-bounded cache in front of every OpenAI call
 """
 
 from .transcription import transcribe_video, translate_transcription
 from .video_processing import generate_recap_suggestions, extract_and_merge_clips, remove_audio_from_video
 from .audio_processing import generate_tts_audio, merge_audio_with_video
+from .ffmpeg_render import render_recap_video
 
 __all__ = [
     'transcribe_video',
@@ -20,6 +30,7 @@ __all__ = [
     'extract_and_merge_clips',
     'remove_audio_from_video',
     'generate_tts_audio',
-    'merge_audio_with_video'
+    'merge_audio_with_video',
+    'render_recap_video'
 ]
 
@@ -8,7 +8,6 @@ Contains functions for:
 
 import os
 import json
-from openai import OpenAI
 import dotenv
 
 dotenv.load_dotenv()
@@ -51,8 +50,7 @@ def generate_tts_audio(recap_text_file, target_duration=30, output_dir="output/a
     print(f"Text length: {len(recap_text)} characters")
     print(f"Target duration: {target_duration}s")
     
-    # Initialize OpenAI client
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=5)
+    from modules.llm_cache import get_llm_gateway
     
     # Prepare output path
     output_path = get_output_path(output_dir)
@@ -63,14 +61,17 @@ def generate_tts_audio(recap_text_file, target_duration=30, output_dir="output/a
     # Generate TTS audio
     print("Generating audio with OpenAI TTS...")
     
-    with client.audio.speech.with_streaming_response.create(
+    # The same text, model and voice are served from the LLM cache on re-runs
+    cached = get_llm_gateway().speech_to_file(
+        output_file,
         model=tts_model,
         voice=tts_voice,
         input=recap_text,
         response_format="mp3",
         speed=1.0
-    ) as response:
-        response.stream_to_file(output_file)
+    )
+    if cached:
+        print("   (from LLM cache)")
     
     # Duration matches spoken audio only (no silence padding toward target_duration —
     # padding caused long mute stretches vs. video after merge).
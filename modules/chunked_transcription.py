@@ -0,0 +1,342 @@
+"""
+Chunked Whisper Transcription
+
+Contains functions for:
+- Measuring frame energy of 16 kHz audio and finding silences near chunk boundaries
+- Planning silence-aligned chunk windows for long audio
+- Transcribing chunks on a local pool (one Whisper model per worker)
+- Writing chunks to WAV files for transcription on other Celery workers
+- Stitching chunk segments back onto the source timeline without duplicates
+
+A single model.transcribe call is one sequential inference stream; a 90 minute
+source spends most of the Celery time limit there. Splitting at pauses lets each
+worker decode an independent window while keeping sentences intact, and the
+stitched result has the same {"start", "end", "text"} schema as transcribe_video.
+"""
+
+import multiprocessing
+import os
+import queue
+import re
+import wave
+from contextlib import ExitStack, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from modules.pcm_audio import SAMPLE_RATE, is_pcm_file, load_audio_16k, load_pcm, pcm_to_linear16
+
+# Energy frames are 30 ms; a ~0.5 s moving average makes the split land in real
+# pauses rather than in the gap between two syllables.
+_FRAME_SECONDS = 0.03
+_SMOOTH_SECONDS = 0.5
+
+# Set by _init_chunk_worker in pool processes.
+_WORKER_MODEL = None
+
+
+def frame_energies(audio, sample_rate: int = SAMPLE_RATE, frame_seconds: float = _FRAME_SECONDS):
+    """Smoothed RMS energy per frame of a mono float waveform."""
+    import numpy as np
+
+    hop = max(1, int(sample_rate * frame_seconds))
+    n_frames = len(audio) // hop
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.asarray(audio[: n_frames * hop], dtype=np.float32).reshape(n_frames, hop)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    width = max(1, int(_SMOOTH_SECONDS / frame_seconds))
+    if width > 1 and n_frames > width:
+        rms = np.convolve(rms, np.ones(width, dtype=np.float32) / width, mode="same")
+    return rms
+
+
+def plan_chunk_boundaries(energies, duration: float, chunk_seconds: float,
+                          frame_seconds: float = _FRAME_SECONDS, search_seconds: float = 10.0) -> list[tuple[float, float]]:
+    """Split [0, duration) into roughly equal windows cut at the quietest nearby frame.
+
+    Args:
+        energies: Per-frame energy (see frame_energies)
+        duration: Audio duration in seconds
+        chunk_seconds: Desired window length
+        frame_seconds: Length of one energy frame
+        search_seconds: How far from the ideal cut to look for silence
+
+    Returns:
+        [(start, end), ...] covering the whole audio without gaps
+    """
+    n_chunks = max(1, int(round(duration / chunk_seconds)))
+    cuts = [0.0]
+    for k in range(1, n_chunks):
+        ideal = duration * k / n_chunks
+        lo = max(int((ideal - search_seconds) / frame_seconds), int(cuts[-1] / frame_seconds) + 1)
+        hi = min(int((ideal + search_seconds) / frame_seconds), len(energies) - 1)
+        if hi <= lo:
+            cut = ideal
+        else:
+            quietest = min(range(lo, hi + 1), key=lambda i: energies[i])
+            cut = quietest * frame_seconds
+        cuts.append(round(cut, 3))
+    cuts.append(float(duration))
+    return [(cuts[i], cuts[i + 1]) for i in range(n_chunks)]
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"[^\w]+", " ", text.lower()).strip()
+
+
+def stitch_chunk_segments(chunks: list[dict], duplicate_window: float = 1.0) -> list[dict]:
+    """Merge per-chunk segments onto the source timeline.
+
+    Args:
+        chunks: [{"offset": seconds where the chunk audio starts,
+                  "keep_start": window start, "keep_end": window end,
+                  "segments": [{"start", "end", "text"}, ...] relative to offset}, ...]
+        duplicate_window: Segments repeating the previous text within this many
+                          seconds of its end are dropped
+
+    Returns:
+        Segments ordered by start, each owned by the window containing its midpoint
+    """
+    stitched = []
+    for chunk in sorted(chunks, key=lambda c: c["keep_start"]):
+        offset = chunk["offset"]
+        for segment in chunk["segments"]:
+            text = segment["text"].strip()
+            if not text:
+                continue
+            start = segment["start"] + offset
+            end = segment["end"] + offset
+            midpoint = (start + end) / 2
+            # Padding around each window is transcribed twice; the window
+            # holding a segment's midpoint owns it.
+            if not chunk["keep_start"] <= midpoint < chunk["keep_end"]:
+                continue
+            if stitched:
+                previous = stitched[-1]
+                if (_normalize_text(text) == _normalize_text(previous["text"])
+                        and start < previous["end"] + duplicate_window):
+                    continue
+                start = max(start, previous["end"])
+            stitched.append({"start": round(start, 3), "end": round(max(end, start), 3), "text": text})
+    return stitched
+
+
+def plan_audio_chunks(audio, chunk_seconds: float, pad_seconds: float = 1.0,
+                      sample_rate: int = SAMPLE_RATE) -> list[dict]:
+    """Silence-aligned chunk plan for a waveform.
+
+    Returns:
+        [{"index", "offset", "keep_start", "keep_end", "start_sample", "end_sample"}, ...]
+        where start/end_sample include pad_seconds of context on each side and
+        offset is the chunk's start on the source timeline (see stitch_chunk_segments)
+    """
+    duration = len(audio) / sample_rate
+    windows = plan_chunk_boundaries(frame_energies(audio, sample_rate), duration, chunk_seconds)
+    pad = int(pad_seconds * sample_rate)
+    chunks = []
+    for index, (keep_start, keep_end) in enumerate(windows):
+        start = max(0, int(keep_start * sample_rate) - pad)
+        end = min(len(audio), int(keep_end * sample_rate) + pad)
+        chunks.append({
+            "index": index,
+            "offset": start / sample_rate,
+            "keep_start": keep_start,
+            "keep_end": keep_end,
+            "start_sample": start,
+            "end_sample": end,
+        })
+    return chunks
+
+
+def write_audio_chunks(audio, chunks: list[dict], output_dir: str, sample_rate: int = SAMPLE_RATE) -> list[str]:
+    """Write each planned chunk as a 16-bit mono WAV; returns the file paths in chunk order."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for chunk in chunks:
+        path = os.path.join(output_dir, f"chunk_{chunk['index']:03d}.wav")
+        with wave.open(path, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm_to_linear16(audio[chunk["start_sample"]:chunk["end_sample"]]))
+        paths.append(path)
+    return paths
+
+
+def transcribe_window(model, audio, language: str | None = None) -> list[dict]:
+    """Transcribe one chunk (waveform or audio file path); timestamps are relative to the chunk."""
+    options = {"language": language} if language else {}
+    result = model.transcribe(audio, verbose=None, **options)
+    return [
+        {"start": segment["start"], "end": segment["end"], "text": segment["text"].strip()}
+        for segment in result["segments"]
+    ]
+
+
+def _init_chunk_worker(model_size: str, torch_threads: int, backend: str = "openai") -> None:
+    """Pool process initializer: load the model once per process.
+
+    The model is held in the child's registry for the life of the process; the
+    parent sizes the pool so that these copies fit its memory budget.
+    """
+    global _WORKER_MODEL
+    from modules.transcription import whisper_model
+
+    if backend == "openai":
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    _WORKER_MODEL = whisper_model(model_size, backend, cpu_threads=torch_threads).__enter__()
+
+
+def _chunk_audio(source):
+    """A job's audio: a waveform slice, or (pcm_path, start, end) mapped in the worker."""
+    if isinstance(source, tuple):
+        path, start, end = source
+        return load_pcm(path)[start:end]
+    return source
+
+
+def _transcribe_chunk_worker(job: tuple) -> list[dict]:
+    source, language = job
+    return transcribe_window(_WORKER_MODEL, _chunk_audio(source), language)
+
+
+def detect_language(model, audio) -> str:
+    """Detect the spoken language from the first 30 s so every chunk decodes the same language."""
+    if hasattr(model, "language_of"):
+        return model.language_of(audio)
+    import whisper
+
+    clip = whisper.pad_or_trim(audio)
+    mel = whisper.log_mel_spectrogram(clip, n_mels=model.dims.n_mels).to(model.device)
+    _, probs = model.detect_language(mel)
+    return max(probs, key=probs.get)
+
+
+def transcribe_audio_chunked(audio_path: str, model_size: str = "small", language: str | None = None,
+                             chunk_seconds: float = 300, max_workers: int | None = None,
+                             pad_seconds: float = 1.0, shared_model=None, backend: str = "openai") -> list[dict]:
+    """
+    Transcribe long audio as silence-aligned chunks on a local pool.
+
+    Args:
+        audio_path: Extracted audio file (shared .f32 PCM or any format Whisper reads)
+        model_size: Whisper model size
+        language: Language code; detected once from the start of the audio if None
+        chunk_seconds: Target chunk length
+        max_workers: Pool size (default: one worker per two CPU cores)
+        pad_seconds: Extra audio decoded on each side of a window for context
+        shared_model: Already-loaded model for language detection / a thread worker
+        backend: Whisper inference engine for worker models ("openai" or "ctranslate2")
+
+    Returns:
+        Stitched segments [{"start", "end", "text"}, ...]
+    """
+    from modules.transcription import whisper_model, whisper_model_capacity
+
+    if shared_model is None:
+        with whisper_model(model_size, backend) as model:
+            return transcribe_audio_chunked(audio_path, model_size, language, chunk_seconds, max_workers,
+                                            pad_seconds, shared_model=model, backend=backend)
+    model = shared_model
+
+    audio = load_audio_16k(audio_path)
+    chunks = plan_audio_chunks(audio, chunk_seconds, pad_seconds)
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(len(chunks), max_workers or cpu_count // 2))
+    # Every worker beyond the shared model needs its own copy; only as many as the
+    # Whisper memory budget (WHISPER_MODEL_BUDGET_MB) has room for are started
+    spare = whisper_model_capacity(model_size, backend)
+    threaded = multiprocessing.current_process().daemon or spare == 0
+    if spare is not None:
+        workers = max(1, min(workers, spare + 1 if threaded else spare))
+    torch_threads = max(1, cpu_count // workers)
+
+    language = language or detect_language(model, audio)
+    print(f"Chunked transcription: {len(chunks)} windows of ~{chunk_seconds:.0f}s, "
+          f"{workers} workers, language={language}")
+
+    if is_pcm_file(audio_path):
+        # Workers map the shared PCM file themselves; nothing is pickled but offsets
+        jobs = [((audio_path, chunk["start_sample"], chunk["end_sample"]), language) for chunk in chunks]
+    else:
+        jobs = [(audio[chunk["start_sample"]:chunk["end_sample"]], language) for chunk in chunks]
+
+    if threaded:
+        results = _transcribe_chunks_threaded(jobs, model, model_size, workers, torch_threads, backend)
+    else:
+        # spawn: forking after torch/OpenMP initialised in the parent can deadlock
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_chunk_worker,
+            initargs=(model_size, torch_threads, backend),
+        ) as pool:
+            results = list(pool.map(_transcribe_chunk_worker, jobs))
+
+    for chunk, segments in zip(chunks, results):
+        chunk["segments"] = segments
+    return stitch_chunk_segments(chunks)
+
+
+def _transcribe_chunks_threaded(jobs: list[tuple], model, model_size: str,
+                                workers: int, torch_threads: int, backend: str = "openai") -> list[list[dict]]:
+    """Pool for daemonic processes (Celery prefork), which may not start children.
+
+    Whisper installs per-call hooks on the model, so each thread borrows its own
+    model instance; torch releases the GIL during inference. The extra instances
+    are registry replicas, pinned while the pool runs and counted in its budget.
+    """
+    from modules.transcription import whisper_model
+
+    with ExitStack() as replicas:
+        models = queue.Queue()
+        models.put(model)
+        for replica in range(1, workers):
+            models.put(replicas.enter_context(
+                whisper_model(model_size, backend, replica=replica, cpu_threads=torch_threads)
+            ))
+        return _run_threaded(jobs, models, workers, torch_threads, backend)
+
+
+@contextmanager
+def _torch_threads(count: int, backend: str):
+    """Size torch's thread pool for openai-whisper; ctranslate2 models get cpu_threads at load."""
+    if backend != "openai":
+        yield
+        return
+    import torch
+
+    previous = torch.get_num_threads()
+    torch.set_num_threads(count)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+
+def _run_threaded(jobs: list[tuple], models: queue.Queue, workers: int, torch_threads: int,
+                  backend: str = "openai") -> list[list[dict]]:
+    def run(job):
+        borrowed = models.get()
+        try:
+            source, language = job
+            return transcribe_window(borrowed, _chunk_audio(source), language)
+        finally:
+            models.put(borrowed)
+
+    with _torch_threads(torch_threads, backend), ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, jobs))
+
+
+__all__ = [
+    "detect_language",
+    "frame_energies",
+    "plan_audio_chunks",
+    "plan_chunk_boundaries",
+    "stitch_chunk_segments",
+    "transcribe_audio_chunked",
+    "transcribe_window",
+    "write_audio_chunks",
+]
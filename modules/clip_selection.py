@@ -0,0 +1,169 @@
+"""
+Clip Selection
+
+Contains functions for:
+- Normalizing scored candidate clip windows returned by the LLM
+- Choosing non-overlapping candidates with the best total score for a target
+  duration (knapsack DP over candidate durations)
+- Trimming / extending the chosen clips so they sum exactly to the target
+- Splitting long transcripts into time windows and shortlisting the
+  per-window candidates for long-form (map-reduce) planning
+
+The clip-selection LLM call only has to rank moments; hitting the duration is
+done here, deterministically, instead of by retrying the LLM with the whole
+transcript until its arithmetic comes out right.
+"""
+
+# Durations are solved on a 0.1 s grid
+RESOLUTION = 0.1
+MIN_CLIP_SECONDS = 1.0
+
+
+def normalize_candidates(candidates: list[dict], media_duration: float | None = None) -> list[dict]:
+    """Clean LLM candidates: float times, clamped to the media, score in [0, 10], sorted by start."""
+    cleaned = []
+    for c in candidates:
+        try:
+            start = max(0.0, float(c["start"]))
+            end = float(c["end"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if media_duration is not None:
+            end = min(end, media_duration)
+        if end - start < MIN_CLIP_SECONDS:
+            continue
+        try:
+            score = min(10.0, max(0.0, float(c.get("score", 5))))
+        except (TypeError, ValueError):
+            score = 5.0
+        cleaned.append({**c, "start": round(start, 2), "end": round(end, 2), "score": score})
+    return sorted(cleaned, key=lambda c: (c["start"], c["end"]))
+
+
+def _best_subset(candidates: list[dict], capacity: int) -> list[int]:
+    """Indices of non-overlapping candidates maximizing sum(score * duration) with duration <= capacity.
+
+    Weighted interval scheduling with a knapsack dimension: items sorted by end,
+    best[i][c] = max(best[i-1][c], best[p(i)][c - w_i] + v_i) where p(i) is the
+    last item ending before item i starts.
+    """
+    order = sorted(range(len(candidates)), key=lambda i: candidates[i]["end"])
+    items = [candidates[i] for i in order]
+    weights = [max(1, round((c["end"] - c["start"]) / RESOLUTION)) for c in items]
+    # Small bonus per second so that among equal scores a fuller recap wins
+    values = [(c["score"] + 0.01) * w for c, w in zip(items, weights)]
+
+    prev = []
+    for i, c in enumerate(items):
+        j = i - 1
+        while j >= 0 and items[j]["end"] > c["start"]:
+            j -= 1
+        prev.append(j)
+
+    best = [[0.0] * (capacity + 1)]
+    for i in range(len(items)):
+        row = best[i][:]
+        base = best[prev[i] + 1]
+        w, v = weights[i], values[i]
+        for cap in range(w, capacity + 1):
+            candidate = base[cap - w] + v
+            if candidate > row[cap]:
+                row[cap] = candidate
+        best.append(row)
+
+    chosen = []
+    i, cap = len(items), capacity
+    while i > 0 and cap > 0:
+        if best[i][cap] == best[i - 1][cap]:
+            i -= 1
+            continue
+        chosen.append(order[i - 1])
+        cap -= weights[i - 1]
+        i = prev[i - 1] + 1
+    return sorted(chosen, key=lambda k: candidates[k]["start"])
+
+
+def _fit_to_target(clips: list[dict], target: float, media_duration: float | None) -> list[dict]:
+    """Extend the chosen clips into free neighbouring time (best-scored first) or trim them to hit target."""
+    clips = [dict(c) for c in clips]
+    gap = round(target - sum(c["end"] - c["start"] for c in clips), 2)
+
+    for idx in sorted(range(len(clips)), key=lambda k: -clips[k]["score"]):
+        if abs(gap) < RESOLUTION / 2:
+            break
+        clip = clips[idx]
+        if gap > 0:
+            lo = clips[idx - 1]["end"] if idx > 0 else 0.0
+            hi = clips[idx + 1]["start"] if idx + 1 < len(clips) else (media_duration or float("inf"))
+            after = min(gap, hi - clip["end"])
+            clip["end"] += after
+            before = min(gap - after, clip["start"] - lo)
+            clip["start"] -= before
+            gap -= after + before
+        else:
+            cut = min(-gap, clip["end"] - clip["start"] - MIN_CLIP_SECONDS)
+            if cut > 0:
+                clip["end"] -= cut
+                gap += cut
+
+    for clip in clips:
+        clip["start"], clip["end"] = round(clip["start"], 2), round(clip["end"], 2)
+    return clips
+
+
+def solve_clip_selection(candidates: list[dict], target_duration: float,
+                         media_duration: float | None = None) -> list[dict]:
+    """Pick chronological, non-overlapping clips from scored candidates summing to target_duration.
+
+    Args:
+        candidates: [{"start", "end", "score" (0-10), "reason"}, ...] in any order, may overlap
+        target_duration: Seconds the clips must add up to
+        media_duration: End of the source (bounds clip extension); None = unbounded
+
+    Returns:
+        Clip dicts sorted by start. They total target_duration unless the source
+        is shorter, in which case as much of it as the candidates allow.
+    """
+    candidates = normalize_candidates(candidates, media_duration)
+    if not candidates:
+        return []
+    capacity = round(target_duration / RESOLUTION)
+    chosen = [candidates[i] for i in _best_subset(candidates, capacity)]
+    return _fit_to_target(chosen, target_duration, media_duration)
+
+
+def split_time_windows(segments: list[dict], window_seconds: float) -> list[list[dict]]:
+    """Group chronological segments into consecutive windows of about window_seconds.
+
+    Windows break between segments, never inside one, so no utterance is split.
+    """
+    windows = []
+    for seg in sorted(segments, key=lambda s: s.get("start", 0)):
+        if not windows or seg.get("start", 0) - windows[-1][0].get("start", 0) >= window_seconds:
+            windows.append([])
+        windows[-1].append(seg)
+    return windows
+
+
+def shortlist_candidates(candidates: list[dict], target_duration: float, factor: float = 4.0) -> list[dict]:
+    """Best-scored candidates until they add up to factor x target_duration, back in time order.
+
+    Bounds the reduce prompt of long-form planning by the recap length rather
+    than by how many windows proposed candidates.
+    """
+    kept, total = [], 0.0
+    for c in sorted(normalize_candidates(candidates), key=lambda c: -c["score"]):
+        if total >= factor * target_duration:
+            break
+        kept.append(c)
+        total += c["end"] - c["start"]
+    return sorted(kept, key=lambda c: (c["start"], c["end"]))
+
+
+__all__ = [
+    "MIN_CLIP_SECONDS",
+    "normalize_candidates",
+    "shortlist_candidates",
+    "solve_clip_selection",
+    "split_time_windows",
+]
@@ -0,0 +1,543 @@
+"""
+FFmpeg Render Engine
+
+Contains functions for:
+- Probing media files with ffprobe
+- Planning clip windows against a duration cap
+- Rendering the final recap (trim + concat + narration mux) in one ffmpeg run
+- Keyframe-aware smart cutting (stream-copy full GOPs, re-encode only the edges)
+- Parallel per-clip encoding on a process pool for sources that cannot be smart-cut
+
+The single-pass render replaces the three moviepy encodes of
+extract_and_merge_clips -> remove_audio_from_video -> merge_audio_with_video
+with one filtergraph, so the video is decoded and encoded exactly once.
+"""
+
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Get the directory where this file is located (parent of modules/)
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only the last few lines of ffmpeg's stderr are useful in an exception message.
+_STDERR_TAIL_LINES = 15
+
+# Codecs we can re-encode edge pieces into so they concat with stream-copied GOPs.
+_SMART_CUT_ENCODERS = {"h264": "libx264", "hevc": "libx265"}
+
+# A stream-copied middle shorter than this is not worth the extra pieces.
+_SMART_CUT_MIN_COPY_SECONDS = 1.0
+
+# ffprobe H.264 profile names -> libx264 -profile:v values. Profiles x264 cannot
+# encode (Extended) are absent, and the boundary pieces then use its default.
+_X264_PROFILES = {
+    "baseline": "baseline",
+    "constrained baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "constrained high": "high",
+    "progressive high": "high",
+    "high 10": "high10",
+    "high 10 intra": "high10",
+    "high 4:2:2": "high422",
+    "high 4:2:2 intra": "high422",
+    "high 4:4:4": "high444",
+    "high 4:4:4 predictive": "high444",
+    "high 4:4:4 intra": "high444",
+}
+
+
+def x264_profile(ffprobe_profile: str | None) -> str | None:
+    """libx264 profile matching an ffprobe H.264 profile name, or None when there is none."""
+    return _X264_PROFILES.get((ffprobe_profile or "").strip().lower())
+
+
+class SmartCutUnavailable(ValueError):
+    """Raised when the source cannot be smart-cut (codec, VFR, no keyframes); caller should re-encode."""
+
+
+def get_output_path(relative_path):
+    """Convert relative output path to absolute path"""
+    return os.path.join(SCRIPT_DIR, relative_path)
+
+
+def ffmpeg_binary() -> str:
+    """Return the ffmpeg executable (system install first, then moviepy's bundled copy)."""
+    exe = shutil.which("ffmpeg")
+    if exe:
+        return exe
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception as e:
+        raise FileNotFoundError("ffmpeg binary not found on PATH") from e
+
+
+def ffprobe_binary() -> str:
+    """Return the ffprobe executable; it ships alongside ffmpeg in the worker image."""
+    exe = shutil.which("ffprobe")
+    if not exe:
+        raise FileNotFoundError("ffprobe binary not found on PATH")
+    return exe
+
+
+def run_ffmpeg(args: list[str], description: str) -> None:
+    """Run ffmpeg with the given arguments, raising RuntimeError with stderr on failure."""
+    cmd = [ffmpeg_binary(), "-hide_banner", "-loglevel", "error", "-y", *args]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.strip().splitlines()[-_STDERR_TAIL_LINES:])
+        raise RuntimeError(f"ffmpeg {description} failed (exit {proc.returncode}): {tail}")
+
+
+def probe_media(path: str) -> dict:
+    """Return duration plus the first video/audio stream descriptions from ffprobe.
+
+    Returns:
+        {"duration": float, "video": dict | None, "audio": dict | None}
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Media file not found: {path}")
+
+    proc = subprocess.run(
+        [
+            ffprobe_binary(), "-v", "error",
+            "-print_format", "json",
+            "-show_format", "-show_streams",
+            path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe failed for {path}: {proc.stderr.strip()}")
+
+    info = json.loads(proc.stdout or "{}")
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = info.get("format", {}).get("duration")
+    if duration is None and video is not None:
+        duration = video.get("duration")
+    return {
+        "duration": float(duration) if duration is not None else 0.0,
+        "video": video,
+        "audio": audio,
+    }
+
+
+def plan_clip_windows(clip_timings: list[dict], max_total: float | None = None) -> list[dict]:
+    """Cut the clip list so the concatenation is at most ``max_total`` seconds.
+
+    Equivalent to concatenating every clip and trimming the result to
+    ``max_total``, but done on the timings so no frames past the cap are decoded.
+    """
+    windows = []
+    total = 0.0
+    for clip in clip_timings:
+        start = float(clip["start"])
+        end = float(clip["end"])
+        if max_total is not None:
+            remaining = max_total - total
+            if remaining <= 0.001:
+                break
+            end = min(end, start + remaining)
+        if end <= start:
+            continue
+        windows.append({**clip, "start": start, "end": end})
+        total += end - start
+    return windows
+
+
+def build_render_filtergraph(window_count: int, duration: float) -> str:
+    """Build the filtergraph for ``window_count`` pre-seeked clip inputs plus one narration input.
+
+    Inputs 0..N-1 are the clip windows (each opened with -ss/-t), input N is the
+    narration. The original audio is never mapped, which replaces remove_audio_from_video.
+    """
+    if window_count < 1:
+        raise ValueError("At least one clip window is required")
+
+    chains = [f"[{i}:v]setpts=PTS-STARTPTS[v{i}]" for i in range(window_count)]
+    if window_count == 1:
+        chains.append("[v0]null[vout]")
+    else:
+        labels = "".join(f"[v{i}]" for i in range(window_count))
+        chains.append(f"{labels}concat=n={window_count}:v=1:a=0[vout]")
+    # apad + atrim gives an exact-length narration track: pads short TTS with
+    # silence, trims long TTS to the video, matching merge_audio_with_video.
+    chains.append(
+        f"[{window_count}:a]apad,atrim=duration={duration:.3f},asetpts=PTS-STARTPTS[aout]"
+    )
+    return ";".join(chains)
+
+
+def render_recap_video(
+    video_path,
+    recap_data_file,
+    audio_path,
+    target_duration=30,
+    max_duration_seconds=None,
+    output_path=None,
+    preset="medium",
+):
+    """
+    Steps 4-7 in one pass: cut clips, drop original audio, mux narration
+
+    Args:
+        video_path: Path to original video
+        recap_data_file: Path to recap_data.json
+        audio_path: Path to TTS narration (mp3)
+        target_duration: Clip trim target in seconds (same meaning as in extract_and_merge_clips)
+        max_duration_seconds: If set, cap the output at this length (same meaning as in merge_audio_with_video)
+        output_path: Path for output video (optional)
+        preset: libx264 preset
+
+    Returns:
+        Path to final video with narration
+    """
+    from modules.video_processing import validate_clip_timings
+
+    print(f"\n{'='*70}")
+    print(f"STEPS 4-7: SINGLE-PASS RENDER (FFMPEG)")
+    print(f"{'='*70}")
+    print(f"Video: {video_path}")
+    print(f"Recap data: {recap_data_file}")
+    print(f"Audio: {audio_path}")
+
+    if not os.path.exists(video_path):
+        raise FileNotFoundError(f"Video file not found: {video_path}")
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+    with open(recap_data_file, "r") as f:
+        recap_data = json.load(f)
+    clip_timings = recap_data.get("clip_timings", [])
+    if not clip_timings:
+        raise ValueError("No clip timings found in recap_data.json")
+
+    video_info = probe_media(video_path)
+    audio_info = probe_media(audio_path)
+    if video_info["video"] is None:
+        raise ValueError(f"No video stream in {video_path}")
+
+    clip_timings = validate_clip_timings(clip_timings, video_duration=video_info["duration"])
+    clips_total = sum(c["end"] - c["start"] for c in clip_timings)
+    video_duration = min(clips_total, float(target_duration))
+
+    # Same arithmetic as the three-step path: merge_audio_with_video trims both
+    # tracks to min(video, audio, cap) when a cap is given, else follows the video.
+    if max_duration_seconds is not None and max_duration_seconds > 1:
+        final_duration = min(video_duration, audio_info["duration"], float(max_duration_seconds))
+    else:
+        final_duration = video_duration
+
+    windows = plan_clip_windows(clip_timings, max_total=final_duration)
+    final_duration = sum(w["end"] - w["start"] for w in windows)
+
+    print(f"Validated {len(clip_timings)} clip(s) against video duration {video_info['duration']:.2f}s")
+    print(f"Clips: {clips_total:.2f}s | Audio: {audio_info['duration']:.2f}s | Output: {final_duration:.2f}s")
+
+    if output_path is None:
+        output_path = get_output_path("output/videos/recap_video_with_narration.mp4")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    args = []
+    for w in windows:
+        args += ["-ss", f"{w['start']:.3f}", "-t", f"{w['end'] - w['start']:.3f}", "-i", video_path]
+    args += ["-i", audio_path]
+    args += [
+        "-filter_complex", build_render_filtergraph(len(windows), final_duration),
+        "-map", "[vout]", "-map", "[aout]",
+        "-c:v", "libx264", "-preset", preset, "-pix_fmt", "yuv420p",
+        "-c:a", "aac",
+        "-t", f"{final_duration:.3f}",
+        "-movflags", "+faststart",
+        output_path,
+    ]
+
+    print(f"Rendering {len(windows)} clip(s) in one ffmpeg pass...")
+    run_ffmpeg(args, "single-pass render")
+
+    output_size = os.path.getsize(output_path) / (1024 * 1024)
+    print(f"✅ Single-pass render complete!")
+    print(f"   Output: {output_path}")
+    print(f"   Size: {output_size:.2f} MB")
+    print(f"   Duration: {final_duration:.1f}s")
+
+    return output_path
+
+
+def _parse_rate(rate: str | None) -> float:
+    """Parse an ffprobe rational like '30000/1001' into a float (0.0 if unknown)."""
+    if not rate or rate == "0/0":
+        return 0.0
+    num, _, den = rate.partition("/")
+    try:
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def frame_duration(video_stream: dict) -> float:
+    """Seconds per frame for a probed video stream (falls back to 25 fps)."""
+    fps = _parse_rate(video_stream.get("avg_frame_rate")) or _parse_rate(video_stream.get("r_frame_rate"))
+    return 1.0 / fps if fps > 0 else 0.04
+
+
+def is_variable_frame_rate(video_stream: dict) -> bool:
+    """True when the declared and average frame rates disagree by more than 1%."""
+    r_rate = _parse_rate(video_stream.get("r_frame_rate"))
+    avg_rate = _parse_rate(video_stream.get("avg_frame_rate"))
+    if not r_rate or not avg_rate:
+        return True
+    return abs(r_rate - avg_rate) / r_rate > 0.01
+
+
+def probe_keyframes(path: str, start: float, end: float) -> list[float]:
+    """Return keyframe timestamps of the first video stream within [start, end].
+
+    Reads packet flags only (no decoding), restricted to the window via -read_intervals.
+    """
+    proc = subprocess.run(
+        [
+            ffprobe_binary(), "-v", "error",
+            "-select_streams", "v:0",
+            "-read_intervals", f"{max(0.0, start - 1):.3f}%{end + 1:.3f}",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            path,
+        ],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"ffprobe keyframe scan failed for {path}: {proc.stderr.strip()}")
+
+    keyframes = []
+    for line in proc.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if "K" not in flags:
+            continue
+        try:
+            ts = float(pts)
+        except ValueError:
+            continue
+        if start <= ts <= end:
+            keyframes.append(ts)
+    return sorted(set(keyframes))
+
+
+def plan_smart_cut(start: float, end: float, keyframes: list[float], frame_dur: float,
+                   min_copy: float = _SMART_CUT_MIN_COPY_SECONDS) -> list[tuple[str, float, float]]:
+    """Split one clip window into ("encode" | "copy", start, end) pieces.
+
+    The span between the first and last keyframe inside the window is
+    stream-copied; the head before the first keyframe and the tail after the
+    last one are re-encoded so the cut lands on the exact requested frame.
+    A keyframe within half a frame of a cut point absorbs that edge piece.
+    """
+    half_frame = frame_dur / 2
+    inside = [k for k in keyframes if start - half_frame <= k < end - half_frame]
+    if len(inside) < 2 or inside[-1] - inside[0] < min_copy:
+        return [("encode", start, end)]
+
+    first_key, last_key = inside[0], inside[-1]
+    pieces = []
+    if first_key - start > half_frame:
+        pieces.append(("encode", start, first_key))
+    pieces.append(("copy", first_key, last_key))
+    if end - last_key > half_frame:
+        pieces.append(("encode", last_key, end))
+    else:
+        pieces[-1] = ("copy", first_key, end)
+    return pieces
+
+
+def smart_cut_clips(video_path: str, windows: list[dict], output_path: str, work_dir: str) -> str:
+    """Cut and join clip windows, stream-copying whole GOPs and re-encoding only the edges.
+
+    Pieces are written as MPEG-TS (parameter sets in-band, so re-encoded and
+    copied pieces can follow each other) and joined with the concat demuxer
+    into ``output_path``. Audio is re-encoded per piece to AAC, which is cheap
+    and keeps every piece's audio parameters identical.
+
+    Raises:
+        SmartCutUnavailable: unsupported codec, variable frame rate or no video stream.
+    """
+    info = probe_media(video_path)
+    video = info["video"]
+    if video is None:
+        raise SmartCutUnavailable("no video stream")
+    codec = video.get("codec_name")
+    if codec not in _SMART_CUT_ENCODERS:
+        raise SmartCutUnavailable(f"codec '{codec}' cannot be smart-cut")
+    if is_variable_frame_rate(video):
+        raise SmartCutUnavailable("variable frame rate input")
+
+    frame_dur = frame_duration(video)
+    encode_args = [
+        "-c:v", _SMART_CUT_ENCODERS[codec],
+        "-pix_fmt", video.get("pix_fmt") or "yuv420p",
+        "-r", video.get("r_frame_rate") or "25",
+    ]
+    profile = x264_profile(video.get("profile")) if codec == "h264" else None
+    if profile:
+        encode_args += ["-profile:v", profile]
+    audio_args = ["-c:a", "aac", "-ar", "44100", "-ac", "2"] if info["audio"] else ["-an"]
+
+    os.makedirs(work_dir, exist_ok=True)
+    piece_files = []
+    copied = encoded = 0.0
+    for i, window in enumerate(windows):
+        keyframes = probe_keyframes(video_path, window["start"], window["end"])
+        for j, (kind, start, end) in enumerate(plan_smart_cut(window["start"], window["end"], keyframes, frame_dur)):
+            piece = os.path.join(work_dir, f"piece_{i:03d}_{j}.ts")
+            video_args = ["-c:v", "copy"] if kind == "copy" else encode_args
+            # Stream copy seeks to the keyframe at or before -ss; nudge past the
+            # keyframe timestamp so rounding can never land on the previous GOP.
+            seek = start + frame_dur / 4 if kind == "copy" else start
+            run_ffmpeg(
+                [
+                    "-ss", f"{seek:.6f}", "-t", f"{end - start:.6f}", "-i", video_path,
+                    "-map", "0:v:0", "-map", "0:a:0?",
+                    *video_args, *audio_args,
+                    "-avoid_negative_ts", "make_zero",
+                    "-f", "mpegts", piece,
+                ],
+                f"smart-cut {kind} piece {i + 1}.{j + 1}",
+            )
+            piece_files.append(piece)
+            if kind == "copy":
+                copied += end - start
+            else:
+                encoded += end - start
+
+    concat_file_list(piece_files, output_path, work_dir)
+
+    # Guard against container/timestamp quirks: the joined file must match the
+    # requested windows to within a frame per clip, otherwise the caller re-encodes.
+    expected = sum(w["end"] - w["start"] for w in windows)
+    actual = probe_media(output_path)["duration"]
+    if abs(actual - expected) > frame_dur * max(1, len(windows)):
+        raise RuntimeError(f"smart cut produced {actual:.3f}s, expected {expected:.3f}s")
+
+    print(f"   Smart cut: {copied:.1f}s stream-copied, {encoded:.1f}s re-encoded")
+    return output_path
+
+
+def _even_dimensions_filter(fps: float) -> str:
+    """Normalize frame rate, pixel format and (odd) dimensions so encoded parts concat cleanly."""
+    return f"fps={fps:.6f},scale=trunc(iw/2)*2:trunc(ih/2)*2,format=yuv420p"
+
+
+def _encode_clip_worker(job: dict) -> str:
+    """Encode one clip window to a normalized H.264/AAC part (runs in a pool worker)."""
+    args = [
+        "-ss", f"{job['start']:.6f}", "-t", f"{job['end'] - job['start']:.6f}", "-i", job["video_path"],
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", job["video_filter"],
+        "-c:v", "libx264", "-preset", job["preset"], "-threads", str(job["threads"]),
+    ]
+    args += ["-c:a", "aac", "-ar", "44100", "-ac", "2"] if job["has_audio"] else ["-an"]
+    args += ["-f", "mpegts", job["output"]]
+    run_ffmpeg(args, f"clip {job['index'] + 1} encode")
+    return job["output"]
+
+
+def _clip_pool(max_workers: int):
+    """Process pool for clip encodes; threads inside daemonic workers (e.g. Celery prefork).
+
+    Daemonic processes may not fork children. Each part is encoded by an
+    ffmpeg subprocess either way, so a thread pool keeps the same parallelism.
+    """
+    if multiprocessing.current_process().daemon:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def encode_clips_parallel(video_path: str, windows: list[dict], output_path: str, work_dir: str,
+                          max_workers: int | None = None, preset: str = "medium") -> str:
+    """Encode each clip window in its own pool worker and join the parts losslessly.
+
+    Used when smart cutting is impossible (other codecs, VFR input): every part
+    is re-encoded to the same constant frame rate, pixel format and audio layout,
+    so the concat demuxer can join them with stream copy.
+    """
+    info = probe_media(video_path)
+    video = info["video"]
+    if video is None:
+        raise ValueError(f"No video stream in {video_path}")
+
+    fps = 1.0 / frame_duration(video)
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(max_workers or cpu_count, len(windows)))
+    threads = max(1, cpu_count // workers)
+
+    os.makedirs(work_dir, exist_ok=True)
+    jobs = [
+        {
+            "index": i,
+            "video_path": video_path,
+            "start": w["start"],
+            "end": w["end"],
+            "video_filter": _even_dimensions_filter(fps),
+            "preset": preset,
+            "threads": threads,
+            "has_audio": info["audio"] is not None,
+            "output": os.path.join(work_dir, f"part_{i:03d}.ts"),
+        }
+        for i, w in enumerate(windows)
+    ]
+
+    print(f"   Encoding {len(jobs)} clip(s) on {workers} worker(s) x {threads} thread(s)...")
+    with _clip_pool(workers) as pool:
+        parts = list(pool.map(_encode_clip_worker, jobs))
+
+    return concat_file_list(parts, output_path, work_dir)
+
+
+def concat_file_list(files: list[str], output_path: str, work_dir: str) -> str:
+    """Losslessly join media files with the concat demuxer into an MP4."""
+    list_path = os.path.join(work_dir, "concat_list.txt")
+    with open(list_path, "w") as f:
+        for path in files:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    run_ffmpeg(
+        [
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", "-bsf:a", "aac_adtstoasc",
+            "-movflags", "+faststart",
+            output_path,
+        ],
+        "concat",
+    )
+    return output_path
+
+
+__all__ = [
+    "SmartCutUnavailable",
+    "build_render_filtergraph",
+    "concat_file_list",
+    "encode_clips_parallel",
+    "ffmpeg_binary",
+    "ffprobe_binary",
+    "frame_duration",
+    "get_output_path",
+    "is_variable_frame_rate",
+    "plan_clip_windows",
+    "plan_smart_cut",
+    "probe_keyframes",
+    "probe_media",
+    "render_recap_video",
+    "run_ffmpeg",
+    "smart_cut_clips",
+    "x264_profile",
+]
@@ -0,0 +1,345 @@
+"""
+LLM Cache
+
+Contains functions for:
+- Canonical request hashing (call kind, model, messages / input, parameters)
+- A persistent response cache in SQLite (default) or Redis, with a TTL and
+  size-bounded least-recently-used eviction
+- An OpenAI gateway for chat completions and TTS that reads through the cache,
+  with a per-call opt-out (cache=False)
+- Hit / miss statistics
+
+Re-runs and resumes send the same prompts again (translation batches, recap
+calls, narration TTS). With the gateway they are answered from the cache
+instead of paying for and waiting on the API a second time.
+
+Configuration comes from the environment unless configure_llm_cache() is
+called: LLM_CACHE_BACKEND (sqlite | redis | off), LLM_CACHE_PATH,
+LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_MB and LLM_CACHE_REDIS_URL.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_MB = 512
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "video-recap-agent", "llm_cache.sqlite")
+
+# Bumped when the stored value format changes, so old entries are never misread
+_KEY_VERSION = 1
+
+
+def request_key(kind: str, **request) -> str:
+    """Stable SHA-256 of a request: JSON with sorted keys, so parameter order does not matter."""
+    payload = json.dumps({"v": _KEY_VERSION, "kind": kind, **request}, sort_keys=True,
+                         separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCache:
+    """Single-file cache shared by every process on the host (one table, LRU by last access)."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_bytes: int = 0):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # A connection must not cross fork(); reopen in each process
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return bytes(row[0])
+
+    def set(self, key: str, value: bytes) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM entries WHERE created < ?", (now - self.ttl_seconds,))
+        if not self.max_bytes:
+            return
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the rest fit
+        excess, doomed = total - self.max_bytes, []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+
+
+class RedisCache:
+    """Cache shared by every worker host; TTL via key expiry, size bound via an access-ordered index."""
+
+    def __init__(self, url: str, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_bytes: int = 0,
+                 prefix: str = "llm_cache:"):
+        import redis as redis_sync
+
+        self.client = redis_sync.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        # Sorted set key -> last access time, hash key -> size, counter of indexed bytes
+        self._index, self._sizes, self._total = f"{prefix}index", f"{prefix}sizes", f"{prefix}bytes"
+
+    def get(self, key: str) -> bytes | None:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self._forget(key)
+            return None
+        self.client.zadd(self._index, {key: time.time()})
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, value, ex=self.ttl_seconds or None)
+        pipe.zadd(self._index, {key: time.time()})
+        pipe.hget(self._sizes, key)
+        pipe.hset(self._sizes, key, len(value))
+        results = pipe.execute()
+        self.client.incrby(self._total, len(value) - int(results[2] or 0))
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        size = self.client.hget(self._sizes, key)
+        if size is None:
+            return
+        pipe = self.client.pipeline()
+        pipe.zrem(self._index, key)
+        pipe.hdel(self._sizes, key)
+        pipe.decrby(self._total, int(size))
+        pipe.execute()
+
+    def _evict(self) -> None:
+        # Expired keys stay indexed until popped here, so the bound errs on the small side
+        while self.max_bytes and int(self.client.get(self._total) or 0) > self.max_bytes:
+            popped = self.client.zpopmin(self._index)
+            if not popped:
+                self.client.set(self._total, 0)
+                return
+            key = popped[0][0].decode() if isinstance(popped[0][0], bytes) else popped[0][0]
+            self.client.delete(self.prefix + key)
+            size = self.client.hget(self._sizes, key)
+            self.client.hdel(self._sizes, key)
+            self.client.decrby(self._total, int(size or 0))
+
+    def clear(self) -> None:
+        keys = [self.prefix + (k.decode() if isinstance(k, bytes) else k) for k in self.client.zrange(self._index, 0, -1)]
+        self.client.delete(*keys, self._index, self._sizes, self._total)
+
+
+class ChatResult:
+    """Text and usage of a chat completion; usage is None when it came from the cache."""
+
+    __slots__ = ("content", "usage", "cached")
+
+    def __init__(self, content: str, usage=None, cached: bool = False):
+        self.content = content
+        self.usage = usage
+        self.cached = cached
+
+
+class LLMGateway:
+    """OpenAI calls that read through a response cache (cache=None disables caching)."""
+
+    def __init__(self, cache=None, client=None):
+        self.cache = cache
+        self._client = client
+        # One OpenAI client per API key: workers swap OPENAI_API_KEY per job for
+        # user-provided keys, and a job must never call out with another user's key
+        self._clients: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @property
+    def client(self):
+        """Client for the current OPENAI_API_KEY (or the one passed to the constructor)."""
+        if self._client is not None:
+            return self._client
+        api_key = os.getenv("OPENAI_API_KEY") or ""
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                from openai import OpenAI
+
+                client = self._clients[api_key] = OpenAI(api_key=api_key or None, max_retries=5)
+            return client
+
+    def _lookup(self, key: str) -> bytes | None:
+        if self.cache is None:
+            return None
+        try:
+            value = self.cache.get(key)
+        except Exception as exc:
+            # A broken cache must never fail the call it is meant to speed up
+            self._count("errors")
+            print(f"   LLM cache read failed ({exc}); calling the API")
+            return None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def _store(self, key: str, value: bytes) -> None:
+        try:
+            self.cache.set(key, value)
+        except Exception as exc:
+            self._count("errors")
+            print(f"   LLM cache write failed ({exc})")
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def chat(self, *, model: str, messages: list[dict], cache: bool = True, **params) -> ChatResult:
+        """chat.completions.create(model=..., messages=..., **params) through the cache."""
+        use_cache = cache and self.cache is not None
+        key = request_key("chat", model=model, messages=messages, params=params) if use_cache else None
+        cached = self._lookup(key) if use_cache else None
+        if cached is not None:
+            return ChatResult(json.loads(cached)["content"], cached=True)
+
+        response = self.client.chat.completions.create(model=model, messages=messages, **params)
+        content = response.choices[0].message.content or ""
+        if use_cache and response.choices[0].finish_reason in (None, "stop"):
+            self._store(key, json.dumps({"content": content}).encode("utf-8"))
+        return ChatResult(content, usage=getattr(response, "usage", None))
+
+    def speech_to_file(self, output_file: str, *, cache: bool = True, **params) -> bool:
+        """audio.speech (streamed) into output_file through the cache; returns True on a cache hit."""
+        use_cache = cache and self.cache is not None
+        key = request_key("speech", params=params) if use_cache else None
+        cached = self._lookup(key) if use_cache else None
+        if cached is not None:
+            with open(output_file, "wb") as f:
+                f.write(cached)
+            return True
+
+        with self.client.audio.speech.with_streaming_response.create(**params) as response:
+            response.stream_to_file(output_file)
+        if use_cache:
+            with open(output_file, "rb") as f:
+                self._store(key, f.read())
+        return False
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": type(self.cache).__name__ if self.cache is not None else "off",
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+_gateway: LLMGateway | None = None
+_gateway_config: tuple | None = None
+_gateway_lock = threading.Lock()
+
+
+def configure_llm_cache(backend: str | None = None, path: str | None = None, ttl_seconds: int | None = None,
+                        max_mb: int | None = None, redis_url: str | None = None) -> LLMGateway:
+    """Set up the process-wide gateway; arguments left as None fall back to the environment.
+
+    Calling again with the same configuration keeps the existing gateway and its statistics.
+    """
+    global _gateway, _gateway_config
+
+    backend = (backend or os.getenv("LLM_CACHE_BACKEND") or "sqlite").lower()
+    path = path or os.getenv("LLM_CACHE_PATH") or DEFAULT_PATH
+    ttl_seconds = ttl_seconds if ttl_seconds is not None else int(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    max_mb = max_mb if max_mb is not None else int(os.getenv("LLM_CACHE_MAX_MB", DEFAULT_MAX_MB))
+    redis_url = redis_url or os.getenv("LLM_CACHE_REDIS_URL") or os.getenv("REDIS_URL")
+    config = (backend, path, ttl_seconds, max_mb, redis_url)
+
+    with _gateway_lock:
+        if _gateway is not None and _gateway_config == config:
+            return _gateway
+        max_bytes = max(max_mb, 0) * 1024 * 1024
+        cache = None
+        if backend == "sqlite":
+            cache = SQLiteCache(path, ttl_seconds, max_bytes)
+        elif backend == "redis":
+            if not redis_url:
+                raise ValueError("LLM_CACHE_BACKEND=redis needs LLM_CACHE_REDIS_URL or REDIS_URL")
+            cache = RedisCache(redis_url, ttl_seconds, max_bytes)
+        elif backend not in ("off", "none", ""):
+            raise ValueError(f"Unknown LLM cache backend: {backend}")
+        _gateway, _gateway_config = LLMGateway(cache), config
+        return _gateway
+
+
+def get_llm_gateway() -> LLMGateway:
+    """The process-wide gateway, configured from the environment on first use."""
+    return _gateway if _gateway is not None else configure_llm_cache()
+
+
+def llm_cache_stats() -> dict:
+    return get_llm_gateway().stats()
+
+
+def print_llm_cache_stats() -> None:
+    stats = llm_cache_stats()
+    if stats["backend"] == "off":
+        print("LLM cache: off")
+        return
+    print(f"LLM cache ({stats['backend']}): {stats['hits']} hits, {stats['misses']} misses"
+          + (f", {stats['errors']} errors" if stats["errors"] else ""))
+
+
+__all__ = [
+    "ChatResult",
+    "LLMGateway",
+    "RedisCache",
+    "SQLiteCache",
+    "configure_llm_cache",
+    "get_llm_gateway",
+    "llm_cache_stats",
+    "print_llm_cache_stats",
+    "request_key",
+]
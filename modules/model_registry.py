@@ -0,0 +1,197 @@
+"""
+Model Registry
+
+Contains functions for:
+- Keeping loaded models resident in a process under a memory budget
+- Reference counting, so a model that is in use is never evicted
+- Least-recently-used eviction of idle models when a load would exceed the budget
+- Hit / miss / load time / resident bytes statistics
+
+Celery workers serve jobs with different Whisper sizes. Without a budget every
+size a worker has ever loaded stays resident, and large models eventually get
+the worker OOM-killed.
+"""
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc; 0 where unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def model_bytes(model) -> int:
+    """Parameter and buffer bytes of a torch module; 0 for other objects."""
+    parameters = getattr(model, "parameters", None)
+    if not callable(parameters):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in parameters())
+    buffers = getattr(model, "buffers", None)
+    if callable(buffers):
+        total += sum(b.numel() * b.element_size() for b in buffers())
+    return total
+
+
+class _Entry:
+    __slots__ = ("model", "size_bytes", "refs", "load_seconds", "last_used")
+
+    def __init__(self, model, size_bytes: int, load_seconds: float):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.refs = 0
+        self.load_seconds = load_seconds
+        self.last_used = time.monotonic()
+
+
+class ModelRegistry:
+    """Per-process cache of loaded models with a byte budget.
+
+    Use ``acquire`` for the whole time a model is in use: it pins the model
+    (refcount) so concurrent loads of other models cannot evict it. A budget of
+    0 means unbounded. If every resident model is pinned, a load still goes
+    ahead and the registry runs over budget until they are released.
+    """
+
+    def __init__(self, budget_bytes: int = 0):
+        self.budget_bytes = budget_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        # Entries dropped by clear() while pinned; forgotten on their last release
+        self._retired: list[_Entry] = []
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size_bytes for e in self._entries.values()) + sum(e.size_bytes for e in self._retired)
+
+    def set_budget(self, budget_bytes: int) -> None:
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._make_room(0)
+
+    @contextmanager
+    def acquire(self, key: str, loader: Callable[[], Any], estimate_bytes: int = 0):
+        """Yield the model for key, loading it with loader() on a miss.
+
+        Args:
+            key: Cache key (e.g. backend and model size)
+            loader: Called with the registry lock held to load the model
+            estimate_bytes: Expected resident size, used to evict before loading
+        """
+        entry = self._checkout(key, loader, estimate_bytes)
+        try:
+            yield entry.model
+        finally:
+            self._release(entry)
+
+    def _checkout(self, key: str, loader: Callable[[], Any], estimate_bytes: int) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            loaded = entry is None
+            if not loaded:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            else:
+                self.misses += 1
+                self._make_room(estimate_bytes)
+                rss_before = current_rss_bytes()
+                started = time.monotonic()
+                model = loader()
+                load_seconds = time.monotonic() - started
+                # Exact for torch modules; otherwise trust the caller's estimate, then
+                # fall back to the RSS growth (noisy if other threads allocate meanwhile)
+                size = model_bytes(model) or estimate_bytes or max(current_rss_bytes() - rss_before, 0)
+                entry = _Entry(model, size, load_seconds)
+                self.load_seconds += load_seconds
+                self._entries[key] = entry
+            entry.refs += 1
+            entry.last_used = time.monotonic()
+            if loaded:
+                # The measured size may exceed the estimate; the new entry is pinned
+                self._make_room(0)
+            return entry
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            entry.refs -= 1
+            entry.last_used = time.monotonic()
+            if entry.refs <= 0 and entry in self._retired:
+                self._retired.remove(entry)
+            self._make_room(0)
+
+    def _make_room(self, needed_bytes: int) -> None:
+        """Evict idle models, least recently used first, until needed_bytes fits the budget."""
+        if not self.budget_bytes:
+            return
+        evicted = False
+        for key in list(self._entries):
+            if self.resident_bytes + needed_bytes <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refs > 0:
+                continue
+            del self._entries[key]
+            self.evictions += 1
+            evicted = True
+            print(f"Evicted model '{key}' ({entry.size_bytes / 1e6:.0f} MB) to stay within the memory budget")
+        if evicted:
+            gc.collect()
+        if self.resident_bytes + needed_bytes > self.budget_bytes:
+            print(f"Model registry over budget: {self.resident_bytes / 1e6:.0f} MB resident, "
+                  f"{needed_bytes / 1e6:.0f} MB needed, budget {self.budget_bytes / 1e6:.0f} MB (models in use)")
+
+    def clear(self) -> None:
+        """Drop every model; pinned ones are freed when their last user releases them."""
+        with self._lock:
+            self._retired.extend(e for e in self._entries.values() if e.refs > 0)
+            self._entries.clear()
+            gc.collect()
+
+    def stats(self) -> dict:
+        """Counters and resident models (least recently used first)."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "budget_bytes": self.budget_bytes,
+                "resident_bytes": self.resident_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_seconds": round(self.load_seconds, 3),
+                "models": [
+                    {
+                        "key": key,
+                        "bytes": entry.size_bytes,
+                        "refs": entry.refs,
+                        "load_seconds": round(entry.load_seconds, 3),
+                        "idle_seconds": 0.0 if entry.refs else round(now - entry.last_used, 1),
+                    }
+                    for key, entry in self._entries.items()
+                ],
+            }
+
+
+__all__ = [
+    "ModelRegistry",
+    "current_rss_bytes",
+    "model_bytes",
+]
@@ -0,0 +1,119 @@
+"""
+Shared PCM Audio
+
+Contains functions for:
+- Decoding a video's audio once, straight to 16 kHz mono float32 PCM on disk
+- Memory-mapping that PCM as a NumPy array (Whisper input, feature extraction)
+- Durations and LINEAR16 / WAV conversion for consumers that need them
+
+Whisper resamples everything to 16 kHz mono float32 internally, so decoding to
+exactly that format once lets every step of a job share one memory-mapped
+buffer instead of writing a full-rate WAV and re-reading it per consumer.
+"""
+
+import os
+
+SAMPLE_RATE = 16000
+
+# Raw little-endian float32 samples, no header: the file is the array.
+PCM_EXTENSION = ".f32"
+_BYTES_PER_SAMPLE = 4
+
+
+def is_pcm_file(path: str) -> bool:
+    return str(path).lower().endswith(PCM_EXTENSION)
+
+
+def decode_pcm(video_path: str, output_file: str) -> str:
+    """Decode the audio track of a media file to 16 kHz mono float32 PCM.
+
+    Args:
+        video_path: Input video or audio file
+        output_file: Destination .f32 file
+
+    Returns:
+        Path to the PCM file
+    """
+    from modules.ffmpeg_render import run_ffmpeg
+
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    run_ffmpeg(
+        ["-nostdin", "-i", video_path, "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+         "-f", "f32le", "-acodec", "pcm_f32le", output_file],
+        "audio decode",
+    )
+    return output_file
+
+
+def load_pcm(path: str):
+    """Map a PCM file as a float32 array without reading it into memory.
+
+    Copy-on-write mapping: consumers that need a writable array (torch.from_numpy)
+    get one, and nothing they do touches the file.
+    """
+    import numpy as np
+
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(path, dtype="<f4", mode="c")
+
+
+def load_audio_16k(path: str):
+    """16 kHz mono float32 samples of any audio file; PCM files are memory-mapped."""
+    if is_pcm_file(path):
+        return load_pcm(path)
+    import whisper
+
+    return whisper.load_audio(path)
+
+
+def audio_duration(path: str) -> float:
+    """Duration in seconds of a PCM or WAV file without decoding it."""
+    if is_pcm_file(path):
+        return os.path.getsize(path) / (_BYTES_PER_SAMPLE * SAMPLE_RATE)
+    import wave
+
+    with wave.open(path, "rb") as wav:
+        return wav.getnframes() / float(wav.getframerate())
+
+
+def pcm_to_linear16(audio) -> bytes:
+    """16-bit little-endian PCM bytes (Google Speech LINEAR16) from float samples."""
+    import numpy as np
+
+    return (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+def pcm_to_wav(pcm_path: str, wav_path: str, block_seconds: int = 60) -> str:
+    """Write a PCM file as a 16-bit mono WAV for consumers that need a container.
+
+    Converted one block at a time, so memory stays flat for long audio.
+
+    Returns:
+        Path to the WAV file
+    """
+    import wave
+
+    audio = load_pcm(pcm_path)
+    block = block_seconds * SAMPLE_RATE
+    os.makedirs(os.path.dirname(wav_path) or ".", exist_ok=True)
+    with wave.open(wav_path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for start in range(0, len(audio), block):
+            wav.writeframes(pcm_to_linear16(audio[start:start + block]))
+    return wav_path
+
+
+__all__ = [
+    "PCM_EXTENSION",
+    "SAMPLE_RATE",
+    "audio_duration",
+    "decode_pcm",
+    "is_pcm_file",
+    "load_audio_16k",
+    "load_pcm",
+    "pcm_to_linear16",
+    "pcm_to_wav",
+]
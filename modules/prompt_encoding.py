@@ -0,0 +1,173 @@
+"""
+Prompt Encoding
+
+Contains functions for:
+- Estimating prompt tokens (tiktoken when installed, ~4 chars/token otherwise)
+- Merging tiny transcript segments into sentence-sized lines
+- Encoding transcripts as compact lines for LLM prompts
+- Fitting an encoded transcript into a per-model token budget
+- Logging per-call token usage
+
+A segment such as {"start": 12.34, "end": 15.8, "text": "...", "speaker_name": "Ana",
+"dominant_emotion": "joy", "intensity": 0.82} becomes
+
+    [12.3-15.8] Ana (joy 0.8): ...
+
+which is several times smaller than json.dumps(indent=2) of the same data.
+"""
+
+import os
+
+# Context window per model family (tokens); unknown models get the smallest
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4.1": 1000000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+_DEFAULT_CONTEXT_TOKENS = 8192
+
+# Share of the context window a transcript may take; the rest is instructions + answer
+_TRANSCRIPT_CONTEXT_SHARE = 0.5
+
+# Progressively shorter per-line word caps tried before lines are dropped
+_WORD_CAPS = (60, 35, 20, 12)
+
+
+def estimate_tokens(text: str, model: str | None = None) -> int:
+    """Token count of text for the model (exact with tiktoken, else ~4 chars per token)."""
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model(model or "gpt-4o")
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+        return len(encoding.encode(text))
+    except ImportError:
+        return (len(text) + 3) // 4
+
+
+def transcript_token_budget(model: str) -> int:
+    """Tokens the transcript may use in one prompt (LLM_TRANSCRIPT_TOKEN_BUDGET overrides)."""
+    override = int(os.getenv("LLM_TRANSCRIPT_TOKEN_BUDGET", "0") or 0)
+    if override > 0:
+        return override
+    context = next(
+        (tokens for prefix, tokens in sorted(MODEL_CONTEXT_TOKENS.items(), key=lambda kv: -len(kv[0]))
+         if model.startswith(prefix)),
+        _DEFAULT_CONTEXT_TOKENS,
+    )
+    return int(context * _TRANSCRIPT_CONTEXT_SHARE)
+
+
+def merge_short_segments(segments: list[dict], min_seconds: float = 2.0, max_seconds: float = 15.0) -> list[dict]:
+    """Join consecutive segments of the same speaker while the running line is shorter than min_seconds.
+
+    Emotion fields of the merged line come from its most intense segment.
+    """
+    merged = []
+    for seg in segments:
+        prev = merged[-1] if merged else None
+        if (
+            prev is not None
+            and not prev.get("skipped") and not seg.get("skipped")
+            and prev.get("speaker_name", prev.get("speaker")) == seg.get("speaker_name", seg.get("speaker"))
+            and prev["end"] - prev["start"] < min_seconds
+            and seg.get("end", 0) - prev["start"] <= max_seconds
+        ):
+            prev["end"] = seg.get("end", prev["end"])
+            prev["text"] = f"{prev['text']} {seg.get('text', '').strip()}".strip()
+            if seg.get("intensity", 0) > prev.get("intensity", 0):
+                for field in ("dominant_emotion", "intensity"):
+                    if field in seg:
+                        prev[field] = seg[field]
+            continue
+        merged.append({
+            key: seg[key] for key in ("start", "end", "text", "speaker", "speaker_name", "dominant_emotion", "intensity",
+                                      "skipped")
+            if key in seg
+        })
+        merged[-1]["text"] = merged[-1].get("text", "").strip()
+    return merged
+
+
+def encode_segment(seg: dict, max_words: int | None = None) -> str:
+    """One compact prompt line; speaker and emotion appear only when present."""
+    text = seg.get("text", "").strip()
+    if max_words is not None:
+        words = text.split()
+        if len(words) > max_words:
+            text = " ".join(words[:max_words]) + " …"
+    label = seg.get("speaker_name") or seg.get("speaker")
+    emotion = seg.get("dominant_emotion")
+    tags = ""
+    if emotion and emotion != "neutral":
+        tags = f" ({emotion} {seg.get('intensity', 0.5):.1f})"
+    who = f" {label}{tags}:" if label else (f"{tags}:" if tags else "")
+    return f"[{seg.get('start', 0):.1f}-{seg.get('end', 0):.1f}]{who} {text}"
+
+
+def encode_transcript(segments: list[dict], budget_tokens: int | None = None, model: str | None = None,
+                      merge: bool = True) -> str:
+    """Compact line encoding of a transcript that fits budget_tokens.
+
+    Over budget, long lines are shortened first (word caps of decreasing size);
+    if that is not enough, evenly spaced lines are dropped so the whole timeline
+    stays covered, with an omission marker where lines were removed.
+    """
+    lines_src = merge_short_segments(segments) if merge else segments
+    text = "\n".join(encode_segment(seg) for seg in lines_src)
+    if budget_tokens is None or estimate_tokens(text, model) <= budget_tokens:
+        return text
+
+    for cap in _WORD_CAPS:
+        lines = [encode_segment(seg, max_words=cap) for seg in lines_src]
+        text = "\n".join(lines)
+        tokens = estimate_tokens(text, model)
+        if tokens <= budget_tokens:
+            return text
+
+    stride = 2
+    while True:
+        kept = []
+        for i in range(0, len(lines), stride):
+            kept.append(lines[i])
+            omitted = min(stride - 1, len(lines) - i - 1)
+            if omitted:
+                kept.append(f"[… {omitted} lines omitted …]")
+        text = "\n".join(kept)
+        if estimate_tokens(text, model) <= budget_tokens or len(kept) <= 2:
+            return text
+        stride *= 2
+
+
+def segments_in_window(segments: list[dict], start: float, end: float) -> list[dict]:
+    """Segments overlapping [start, end]."""
+    return [s for s in segments if s.get("end", 0) > start and s.get("start", 0) < end]
+
+
+def log_token_usage(call_name: str, prompt_text: str, response=None, model: str | None = None) -> None:
+    """Print estimated prompt tokens and, when the API reports them, actual usage (or that the cache answered)."""
+    estimate = estimate_tokens(prompt_text, model)
+    usage = getattr(response, "usage", None)
+    if getattr(response, "cached", False):
+        print(f"   [{call_name}] cache hit (~{estimate} prompt tokens not sent)")
+    elif usage is not None:
+        print(f"   [{call_name}] tokens: prompt {usage.prompt_tokens} (est. {estimate}), "
+              f"completion {usage.completion_tokens}, total {usage.total_tokens}")
+    else:
+        print(f"   [{call_name}] tokens: prompt ~{estimate}")
+
+
+__all__ = [
+    "MODEL_CONTEXT_TOKENS",
+    "encode_segment",
+    "encode_transcript",
+    "estimate_tokens",
+    "log_token_usage",
+    "merge_short_segments",
+    "segments_in_window",
+    "transcript_token_budget",
+]
@@ -0,0 +1,165 @@
+"""
+Segment Ranking
+
+Contains functions for:
+- Scoring fixed-length transcript windows offline (vectorized with NumPy) by
+  TF-IDF novelty, speech density, emotion intensity and speaker changes
+- Keeping the top-K windows, K scaled by the recap target duration, and
+  replacing the rest with one short context line per skipped stretch
+
+Most of a long transcript never becomes a clip candidate. Pre-ranking it
+locally lets the clip-selection prompt carry only the promising windows.
+"""
+
+import re
+import zlib
+
+# Hashed TF-IDF dimensions; collisions only blur the novelty feature slightly
+_HASH_DIMS = 4096
+_TOKEN_RE = re.compile(r"\w{3,}")
+
+DEFAULT_WEIGHTS = {
+    "novelty": 0.35,
+    "density": 0.25,
+    "emotion": 0.25,
+    "speaker_changes": 0.15,
+}
+
+# Words from a skipped stretch kept as context in its placeholder line
+_CONTEXT_WORDS = 12
+
+
+def _normalize(values):
+    import numpy as np
+
+    span = values.max() - values.min() if len(values) else 0
+    return (values - values.min()) / span if span > 0 else np.zeros_like(values)
+
+
+def score_windows(segments: list[dict], window_seconds: float = 15.0, weights: dict | None = None):
+    """Score the non-empty window_seconds windows of a transcript.
+
+    Args:
+        segments: Chronological transcript segments (optionally with
+                  dominant_emotion / intensity from _merge_emotions_with_segments)
+        window_seconds: Window length; a segment belongs to the window its start falls in
+        weights: Feature weights (defaults to DEFAULT_WEIGHTS)
+
+    Returns:
+        (window_index, scores): window_index[i] is the window of segments[i]
+        (0..n_windows-1, in time order); scores[w] is the combined score in [0, 1]
+    """
+    import numpy as np
+
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    starts = np.array([seg.get("start", 0.0) for seg in segments], dtype=np.float64)
+    raw_bins = np.floor((starts - starts.min()) / window_seconds).astype(np.int64)
+    _, window_index = np.unique(raw_bins, return_inverse=True)
+    n_windows = int(window_index.max()) + 1
+
+    # Hashed term counts per window -> L2-normalized TF-IDF rows
+    rows, cols = [], []
+    word_counts = np.zeros(len(segments))
+    for i, seg in enumerate(segments):
+        text = seg.get("text", "")
+        word_counts[i] = len(text.split())
+        for token in _TOKEN_RE.findall(text.lower()):
+            rows.append(window_index[i])
+            cols.append(zlib.crc32(token.encode()) % _HASH_DIMS)
+    tf = np.zeros((n_windows, _HASH_DIMS), dtype=np.float32)
+    if rows:
+        np.add.at(tf, (np.array(rows), np.array(cols)), 1.0)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log((1 + n_windows) / (1 + df)).astype(np.float32) + 1.0
+    tfidf = tf * idf
+    norms = np.linalg.norm(tfidf, axis=1, keepdims=True)
+    tfidf /= np.where(norms > 0, norms, 1.0)
+
+    # Novelty: how unlike anything said earlier this window is
+    similarity = tfidf @ tfidf.T
+    similarity[np.triu_indices(n_windows)] = 0.0
+    novelty = 1.0 - similarity.max(axis=1)
+
+    density = np.bincount(window_index, weights=word_counts, minlength=n_windows) / window_seconds
+
+    intensity = np.array([
+        float(seg.get("intensity", 0.0)) if seg.get("dominant_emotion", "neutral") != "neutral" else 0.0
+        for seg in segments
+    ])
+    emotion = np.zeros(n_windows)
+    np.maximum.at(emotion, window_index, intensity)
+
+    speakers = [seg.get("speaker_name") or seg.get("speaker") for seg in segments]
+    changes = np.array([0.0] + [
+        1.0 if cur is not None and prev is not None and cur != prev else 0.0
+        for prev, cur in zip(speakers, speakers[1:])
+    ])
+    speaker_changes = np.bincount(window_index, weights=changes, minlength=n_windows)
+
+    features = {
+        "novelty": novelty,
+        "density": density,
+        "emotion": emotion,
+        "speaker_changes": speaker_changes,
+    }
+    total_weight = sum(weights.values()) or 1.0
+    scores = sum(weights[name] * _normalize(values.astype(np.float64)) for name, values in features.items())
+    return window_index, scores / total_weight
+
+
+def prerank_segments(segments: list[dict], target_duration: float, coverage: float = 8.0,
+                     window_seconds: float = 15.0, weights: dict | None = None) -> list[dict]:
+    """Keep the best-scored windows worth coverage x target_duration seconds.
+
+    Kept segments are returned unchanged and in time order. Each run of
+    skipped windows becomes one placeholder segment spanning it, whose text
+    is the first few words said there, so the LLM still sees the storyline.
+    Transcripts that already fit are returned as-is; coverage <= 0 disables.
+
+    Returns:
+        New segment list (placeholders carry "skipped": True)
+    """
+    if coverage <= 0 or not segments:
+        return segments
+    keep_windows = max(1, -(-int(coverage * target_duration) // int(window_seconds)))
+
+    segments = sorted(segments, key=lambda s: s.get("start", 0))
+    window_index, scores = score_windows(segments, window_seconds, weights)
+    if keep_windows >= len(scores):
+        return segments
+
+    import numpy as np
+
+    kept = np.zeros(len(scores), dtype=bool)
+    kept[np.argsort(-scores, kind="stable")[:keep_windows]] = True
+
+    out, skipped = [], []
+    for seg, window in zip(segments, window_index):
+        if kept[window]:
+            if skipped:
+                out.append(_placeholder(skipped))
+                skipped = []
+            out.append(seg)
+        else:
+            skipped.append(seg)
+    if skipped:
+        out.append(_placeholder(skipped))
+    return out
+
+
+def _placeholder(skipped: list[dict]) -> dict:
+    words = " ".join(seg.get("text", "").strip() for seg in skipped).split()
+    context = " ".join(words[:_CONTEXT_WORDS]) + (" …" if len(words) > _CONTEXT_WORDS else "")
+    return {
+        "start": skipped[0].get("start", 0.0),
+        "end": skipped[-1].get("end", 0.0),
+        "text": f"(skipped; begins: {context})",
+        "skipped": True,
+    }
+
+
+__all__ = [
+    "DEFAULT_WEIGHTS",
+    "prerank_segments",
+    "score_windows",
+]
@@ -7,11 +7,12 @@ Each function is independent and can be called separately.
 
 import json
 import os
-import threading
-from typing import Any
+import time
+from contextlib import contextmanager
 
 import whisper
-from moviepy.editor import VideoFileClip
+
+from modules.model_registry import ModelRegistry
 
 try:
     import assemblyai as aai
@@ -21,37 +22,193 @@ except ImportError:
 # Get the directory where this file is located (parent of modules/)
 SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-# One Whisper model per (model_size) per process — Celery workers reuse the same process,
-# so the second+ job avoids disk load and model init latency.
-_WHISPER_MODEL_CACHE: dict[str, Any] = {}
-_WHISPER_LOAD_LOCK = threading.Lock()
+# Loaded Whisper models per process — Celery workers reuse the same process, so the
+# second+ job avoids disk load and model init latency. The registry evicts idle
+# models (least recently used first) when a load would exceed its byte budget.
+_WHISPER_REGISTRY = ModelRegistry()
 # Last Redis "generation" this process applied (see sync_whisper_cache_invalidation).
 _WHISPER_GEN_SEEN: int = -1
 
 # Redis key for global cache bust (INCR from API); workers observe on next transcribe.
 WHISPER_CACHE_REDIS_KEY = "videorecap:whisper_cache_gen"
+# Per-worker-process registry stats (see publish_whisper_registry_stats), read by the API.
+WHISPER_STATS_REDIS_PREFIX = "videorecap:whisper_stats:"
+_WHISPER_STATS_TTL_SECONDS = 24 * 3600
 
+# Approximate parameter counts, used to make room before a model is loaded.
+_WHISPER_PARAMS = {
+    "tiny": 39e6, "base": 74e6, "small": 244e6, "medium": 769e6, "large": 1550e6, "turbo": 809e6,
+}
 
-def is_whisper_model_cached(model_size: str) -> bool:
-    return model_size in _WHISPER_MODEL_CACHE
 
+# Whisper inference engines. "openai" is the reference PyTorch model (fp32 on CPU);
+# "ctranslate2" runs the same weights through faster-whisper with int8 CPU kernels.
+WHISPER_BACKENDS = ("openai", "ctranslate2")
+_CT2_COMPUTE_TYPE = "int8"
 
-def _get_whisper_model(model_size: str):
-    if model_size not in _WHISPER_MODEL_CACHE:
-        with _WHISPER_LOAD_LOCK:
-            if model_size not in _WHISPER_MODEL_CACHE:
-                print(f"Loading Whisper model '{model_size}' (cached for reuse in this worker)...")
-                _WHISPER_MODEL_CACHE[model_size] = whisper.load_model(model_size)
-    else:
-        print(f"Using cached Whisper model '{model_size}' (no reload)")
-    return _WHISPER_MODEL_CACHE[model_size]
+
+class CTranslate2WhisperModel:
+    """faster-whisper (CTranslate2) model behind the openai-whisper transcribe() interface.
+
+    transcribe() returns {"text", "segments", "language"} with the segment fields
+    the pipeline reads, so callers never branch on the backend.
+    """
+
+    def __init__(self, model_size: str, cpu_threads: int = 0):
+        from faster_whisper import WhisperModel
+
+        self.model_size = model_size
+        self._model = WhisperModel(
+            model_size, device="cpu", compute_type=_CT2_COMPUTE_TYPE, cpu_threads=cpu_threads
+        )
+
+    @staticmethod
+    def _as_input(audio):
+        if isinstance(audio, str):
+            return audio
+        import numpy as np
+
+        return np.asarray(audio, dtype=np.float32)
+
+    def transcribe(self, audio, verbose=None, language=None, **_options) -> dict:
+        # Greedy decoding, like openai-whisper's default
+        segments, info = self._model.transcribe(self._as_input(audio), language=language, beam_size=1)
+        result_segments = []
+        for segment in segments:
+            if verbose:
+                print(f"[{segment.start:.3f} --> {segment.end:.3f}] {segment.text.strip()}")
+            result_segments.append({
+                "id": segment.id,
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+            })
+        return {
+            "text": "".join(segment["text"] for segment in result_segments),
+            "segments": result_segments,
+            "language": info.language,
+        }
+
+    def language_of(self, audio) -> str:
+        """Language detected from the first 30 s; segments are never decoded."""
+        if not isinstance(audio, str):
+            audio = audio[: 30 * 16000]
+        _, info = self._model.transcribe(self._as_input(audio))
+        return info.language
+
+
+def load_whisper_model(model_size: str, backend: str = "openai", cpu_threads: int = 0):
+    """Load a Whisper model on the given backend (uncached; see whisper_model).
+
+    Args:
+        model_size: tiny, base, small, medium, large
+        backend: One of WHISPER_BACKENDS
+        cpu_threads: CTranslate2 intra-op threads (0 = library default); the
+                     openai backend follows torch.set_num_threads instead
+    """
+    if backend == "ctranslate2":
+        return CTranslate2WhisperModel(model_size, cpu_threads=cpu_threads)
+    if backend != "openai":
+        raise ValueError(f"Unknown Whisper backend '{backend}' (expected one of {WHISPER_BACKENDS})")
+    return whisper.load_model(model_size)
+
+
+def _model_cache_key(model_size: str, backend: str) -> str:
+    return model_size if backend == "openai" else f"{backend}:{model_size}"
+
+
+def is_whisper_model_cached(model_size: str, backend: str = "openai") -> bool:
+    return _model_cache_key(model_size, backend) in _WHISPER_REGISTRY
+
+
+def _estimated_model_bytes(model_size: str, backend: str) -> int:
+    name = model_size.split(".")[0]
+    params = _WHISPER_PARAMS.get(name) or _WHISPER_PARAMS.get(name.split("-")[0], 0)
+    # fp32 weights for the reference model, int8 for CTranslate2
+    return int(params * (1 if backend == "ctranslate2" else 4))
+
+
+def whisper_model_capacity(model_size: str, backend: str = "openai") -> int | None:
+    """How many more instances of this model fit in the registry budget (None = unbounded)."""
+    budget = _WHISPER_REGISTRY.budget_bytes
+    if not budget:
+        return None
+    estimate = _estimated_model_bytes(model_size, backend) or 1
+    return max(0, int((budget - _WHISPER_REGISTRY.resident_bytes) // estimate))
+
+
+@contextmanager
+def whisper_model(model_size: str, backend: str = "openai", replica: int = 0, cpu_threads: int = 0):
+    """Use the Whisper model for (model_size, backend), loading it once per process.
+
+    The model stays pinned in the registry for the duration of the with block,
+    so loads of other sizes cannot evict it mid-transcription. replica > 0 is an
+    additional instance for a parallel worker thread; it counts against the same
+    memory budget and stays cached for the next job like the primary one.
+    """
+    key = _model_cache_key(model_size, backend) + (f"#{replica}" if replica else "")
+
+    def load():
+        print(f"Loading Whisper model '{model_size}' [{backend}] (cached for reuse in this worker)...")
+        return load_whisper_model(model_size, backend, cpu_threads=cpu_threads)
+
+    if key in _WHISPER_REGISTRY:
+        print(f"Using cached Whisper model '{model_size}' [{backend}] (no reload)")
+    with _WHISPER_REGISTRY.acquire(key, load, _estimated_model_bytes(model_size, backend)) as model:
+        yield model
+
+
+def warm_up_whisper_model(model_size: str, backend: str = "openai") -> float:
+    """Load a model into this process's registry and run one second of silence through it.
+
+    The first inference allocates kernels and caches that a real job would
+    otherwise pay for. Returns the elapsed seconds.
+    """
+    import numpy as np
+
+    started = time.monotonic()
+    with whisper_model(model_size, backend) as model:
+        model.transcribe(np.zeros(16000, dtype=np.float32), verbose=None, language="en")
+    return time.monotonic() - started
+
+
+def set_whisper_model_budget(budget_mb: int) -> None:
+    """Cap the memory of resident Whisper models in this process (0 = unbounded)."""
+    _WHISPER_REGISTRY.set_budget(max(budget_mb, 0) * 1024 * 1024)
+
+
+def whisper_registry_stats() -> dict:
+    """Hits, misses, evictions, load time and resident bytes of this process's models."""
+    return _WHISPER_REGISTRY.stats()
+
+
+def publish_whisper_registry_stats(redis_url: str | None) -> None:
+    """Store this process's registry stats in Redis so the API can report every worker."""
+    if not redis_url:
+        return
+    import socket
+
+    stats = whisper_registry_stats()
+    stats.update(hostname=socket.gethostname(), pid=os.getpid(), updated_at=time.time())
+    try:
+        import redis as redis_sync
+
+        r = redis_sync.Redis.from_url(redis_url, decode_responses=True)
+        try:
+            r.setex(
+                f"{WHISPER_STATS_REDIS_PREFIX}{stats['hostname']}:{stats['pid']}",
+                _WHISPER_STATS_TTL_SECONDS,
+                json.dumps(stats),
+            )
+        finally:
+            r.close()
+    except Exception as exc:
+        print(f"Whisper registry stats not published: {exc}")
 
 
 def clear_whisper_model_cache() -> None:
     """Remove loaded Whisper models from this process (next job loads from disk again)."""
-    global _WHISPER_MODEL_CACHE
-    with _WHISPER_LOAD_LOCK:
-        _WHISPER_MODEL_CACHE.clear()
+    _WHISPER_REGISTRY.clear()
     print("Whisper in-process cache cleared for this worker.")
 
 
@@ -74,7 +231,7 @@ def sync_whisper_cache_invalidation(redis_url: str | None) -> None:
         return
 
     if gen != _WHISPER_GEN_SEEN:
-        if _WHISPER_MODEL_CACHE:
+        if _WHISPER_REGISTRY.stats()["models"]:
             clear_whisper_model_cache()
         _WHISPER_GEN_SEEN = gen
 
@@ -84,7 +241,34 @@ def get_output_path(relative_path):
     return os.path.join(SCRIPT_DIR, relative_path)
 
 
-def transcribe_video(video_path, output_dir="output/transcriptions", model_size="small", language=None):
+def extract_audio(video_path, output_file=None):
+    """
+    Decode the audio track of a video once to 16 kHz mono float32 PCM.
+
+    Whisper, emotion analysis and feature extractors all memory-map this file
+    (see modules.pcm_audio) instead of re-reading and resampling a WAV.
+
+    Args:
+        video_path: Path to input video file
+        output_file: Destination .f32 file (default: output/original/extracted_audio.f32)
+
+    Returns:
+        Path to the PCM file
+    """
+    from modules.pcm_audio import decode_pcm
+
+    if output_file is None:
+        output_file = os.path.join(get_output_path("output/original"), "extracted_audio.f32")
+
+    print("Extracting audio from video...")
+    decode_pcm(video_path, output_file)
+
+    print(f"Audio extracted to: {output_file}")
+    return output_file
+
+
+def transcribe_video(video_path, output_dir="output/transcriptions", model_size="small", language=None,
+                     audio_path=None, chunk_seconds=0, chunk_workers=None, vad=False, backend="openai"):
     """
     Step 1: Transcribe video to text with timestamps
     
@@ -93,6 +277,14 @@ def transcribe_video(video_path, output_dir="output/transcriptions", model_size=
         output_dir: Directory to save transcription
         model_size: Whisper model size (tiny, base, small, medium, large)
         language: Language code (e.g., 'en' for English, 'es' for Spanish). Auto-detect if None.
+        audio_path: Audio already extracted by extract_audio (or any file Whisper reads);
+                    extracted here if None.
+        chunk_seconds: If set and the audio is longer than twice this, split it at
+                       silences and transcribe the chunks on a local pool.
+        chunk_workers: Pool size for chunked mode (default: one per two CPU cores)
+        vad: Only send speech regions (energy/zero-crossing VAD) to Whisper; timestamps
+             are remapped to source time and stats saved to speech_regions.json.
+        backend: Whisper inference engine, "openai" or "ctranslate2" (int8 CPU)
     
     Returns:
         Path to transcription file
@@ -101,12 +293,10 @@ def transcribe_video(video_path, output_dir="output/transcriptions", model_size=
     print(f"STEP 1: TRANSCRIBING VIDEO")
     print(f"{'='*70}")
     print(f"Video: {video_path}")
-    print(f"Model: {model_size}")
+    print(f"Model: {model_size} ({backend})")
     if language:
         print(f"Language: {language}")
     
-    model = _get_whisper_model(model_size)
-    
     # Create output directories
     output_path = get_output_path(output_dir)
     os.makedirs(output_path, exist_ok=True)
@@ -115,29 +305,68 @@ def transcribe_video(video_path, output_dir="output/transcriptions", model_size=
     os.makedirs(original_dir, exist_ok=True)
     
     # Extract audio from video
-    print("Extracting audio from video...")
-    video = VideoFileClip(video_path)
-    temp_audio = os.path.join(original_dir, "extracted_audio.wav")
-    video.audio.write_audiofile(temp_audio, verbose=False, logger=None)
-    video.close()
-    
-    print(f"Audio extracted to: {temp_audio}")
+    if audio_path and os.path.exists(audio_path):
+        temp_audio = audio_path
+    else:
+        temp_audio = extract_audio(video_path, os.path.join(original_dir, "extracted_audio.f32"))
     
     # Transcribe audio
-    print("Transcribing audio...")
-    transcribe_options = {"verbose": True}
-    if language:
-        transcribe_options["language"] = language
-    result = model.transcribe(temp_audio, **transcribe_options)
-    
-    # Process segments
-    transcript_data = []
-    for segment in result['segments']:
-        transcript_data.append({
-            "start": segment['start'],
-            "end": segment['end'],
-            "text": segment['text'].strip()
-        })
+    from modules.chunked_transcription import transcribe_audio_chunked
+    from modules.pcm_audio import SAMPLE_RATE, audio_duration, load_audio_16k
+
+    vad_regions = None
+    transcribe_source = temp_audio
+    regions_file = os.path.join(output_path, "speech_regions.json")
+    if os.path.exists(regions_file):
+        os.remove(regions_file)
+    if vad:
+        from modules.vad import concatenate_regions, detect_speech
+
+        source_audio = load_audio_16k(temp_audio)
+        vad_regions, speech_ratio = detect_speech(source_audio)
+        if vad_regions:
+            transcribe_source = os.path.join(original_dir, "speech_audio.f32")
+            concatenate_regions(source_audio, vad_regions).astype("<f4").tofile(transcribe_source)
+            total_seconds = len(source_audio) / SAMPLE_RATE
+            with open(regions_file, "w") as f:
+                json.dump({
+                    "speech_ratio": round(speech_ratio, 4),
+                    "speech_seconds": round(speech_ratio * total_seconds, 2),
+                    "total_seconds": round(total_seconds, 2),
+                    "regions": vad_regions,
+                }, f, indent=2)
+            print(f"VAD: {speech_ratio:.0%} of the audio is speech ({len(vad_regions)} regions)")
+        else:
+            print("VAD found no speech; transcribing the full audio")
+
+    with whisper_model(model_size, backend) as model:
+        if chunk_seconds and audio_duration(transcribe_source) > 2 * chunk_seconds:
+            print("Transcribing audio in chunks...")
+            transcript_data = transcribe_audio_chunked(
+                transcribe_source, model_size, language=language,
+                chunk_seconds=chunk_seconds, max_workers=chunk_workers, shared_model=model,
+                backend=backend,
+            )
+        else:
+            print("Transcribing audio...")
+            transcribe_options = {"verbose": True}
+            if language:
+                transcribe_options["language"] = language
+            result = model.transcribe(load_audio_16k(transcribe_source), **transcribe_options)
+
+            # Process segments
+            transcript_data = []
+            for segment in result['segments']:
+                transcript_data.append({
+                    "start": segment['start'],
+                    "end": segment['end'],
+                    "text": segment['text'].strip()
+                })
+
+    if vad_regions:
+        from modules.vad import remap_segments
+
+        transcript_data = remap_segments(transcript_data, vad_regions)
     
     # Save transcription
     output_path = get_output_path(output_dir)
@@ -207,14 +436,13 @@ def transcribe_video_with_assemblyai(
     # Set up AssemblyAI client
     aai.settings.api_key = api_key
 
-    # Extract audio from video (AssemblyAI works with audio files)
-    print("Extracting audio from video...")
-    video = VideoFileClip(video_path)
-    temp_audio = os.path.join(get_output_path("output/original"), "extracted_audio.wav")
-    os.makedirs(os.path.dirname(temp_audio), exist_ok=True)
-    video.audio.write_audiofile(temp_audio, verbose=False, logger=None)
-    video.close()
-    print(f"Audio extracted to: {temp_audio}")
+    # Same shared 16 kHz decode as Whisper; AssemblyAI needs a container format,
+    # so the headerless PCM is wrapped as a 16-bit WAV under its own name
+    from modules.pcm_audio import pcm_to_wav
+
+    pcm_audio = extract_audio(video_path)
+    temp_audio = pcm_to_wav(pcm_audio, os.path.join(get_output_path("output/original"), "assemblyai_audio.wav"))
+    print(f"AssemblyAI upload audio: {temp_audio}")
 
     # Transcribe with AssemblyAI
     print("Transcribing audio with speaker diarization...")
@@ -394,7 +622,7 @@ def transcribe_video_with_emotions(
         # Import here to avoid hard dependency
         from app.processing.emotion_analysis import analyze_audio_emotions
 
-        audio_path = os.path.join(get_output_path("output/original"), "extracted_audio.wav")
+        audio_path = os.path.join(get_output_path("output/original"), "extracted_audio.f32")
 
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
@@ -436,7 +664,12 @@ def transcribe_with_optional_emotions(
     include_emotions=False,
     enable_assemblyai_diarization=False,
     assemblyai_api_key=None,
-    assemblyai_language_code="en"
+    assemblyai_language_code="en",
+    audio_path=None,
+    chunk_seconds=0,
+    chunk_workers=None,
+    vad=False,
+    backend="openai",
 ):
     """
     Unified transcription function that respects subscription tier and feature flags.
@@ -455,6 +688,11 @@ def transcribe_with_optional_emotions(
         enable_assemblyai_diarization: Boolean - whether to use AssemblyAI with speaker diarization
         assemblyai_api_key: AssemblyAI API key (required if diarization enabled)
         assemblyai_language_code: Language code for AssemblyAI
+        audio_path: Already-extracted WAV to transcribe with Whisper (skips re-extraction)
+        chunk_seconds: Whisper chunked-mode window length (0 disables, see transcribe_video)
+        chunk_workers: Whisper chunked-mode pool size
+        vad: Transcribe only detected speech regions with Whisper
+        backend: Whisper inference engine ("openai" or "ctranslate2")
 
     Returns:
         Tuple: (transcription_file, emotions_file or None)
@@ -483,7 +721,11 @@ def transcribe_with_optional_emotions(
 
     # Default: Basic Whisper transcription
     print("📝 Using BASIC tier (transcription only)")
-    transcript_file = transcribe_video(video_path, output_dir, model_size, language)
+    transcript_file = transcribe_video(
+        video_path, output_dir, model_size, language,
+        audio_path=audio_path, chunk_seconds=chunk_seconds, chunk_workers=chunk_workers, vad=vad,
+        backend=backend,
+    )
     return transcript_file, None
 
 
@@ -503,8 +745,8 @@ def translate_transcription(input_file, source_lang, target_lang, output_dir="ou
     Returns:
         Path to translated JSON file
     """
-    from openai import OpenAI
     import dotenv
+    from modules.llm_cache import get_llm_gateway
 
     dotenv.load_dotenv()
 
@@ -514,7 +756,8 @@ def translate_transcription(input_file, source_lang, target_lang, output_dir="ou
     print(f"Input: {input_file}")
     print(f"Translation: {source_lang} → {target_lang}")
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=5)
+    # Batches already translated by an earlier run come from the LLM cache
+    llm = get_llm_gateway()
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o")
 
     # Read segments — support both JSON and legacy .txt
@@ -551,7 +794,7 @@ def translate_transcription(input_file, source_lang, target_lang, output_dir="ou
         numbered_lines = "\n".join(
             f"{i+1}. {seg['text']}" for i, seg in enumerate(batch)
         )
-        response = client.chat.completions.create(
+        response = llm.chat(
             model=model_name,
             messages=[
                 {"role": "system", "content": (
@@ -566,7 +809,7 @@ def translate_transcription(input_file, source_lang, target_lang, output_dir="ou
             ],
             max_tokens=3000,
         )
-        result_text = response.choices[0].message.content or ""
+        result_text = response.content
 
         translated = {}
         for line in result_text.strip().split("\n"):
@@ -602,14 +845,25 @@ def translate_transcription(input_file, source_lang, target_lang, output_dir="ou
 
 # Export functions
 __all__ = [
+    "CTranslate2WhisperModel",
+    "WHISPER_BACKENDS",
     "WHISPER_CACHE_REDIS_KEY",
+    "WHISPER_STATS_REDIS_PREFIX",
     "clear_whisper_model_cache",
+    "extract_audio",
     "get_output_path",
     "is_whisper_model_cached",
+    "load_whisper_model",
+    "publish_whisper_registry_stats",
+    "set_whisper_model_budget",
     "sync_whisper_cache_invalidation",
     "transcribe_video",
     "transcribe_video_with_emotions",
     "transcribe_with_optional_emotions",
     "translate_transcription",
+    "warm_up_whisper_model",
+    "whisper_model",
+    "whisper_model_capacity",
+    "whisper_registry_stats",
 ]
 
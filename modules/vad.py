@@ -0,0 +1,171 @@
+"""
+Voice Activity Detection
+
+Contains functions for:
+- Classifying 30 ms frames as speech with a vectorized energy / zero-crossing detector
+- Turning frame decisions into padded speech regions
+- Concatenating speech regions into one buffer for Whisper
+- Remapping timestamps from the concatenated buffer back to source time
+
+Films and vlogs often have long music or ambient stretches. Whisper spends the
+same compute on them as on dialogue (and tends to hallucinate text there), so
+only the speech regions are transcribed.
+"""
+
+from modules.pcm_audio import SAMPLE_RATE
+
+_FRAME_SECONDS = 0.03
+
+# Silence inserted between concatenated regions so Whisper does not run words
+# from two regions together.
+JOIN_GAP_SECONDS = 0.2
+
+
+def speech_frames(audio, sample_rate: int = SAMPLE_RATE, frame_seconds: float = _FRAME_SECONDS,
+                  energy_ratio: float = 3.0, min_energy: float = 1e-3, max_zcr: float = 0.35):
+    """Per-frame speech decision.
+
+    A frame is speech when its RMS energy is well above the noise floor (10th
+    percentile of the file) and its zero-crossing rate is below that of broadband
+    noise/hiss. Quiet unvoiced consonants are recovered by the region padding.
+
+    Returns:
+        Boolean NumPy array, one entry per frame
+    """
+    import numpy as np
+
+    hop = max(1, int(sample_rate * frame_seconds))
+    n_frames = len(audio) // hop
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+    frames = np.asarray(audio[: n_frames * hop], dtype=np.float32).reshape(n_frames, hop)
+
+    energy = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+    noise_floor = float(np.percentile(energy, 10))
+    threshold = max(noise_floor * energy_ratio, min_energy)
+    return (energy > threshold) & (zcr < max_zcr)
+
+
+def speech_regions(flags, frame_seconds: float = _FRAME_SECONDS, min_speech: float = 0.25,
+                   min_silence: float = 0.5, pad: float = 0.2, duration: float | None = None) -> list[tuple[float, float]]:
+    """Group per-frame speech flags into regions.
+
+    Args:
+        flags: Sequence of per-frame booleans
+        frame_seconds: Frame length
+        min_speech: Drop bursts shorter than this (clicks, door slams)
+        min_silence: Bridge pauses shorter than this (keeps sentences whole)
+        pad: Seconds added on both sides of each region
+        duration: Source duration used to clamp the last region
+
+    Returns:
+        Sorted, non-overlapping [(start, end), ...] in seconds
+    """
+    runs = []
+    start = None
+    for i, is_speech in enumerate(flags):
+        if is_speech and start is None:
+            start = i
+        elif not is_speech and start is not None:
+            runs.append((start * frame_seconds, i * frame_seconds))
+            start = None
+    if start is not None:
+        runs.append((start * frame_seconds, len(flags) * frame_seconds))
+
+    bridged = []
+    for run_start, run_end in runs:
+        if bridged and run_start - bridged[-1][1] < min_silence:
+            bridged[-1] = (bridged[-1][0], run_end)
+        else:
+            bridged.append((run_start, run_end))
+
+    end_limit = duration if duration is not None else len(flags) * frame_seconds
+    regions = []
+    for run_start, run_end in bridged:
+        if run_end - run_start < min_speech:
+            continue
+        region = (max(0.0, run_start - pad), min(end_limit, run_end + pad))
+        if regions and region[0] <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], region[1])
+        else:
+            regions.append(region)
+    return [(round(s, 3), round(e, 3)) for s, e in regions]
+
+
+def concatenate_regions(audio, regions: list[tuple[float, float]], sample_rate: int = SAMPLE_RATE):
+    """Speech-only buffer: the regions back to back with JOIN_GAP_SECONDS of silence between them."""
+    import numpy as np
+
+    gap = np.zeros(int(JOIN_GAP_SECONDS * sample_rate), dtype=np.float32)
+    pieces = []
+    for i, (start, end) in enumerate(regions):
+        if i:
+            pieces.append(gap)
+        pieces.append(np.asarray(audio[int(start * sample_rate):int(end * sample_rate)], dtype=np.float32))
+    if not pieces:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(pieces)
+
+
+def _layout(regions: list[tuple[float, float]]) -> list[tuple[float, float, float]]:
+    """(concat_start, concat_end, source_start) for each region of the concatenated buffer."""
+    layout = []
+    cursor = 0.0
+    for start, end in regions:
+        layout.append((cursor, cursor + (end - start), start))
+        cursor += (end - start) + JOIN_GAP_SECONDS
+    return layout
+
+
+def remap_time(t: float, regions: list[tuple[float, float]], prefer_next: bool = False) -> float:
+    """Map a time in the concatenated buffer to source time.
+
+    Times inside a join gap snap to the end of the previous region, or to the
+    start of the next one with prefer_next (used for segment starts).
+    """
+    layout = _layout(regions)
+    for i, (concat_start, concat_end, source_start) in enumerate(layout):
+        if t <= concat_end:
+            if t >= concat_start:
+                return source_start + (t - concat_start)
+            # In the gap before region i
+            if prefer_next or i == 0:
+                return source_start
+            prev_start, prev_end, prev_source = layout[i - 1]
+            return prev_source + (prev_end - prev_start)
+    if not layout:
+        return t
+    last_start, last_end, last_source = layout[-1]
+    return last_source + (last_end - last_start)
+
+
+def remap_segments(segments: list[dict], regions: list[tuple[float, float]]) -> list[dict]:
+    """Return segments with start/end moved from concatenated time back to source time."""
+    remapped = []
+    for segment in segments:
+        start = remap_time(segment["start"], regions, prefer_next=True)
+        end = remap_time(segment["end"], regions)
+        remapped.append({**segment, "start": round(start, 3), "end": round(max(start, end), 3)})
+    return remapped
+
+
+def detect_speech(audio, sample_rate: int = SAMPLE_RATE) -> tuple[list[tuple[float, float]], float]:
+    """Speech regions of a waveform and the fraction of the source they cover."""
+    duration = len(audio) / sample_rate
+    regions = speech_regions(speech_frames(audio, sample_rate), duration=duration)
+    speech_seconds = sum(end - start for start, end in regions)
+    return regions, (speech_seconds / duration if duration else 0.0)
+
+
+__all__ = [
+    "JOIN_GAP_SECONDS",
+    "concatenate_regions",
+    "detect_speech",
+    "remap_segments",
+    "remap_time",
+    "speech_frames",
+    "speech_regions",
+]
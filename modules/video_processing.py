@@ -175,11 +175,202 @@ def validate_clip_timings(clip_timings: list[dict], video_duration: float | None
     return cleaned
 
 
-def generate_recap_suggestions(transcription_file, target_duration=30, output_dir="output/transcriptions", narration_language=None, emotions_file=None):
+def _clip_system_prompt(with_emotion: bool) -> str:
+    system = (
+        "You are a professional video editor. Your job is to select the most "
+        "important clip windows from a timestamped transcript to build a recap "
+        "of a specific target duration. Think about coverage, pacing, emotional "
+        "impact, and avoiding redundancy. Always respond with valid JSON only."
+    )
+    if with_emotion:
+        system += (
+            " When emotion data is available, prioritize segments with higher "
+            "intensity scores and dominant emotions (joy, surprise, anger) that "
+            "drive narrative momentum. Use emotion intensity as a tiebreaker when "
+            "content importance is similar."
+        )
+    return system
+
+
+def _candidate_prompt(transcript_text, target_duration, emotion_context, with_emotion, window=None):
+    """Call 1 user prompt; with window=(start, end, total_target) it covers one part of a long video."""
+    skipped_note = (
+        "\nLines reading \"(skipped; begins: ...)\" stand for stretches left out as unlikely clip\n"
+        "material; they are there for context only — do not propose clips inside them."
+        if "(skipped; begins:" in transcript_text else ""
+    )
+    if window is None:
+        intro = f"Propose candidate clips for a {target_duration}-second video recap."
+        scope = "the whole story (beginning, middle, end)"
+        summary_rule = "summarize the whole story in 2-3 sentences (who, what happens, how it ends)"
+    else:
+        window_start, window_end, total_target = window
+        intro = (f"This is the part of a longer video from {window_start:.0f}s to {window_end:.0f}s. "
+                 f"Propose candidate clips from it for a {total_target}-second recap of the whole video.")
+        scope = "this whole part"
+        summary_rule = "summarize what happens in this part in 1-2 sentences"
+    want = max(10, round(target_duration * 2.5))
+    return f"""Below is a transcript, one line per utterance: "[start-end] Speaker: text",
+times in seconds.{emotion_context}{skipped_note}
+
+{transcript_text}
+
+{intro} The final selection and exact timing are done afterwards, so do NOT try
+to make the clips add up to a duration — propose more material than needed and score it.
+
+RULES:
+1. Propose candidates totalling roughly {want}s, each 2-20s long.
+2. Score each candidate 0-10 by how important or interesting it is for the recap.
+   {"When emotion data is present, score segments with high emotional intensity (intensity > 0.6) and strong emotions (joy, surprise, anger) higher. " if with_emotion else ""}Include lower-scored supplemental segments (visual transitions, atmospheric moments)
+   so short or quiet videos still have enough material.
+3. Cover {scope}; avoid redundant candidates.
+4. Use start/end times from the transcript.
+5. Also {summary_rule}.
+
+Return JSON only — no explanation, no markdown fences:
+{{
+  "summary": "<summary>",
+  "candidates": [
+    {{"start": <float>, "end": <float>, "score": <0-10>, "reason": "<why this clip>"}},
+    ...
+  ]
+}}"""
+
+
+def _propose_candidates(llm, model_name, system, prompt, call_name, cache=True):
+    """Run one candidate-scoring call; returns (summary, candidates)."""
+    from modules.prompt_encoding import log_token_usage
+
+    response = llm.chat(
+        model=model_name,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        max_tokens=3000,
+        cache=cache,
+    )
+    log_token_usage(call_name, system + prompt, response, model_name)
+    data = _parse_llm_json(response.content or "{}")
+    # Older prompt shape ("clip_timings") is accepted as unscored candidates
+    return data.get("summary", ""), data.get("candidates") or data.get("clip_timings", [])
+
+
+def _plan_long_form(llm, model_name, clip_system, segments, target_duration, emotion_context,
+                    with_emotion, window_seconds, max_parallel_calls, prerank_coverage):
+    """Map-reduce Call 1 for long transcripts; returns (summary, candidates).
+
+    Map: every window_seconds slice of the transcript gets its own candidate
+    call, at most max_parallel_calls at a time, asking for its share of the
+    target. Reduce: one call sees only the window summaries and a shortlist of
+    the best candidates and re-scores them against the whole story, so its
+    prompt grows with the target duration rather than the transcript length.
+    A window whose call fails twice is skipped; planning fails only when no
+    candidates are left.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from modules.clip_selection import shortlist_candidates, split_time_windows
+    from modules.prompt_encoding import encode_transcript, log_token_usage, transcript_token_budget
+    from modules.segment_ranking import prerank_segments
+
+    windows = split_time_windows(segments, window_seconds)
+    media_start = windows[0][0]["start"]
+    media_span = max(windows[-1][-1]["end"] - media_start, 1e-6)
+    window_budget = transcript_token_budget(model_name)
+    workers = max(1, min(max_parallel_calls or 1, len(windows)))
+    print(f"[Call 1] Long-form mode: {len(windows)} windows of ~{window_seconds}s, {workers} in parallel")
+
+    def map_window(index, window):
+        start, end = window[0]["start"], window[-1]["end"]
+        share = target_duration * (end - start) / media_span
+        ranked = prerank_segments(window, share, prerank_coverage)
+        prompt = _candidate_prompt(
+            encode_transcript(ranked, window_budget, model_name), share, emotion_context, with_emotion,
+            window=(start, end, target_duration),
+        )
+        # One uncached retry, then the window is skipped: a single malformed
+        # response must not cost the candidates of every other window
+        for attempt in (1, 2):
+            try:
+                summary, found = _propose_candidates(llm, model_name, clip_system, prompt,
+                                                     f"Call 1 window {index}", cache=attempt == 1)
+                return start, end, summary, found
+            except Exception as e:
+                print(f"⚠️  Call 1 window {index} [{start:.0f}-{end:.0f}s] failed (attempt {attempt}/2): {e}")
+                if attempt == 2:
+                    failed.append(e)
+        return None
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        mapped = [r for r in pool.map(lambda args: map_window(*args), enumerate(windows, 1)) if r]
+    if failed:
+        print(f"⚠️  Skipped {len(failed)} of {len(windows)} windows")
+
+    candidates = shortlist_candidates([c for *_, found in mapped for c in found], target_duration)
+    print(f"   {sum(len(found) for *_, found in mapped)} window candidates -> shortlist of {len(candidates)}")
+    if not candidates and failed:
+        raise RuntimeError(f"Call 1 produced no candidates; {len(failed)} window(s) failed") from failed[-1]
+    if not candidates:
+        return " ".join(summary for _, _, summary, _ in mapped if summary), []
+
+    window_lines = "\n".join(f"[{start:.0f}-{end:.0f}] {summary}" for start, end, summary, _ in mapped)
+    candidate_lines = "\n".join(
+        f"#{i} [{c['start']:.1f}-{c['end']:.1f}] score {c['score']:g}: {c.get('reason', '')}"
+        for i, c in enumerate(candidates)
+    )
+    reduce_prompt = f"""A long video was split into parts. What happens in each part (times in seconds):
+
+{window_lines}
+
+Shortlisted candidate clips, scored within their own part:
+
+{candidate_lines}
+
+Re-score every candidate 0-10 for a {target_duration}-second recap of the WHOLE video:
+favour moments that matter to the overall story, keep the beginning, middle and end
+represented, and lower the score of candidates that repeat each other.
+Also summarize the whole story in 2-3 sentences (who, what happens, how it ends).
+
+Return JSON only — no explanation, no markdown fences:
+{{
+  "summary": "<2-3 sentence story summary>",
+  "scores": [{{"id": <candidate number>, "score": <0-10>}}, ...]
+}}"""
+
+    print("[Call 1] Reducing shortlisted candidates...")
+    response = llm.chat(
+        model=model_name,
+        messages=[
+            {"role": "system", "content": clip_system},
+            {"role": "user", "content": reduce_prompt},
+        ],
+        max_tokens=3000,
+    )
+    log_token_usage("Call 1 reduce", clip_system + reduce_prompt, response, model_name)
+    reduced = _parse_llm_json(response.content or "{}")
+    # Candidates the reduce pass left out keep their window score
+    for entry in reduced.get("scores", []):
+        try:
+            candidates[int(entry["id"])]["score"] = entry["score"]
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+    summary = reduced.get("summary") or " ".join(summary for _, _, summary, _ in mapped if summary)
+    return summary, candidates
+
+
+def generate_recap_suggestions(transcription_file, target_duration=30, output_dir="output/transcriptions", narration_language=None, emotions_file=None,
+                               window_seconds=900, max_parallel_calls=4, prerank_coverage=8.0):
     """
     Step 3: Generate AI-powered recap suggestions using two focused LLM calls.
 
-    Call 1 — Clip selection (video-editor mindset): returns clip_timings only.
+    Call 1 — Clip selection (video-editor mindset): returns scored candidate clips;
+             modules.clip_selection picks the ones that fill target_duration exactly.
+             Transcripts longer than two windows (or over the model's token budget)
+             are planned map-reduce: one call per window, run in parallel, then a
+             reduce call over the shortlisted candidates. Before either, the
+             transcript is pre-ranked locally (modules.segment_ranking) so only
+             its most promising windows reach the LLM.
     Call 2 — Narration (scriptwriter mindset): given the selected clips, writes
              recap_text calibrated to the visual timeline.
 
@@ -194,11 +385,13 @@ def generate_recap_suggestions(transcription_file, target_duration=30, output_di
                             If None, narration is written in the same language as the transcript.
         emotions_file: Optional path to emotions.json (from transcribe_video_with_emotions).
                        If provided, clips will be weighted toward emotional intensity.
+        window_seconds: Window length for long-form planning (0 = always a single Call 1)
+        max_parallel_calls: Window calls in flight at once in long-form planning
+        prerank_coverage: Transcript seconds kept per target second by local pre-ranking (0 = send everything)
 
     Returns:
         Path to recap_data.json
     """
-    from openai import OpenAI
     import dotenv
 
     dotenv.load_dotenv()
@@ -217,13 +410,18 @@ def generate_recap_suggestions(transcription_file, target_duration=30, output_di
     # Merge emotions if provided
     if emotions_file:
         segments = _merge_emotions_with_segments(segments, emotions_file)
-        emotion_context = "\n\nEach segment also includes emotion analysis (if available): dominant_emotion, intensity (0-1 scale), and detailed emotions breakdown."
+        emotion_context = " Lines with a notable emotion carry it after the speaker as (emotion intensity), intensity on a 0-1 scale."
     else:
         emotion_context = ""
 
-    transcript_json = json.dumps(segments, indent=2)
+    from modules.prompt_encoding import (
+        encode_transcript, estimate_tokens, log_token_usage, segments_in_window, transcript_token_budget,
+    )
+
+    from modules.llm_cache import get_llm_gateway
 
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=5)
+    # Re-runs with the same prompts are answered from the LLM cache
+    llm = get_llm_gateway()
     model_name = os.getenv("OPENAI_MODEL", "gpt-4o")
 
     narration_word_target = max(35, min(220, round(target_duration * 2.0)))
@@ -234,94 +432,48 @@ def generate_recap_suggestions(transcription_file, target_duration=30, output_di
     # ------------------------------------------------------------------
     # CALL 1 — Clip selection
     # ------------------------------------------------------------------
-    clip_system = (
-        "You are a professional video editor. Your job is to select the most "
-        "important clip windows from a timestamped transcript to build a recap "
-        "of a specific target duration. Think about coverage, pacing, emotional "
-        "impact, and avoiding redundancy. Always respond with valid JSON only."
-    )
-    if emotions_file:
-        clip_system += (
-            " When emotion data is available, prioritize segments with higher "
-            "intensity scores and dominant emotions (joy, surprise, anger) that "
-            "drive narrative momentum. Use emotion intensity as a tiebreaker when "
-            "content importance is similar."
-        )
-
-    clip_prompt = f"""Below is a transcript as a JSON array. Each element has "start" (seconds),
-"end" (seconds), and "text" (what was spoken).{emotion_context}
+    from modules.clip_selection import solve_clip_selection
 
-{transcript_json}
+    clip_system = _clip_system_prompt(with_emotion=bool(emotions_file))
+    media_end = max((seg.get("end", 0) for seg in segments), default=None)
+    budget = transcript_token_budget(model_name)
 
-Select clips for a {target_duration}-second video recap.
+    long_form = bool(window_seconds) and (
+        (media_end or 0) > 2 * window_seconds
+        or estimate_tokens(encode_transcript(segments, model=model_name), model_name) > budget
+    )
+    if long_form:
+        story_summary, candidates = _plan_long_form(
+            llm, model_name, clip_system, segments, target_duration, emotion_context,
+            bool(emotions_file), window_seconds, max_parallel_calls, prerank_coverage,
+        )
+    else:
+        from modules.segment_ranking import prerank_segments
 
-RULES:
-1. Pick segments with the most important or interesting content first.
-2. {"When emotion data is present, prioritize segments with high emotional intensity (intensity > 0.6) and strong emotions (joy, surprise, anger). " if emotions_file else ""}If meaningful dialogue clips total less than {target_duration}s, add
-   supplemental segments (visual transitions, atmospheric moments) to reach
-   the target. Label the reason accordingly.
-3. Keep clips in chronological order (sorted by start time).
-4. No overlapping ranges. No duplicate timestamps.
-5. Sum of (end - start) for all clips must equal EXACTLY {target_duration}s (±2s tolerance).
+        # Only the locally top-ranked windows, as compact "[start-end] Speaker: text" lines
+        ranked = prerank_segments(segments, target_duration, prerank_coverage)
+        if len(ranked) < len(segments):
+            print(f"   Pre-ranking kept {sum(not s.get('skipped') for s in ranked)}/{len(segments)} segments")
+        transcript_text = encode_transcript(ranked, budget, model_name)
+        clip_prompt = _candidate_prompt(transcript_text, target_duration, emotion_context, bool(emotions_file))
+        print("[Call 1] Scoring candidate clips...")
+        story_summary, candidates = _propose_candidates(llm, model_name, clip_system, clip_prompt, "Call 1")
 
-Return JSON only — no explanation, no markdown fences:
-{{
-  "clip_timings": [
-    {{"start": <float>, "end": <float>, "reason": "<why this clip>"}},
-    ...
-  ]
-}}"""
+    clip_timings = solve_clip_selection(candidates, target_duration, media_duration=media_end)
+    actual_duration = sum(c["end"] - c["start"] for c in clip_timings)
+    print(f"   {len(candidates)} candidates -> {len(clip_timings)} clips, {actual_duration:.1f}s (target {target_duration}s)")
 
-    tolerance = 2.0
-    clip_timings = []
-    actual_duration = 0
-    max_attempts = 3
-    clip_messages = [
-        {"role": "system", "content": clip_system},
-        {"role": "user", "content": clip_prompt},
-    ]
-
-    for attempt in range(1, max_attempts + 1):
-        print(f"[Call 1] Selecting clips (attempt {attempt}/{max_attempts})...")
-        response = client.chat.completions.create(
-            model=model_name,
-            messages=clip_messages,
-            max_tokens=2000,
-        )
-        result_text = response.choices[0].message.content or ""
-        clip_data = _parse_llm_json(result_text)
-        clip_timings = clip_data.get("clip_timings", [])
-        actual_duration = sum(c["end"] - c["start"] for c in clip_timings)
-
-        if abs(actual_duration - target_duration) <= tolerance:
-            print(f"   Duration OK: {actual_duration:.1f}s (target {target_duration}s)")
-            break
-
-        print(f"   Duration mismatch: {actual_duration:.1f}s vs target {target_duration}s — retrying...")
-        clip_messages.append({"role": "assistant", "content": result_text})
-        clip_messages.append({"role": "user", "content": (
-            f"The clips total {actual_duration:.1f}s but the target is {target_duration}s. "
-            f"Adjust clips so they total EXACTLY {target_duration}s. Return corrected JSON."
-        )})
-
-    if abs(actual_duration - target_duration) > tolerance and actual_duration > 0:
-        print(f"   Scaling clips: {actual_duration:.1f}s -> {target_duration}s")
-        scale = target_duration / actual_duration
-        for clip in clip_timings:
-            mid = (clip["start"] + clip["end"]) / 2
-            half = ((clip["end"] - clip["start"]) * scale) / 2
-            clip["start"] = max(0, round(mid - half, 1))
-            clip["end"] = round(mid + half, 1)
-        actual_duration = sum(c["end"] - c["start"] for c in clip_timings)
-        print(f"   Scaled duration: {actual_duration:.1f}s")
-
-    clip_timings = sorted(clip_timings, key=lambda c: c["start"])
     clip_timings = validate_clip_timings(clip_timings)
 
     # ------------------------------------------------------------------
     # CALL 2 — Narration
     # ------------------------------------------------------------------
-    clip_summary = json.dumps(clip_timings, indent=2)
+    # Narration only needs the story summary and what is said inside the chosen clips
+    clip_summary = "\n\n".join(
+        f"Clip {i} [{clip['start']:.1f}-{clip['end']:.1f}]:\n"
+        + encode_transcript(segments_in_window(segments, clip["start"], clip["end"]), model=model_name, merge=False)
+        for i, clip in enumerate(clip_timings, 1)
+    )
     LANG_MAP = {"en": "English", "es": "Spanish", "fr": "French", "de": "German",
                 "pt": "Portuguese", "it": "Italian", "ja": "Japanese", "ko": "Korean",
                 "zh": "Chinese", "hi": "Hindi", "ta": "Tamil", "ar": "Arabic", "ru": "Russian"}
@@ -396,12 +548,11 @@ Return JSON only — no explanation, no markdown fences:
             else:
                 speaker_guidance = f"\n\nKey speakers: {', '.join(speaker_list)}"
 
-    narr_prompt = f"""Here's a {target_duration}-second recap assembled from these clips:
+    narr_prompt = f"""The story so far: {story_summary or "(no summary available)"}
 
-{clip_summary}
+Here's a {target_duration}-second recap assembled from these clips, each with what is said in it:
 
-The original transcript:
-{transcript_json}{emotion_guidance}
+{clip_summary}{emotion_guidance}
 
 Tell this story like you're excitedly sharing it with a friend. Hit the highlights, use character names if you can spot them, and make it flow naturally.
 
@@ -420,7 +571,7 @@ Return JSON only:
 }}"""
 
     print("[Call 2] Writing narration...")
-    narr_response = client.chat.completions.create(
+    narr_response = llm.chat(
         model=model_name,
         messages=[
             {"role": "system", "content": narr_system},
@@ -428,7 +579,8 @@ Return JSON only:
         ],
         max_tokens=1500,
     )
-    narr_data = _parse_llm_json(narr_response.choices[0].message.content or "{}")
+    log_token_usage("Call 2", narr_system + narr_prompt, narr_response, model_name)
+    narr_data = _parse_llm_json(narr_response.content or "{}")
     recap_text = narr_data.get("recap_text", "")
 
     # ------------------------------------------------------------------
@@ -485,7 +637,37 @@ Return JSON only:
     return recap_data_file
 
 
-def extract_and_merge_clips(video_path, recap_data_file, target_duration=30, output_dir="output/videos"):
+def _extract_clips_smart(video_path, clip_timings, target_duration, output_file):
+    """Smart-cut the clip windows with ffmpeg (stream-copy GOPs, re-encode edges only)."""
+    from modules.ffmpeg_render import plan_clip_windows, probe_media, smart_cut_clips
+
+    video_duration = probe_media(video_path)["duration"]
+    clip_timings = validate_clip_timings(clip_timings, video_duration=video_duration)
+    print(f"Validated {len(clip_timings)} clip(s) against video duration {video_duration:.2f}s")
+
+    # Trimming the concatenation to target_duration == trimming the timings.
+    windows = plan_clip_windows(clip_timings, max_total=target_duration)
+    work_dir = get_output_path("output/temp/smart_cut")
+    print(f"Smart-cutting {len(windows)} clip(s)...")
+    smart_cut_clips(video_path, windows, output_file, work_dir)
+    return sum(w["end"] - w["start"] for w in windows)
+
+
+def _extract_clips_parallel(video_path, clip_timings, target_duration, output_file, max_workers=None):
+    """Encode each clip in its own pool worker with ffmpeg and join the parts losslessly."""
+    from modules.ffmpeg_render import encode_clips_parallel, plan_clip_windows, probe_media
+
+    video_duration = probe_media(video_path)["duration"]
+    clip_timings = validate_clip_timings(clip_timings, video_duration=video_duration)
+    windows = plan_clip_windows(clip_timings, max_total=target_duration)
+    work_dir = get_output_path("output/temp/clip_parts")
+    print(f"Encoding {len(windows)} clip(s) in parallel...")
+    encode_clips_parallel(video_path, windows, output_file, work_dir, max_workers=max_workers)
+    return sum(w["end"] - w["start"] for w in windows)
+
+
+def extract_and_merge_clips(video_path, recap_data_file, target_duration=30, output_dir="output/videos",
+                            cut_mode="reencode", max_workers=None):
     """
     Step 4: Extract video clips and merge them
     
@@ -494,6 +676,11 @@ def extract_and_merge_clips(video_path, recap_data_file, target_duration=30, out
         recap_data_file: Path to recap_data.json
         target_duration: Target duration in seconds (should include overshoot buffer)
         output_dir: Directory to save output video
+        cut_mode: "reencode" (moviepy, one serial encode), "parallel" (one ffmpeg
+                  encode per clip on a process pool, joined losslessly) or "smart"
+                  (keyframe-aware stream-copy cut; falls back to "parallel" when
+                  the source cannot be smart-cut)
+        max_workers: Pool size for "parallel" encoding (default: CPU count)
     
     Returns:
         Path to merged video
@@ -516,6 +703,32 @@ def extract_and_merge_clips(video_path, recap_data_file, target_duration=30, out
     if not os.path.exists(video_path):
         raise FileNotFoundError(f"Video file not found: {video_path}")
 
+    output_path = get_output_path(output_dir)
+    os.makedirs(output_path, exist_ok=True)
+    output_file = os.path.join(output_path, "recap_video.mp4")
+
+    if cut_mode == "smart":
+        try:
+            duration = _extract_clips_smart(video_path, clip_timings, target_duration, output_file)
+            print(f"✅ Video clips merged (smart cut)!")
+            print(f"   Output: {output_file}")
+            print(f"   Duration: {duration:.2f}s")
+            return output_file
+        except Exception as e:
+            print(f"⚠️  Smart cut not possible ({e}) — encoding clips in parallel instead")
+            cut_mode = "parallel"
+
+    if cut_mode == "parallel":
+        try:
+            duration = _extract_clips_parallel(video_path, clip_timings, target_duration, output_file,
+                                               max_workers=max_workers)
+            print(f"✅ Video clips merged (parallel encode)!")
+            print(f"   Output: {output_file}")
+            print(f"   Duration: {duration:.2f}s")
+            return output_file
+        except Exception as e:
+            print(f"⚠️  Parallel encode failed ({e}) — falling back to moviepy")
+
     # Load original video
     print("Loading video...")
     video = VideoFileClip(video_path)
@@ -565,10 +778,6 @@ def extract_and_merge_clips(video_path, recap_data_file, target_duration=30, out
     print(f"\n✅ Final video duration: {final_clip.duration:.2f}s")
     
     # Save video
-    output_path = get_output_path(output_dir)
-    os.makedirs(output_path, exist_ok=True)
-    
-    output_file = os.path.join(output_path, "recap_video.mp4")
     print(f"Writing video to {output_file}...")
     
     # Create temp directory for MoviePy temporary files
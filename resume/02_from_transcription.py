@@ -7,7 +7,7 @@ Use this when you already have extracted audio and want to:
 - Start: Transcription → Recap → Clips → TTS → Final Video
 
 Prerequisites:
-    - output/original/extracted_audio.wav must exist
+    - output/original/extracted_audio.f32 (or .wav from older runs) must exist
 
 Usage:
     python resume/from_transcription.py /path/to/video.mp4 [options]
@@ -26,6 +26,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from modules.transcription import transcribe_video, translate_transcription
 from modules.video_processing import generate_recap_suggestions, extract_and_merge_clips, remove_audio_from_video
 from modules.audio_processing import generate_tts_audio, merge_audio_with_video
+from modules.llm_cache import configure_llm_cache, print_llm_cache_stats
 
 
 def print_header(title):
@@ -46,16 +47,28 @@ def main():
     parser.add_argument("--language", help="Source video language code")
     parser.add_argument("--remove-original-audio", action="store_true", 
                        help="Remove original audio before adding narration")
-    parser.add_argument("--use-existing-audio", default="output/original/extracted_audio.wav",
-                       help="Path to existing audio file")
+    parser.add_argument("--use-existing-audio",
+                       help="Path to existing audio file (default: output/original/extracted_audio.f32, "
+                            "or extracted_audio.wav from older runs)")
+    
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Call OpenAI even for prompts answered before (skip the LLM response cache)")
     
     args = parser.parse_args()
+    if args.no_llm_cache:
+        configure_llm_cache(backend="off")
     
     print("\n" + "╔" + "="*78 + "╗")
     print("║" + " "*20 + "RESUME FROM TRANSCRIPTION" + " "*33 + "║")
     print("╚" + "="*78 + "╝")
     
     # Check if audio exists
+    if not args.use_existing_audio:
+        args.use_existing_audio = next(
+            (path for path in ("output/original/extracted_audio.f32", "output/original/extracted_audio.wav")
+             if os.path.exists(path)),
+            "output/original/extracted_audio.f32",
+        )
     if not os.path.exists(args.use_existing_audio):
         print(f"\n❌ Error: Audio file not found: {args.use_existing_audio}")
         print("   Run the full workflow first or provide correct path with --use-existing-audio")
@@ -70,7 +83,7 @@ def main():
             video_path=args.video_path,
             model_size=args.model,
             language=args.language,
-            existing_audio_path=args.use_existing_audio
+            audio_path=args.use_existing_audio
         )
         
         # Step 2: Translate (optional)
@@ -122,6 +135,8 @@ def main():
             audio_path=tts_audio
         )
         
+        print_llm_cache_stats()
+
         print("\n" + "="*80)
         print("✅ WORKFLOW COMPLETE!")
         print("="*80)
@@ -25,6 +25,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.video_processing import extract_and_merge_clips, remove_audio_from_video
 from modules.audio_processing import generate_tts_audio, merge_audio_with_video
+from modules.llm_cache import configure_llm_cache, print_llm_cache_stats
 
 
 def print_header(title):
@@ -44,7 +45,12 @@ def main():
     parser.add_argument("--recap-data", default="output/transcriptions/recap_data.json",
                        help="Path to existing recap data file")
     
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Call OpenAI even for prompts answered before (skip the LLM response cache)")
+    
     args = parser.parse_args()
+    if args.no_llm_cache:
+        configure_llm_cache(backend="off")
     
     print("\n" + "╔" + "="*78 + "╗")
     print("║" + " "*18 + "RESUME FROM CLIP EXTRACTION" + " "*33 + "║")
@@ -89,6 +95,8 @@ def main():
             audio_path=tts_audio
         )
         
+        print_llm_cache_stats()
+
         print("\n" + "="*80)
         print("✅ WORKFLOW COMPLETE!")
         print("="*80)
@@ -26,6 +26,7 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.audio_processing import generate_tts_audio, merge_audio_with_video
+from modules.llm_cache import configure_llm_cache, print_llm_cache_stats
 
 
 def print_header(title):
@@ -43,7 +44,12 @@ def main():
     parser.add_argument("--recap-text", default="output/transcriptions/recap_text.txt",
                        help="Path to existing recap text file")
     
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Call OpenAI even for prompts answered before (skip the LLM response cache)")
+    
     args = parser.parse_args()
+    if args.no_llm_cache:
+        configure_llm_cache(backend="off")
     
     print("\n" + "╔" + "="*78 + "╗")
     print("║" + " "*20 + "RESUME FROM TTS GENERATION" + " "*32 + "║")
@@ -79,6 +85,8 @@ def main():
             audio_path=tts_audio
         )
         
+        print_llm_cache_stats()
+
         print("\n" + "="*80)
         print("✅ WORKFLOW COMPLETE!")
         print("="*80)
@@ -18,15 +18,24 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
+# Extracted audio: 16 kHz float32 PCM (current runs) or WAV (runs before the shared PCM decode)
+AUDIO_CHECKPOINTS = ("output/original/extracted_audio.f32", "output/original/extracted_audio.wav")
+
+
 def check_file_exists(filepath):
     """Check if a file exists"""
     return os.path.exists(filepath)
 
 
+def find_audio_checkpoint():
+    """Return the extracted audio file that exists, or None"""
+    return next((path for path in AUDIO_CHECKPOINTS if check_file_exists(path)), None)
+
+
 def print_checkpoint_status():
     """Print status of all checkpoints"""
     checkpoints = [
-        ("Audio Extraction", "output/original/extracted_audio.wav"),
+        ("Audio Extraction", find_audio_checkpoint() or AUDIO_CHECKPOINTS[0]),
         ("Transcription", "output/transcriptions/transcription.txt"),
         ("AI Recap Generation", "output/transcriptions/recap_data.json"),
         ("Video Clip Extraction", "output/videos/recap_video.mp4"),
@@ -48,7 +57,7 @@ def print_checkpoint_status():
 
 def get_suggested_starting_point():
     """Determine the best starting point based on existing files"""
-    if not check_file_exists("output/original/extracted_audio.wav"):
+    if not find_audio_checkpoint():
         return 1, "Start from beginning (no files found)"
     elif not check_file_exists("output/transcriptions/transcription.txt"):
         return 2, "Resume from Transcription (audio exists)"
@@ -35,6 +35,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from modules.transcription import transcribe_video, translate_transcription
 from modules.video_processing import generate_recap_suggestions, extract_and_merge_clips, remove_audio_from_video
 from modules.audio_processing import generate_tts_audio, merge_audio_with_video
+from modules.llm_cache import configure_llm_cache, print_llm_cache_stats
 
 
 def print_header(title):
@@ -93,7 +94,12 @@ def main():
     parser.add_argument("--skip-tts", action="store_true",
                         help="Skip TTS generation, use existing audio file")
     
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Call OpenAI even for prompts answered before (skip the LLM response cache)")
+    
     args = parser.parse_args()
+    if args.no_llm_cache:
+        configure_llm_cache(backend="off")
     
     # If dry-run is set, enable all skip flags
     if args.dry_run:
@@ -229,6 +235,8 @@ def main():
             audio_path=audio_file
         )
         
+        print_llm_cache_stats()
+
         # Success!
         print(f"\n{'='*80}")
         print(f"{'='*80}")
@@ -27,7 +27,7 @@ def get_output_path(relative_path):
 
 # Define expected files
 test_files = {
-    'Original Audio': 'output/original/extracted_audio.wav',
+    'Original Audio': 'output/original/extracted_audio.f32',
     'Original Transcription': 'output/original/full_transcription.txt',
     'Transcription (Text)': 'output/transcriptions/transcription.txt',
     'Transcription (JSON)': 'output/transcriptions/transcription.json',